@@ -62,9 +62,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Cold storage for old sign-offs, see `manage.py archive_signoffs`
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'archive.sqlite3',
+    },
 }
 
+DATABASE_ROUTERS = ['scheduler.routers.ArchiveRouter']
+
+# Rendered iCalendar feeds get their own bounded cache, so large feeds cannot
+# crowd out the default one; at most MAX_ENTRIES feeds of up to
+# scheduler.feeds.FEED_CACHE_MAX_BYTES each are held
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'feeds': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'scheduler-feeds',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 64},
+    },
+}
+
+# Commit sign-offs and job assignments through one writer thread in batched
+# transactions instead of one transaction per request; see scheduler/writes.py
+SCHEDULER_WRITE_BEHIND = False
+
+# Sign-offs completed more than this many days ago are moved to the archive
+SIGNOFF_ARCHIVE_DAYS = 400
+
+# Dashboard snapshots of days older than this are dropped instead of patched
+# on runbook edits, and deleted by prune_snapshots; they rebuild on read
+DASHBOARD_SNAPSHOT_DAYS = 14
+
+# Delta sync changes older than this are deleted by prune_changes; clients
+# holding a cursor from before then get 410 Gone and reload in full
+CHANGELOG_RETENTION_DAYS = 30
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -95,6 +132,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # For development only, restrict in production
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Change-Cursor', 'Link']  # Let the frontend read sync headers
 
 # REST Framework settings
 REST_FRAMEWORK = {
@@ -19,23 +19,51 @@ const CalendarView = () => {
     const [modalOpen, setModalOpen] = useState(false);
     const [createModalOpen, setCreateModalOpen] = useState(false);
     const [selectedDate, setSelectedDate] = useState(null);
+    const [range, setRange] = useState(() => ({
+        start: moment().startOf('month').startOf('week').toDate(),
+        end: moment().endOf('month').endOf('week').toDate()
+    }));
 
-    // Fetch jobs, team members, and indexes on component mount
+    // Fetch team members and indexes on component mount
     useEffect(() => {
         fetchData();
     }, []);
 
-    const fetchData = async () => {
+    // Fetch only the jobs overlapping the visible range whenever it changes
+    useEffect(() => {
+        fetchJobs(range);
+    }, [range]);
+
+    // Normalize react-big-calendar's range (an array of days or {start, end})
+    const handleRangeChange = (newRange) => {
+        if (Array.isArray(newRange)) {
+            setRange({
+                start: moment(newRange[0]).startOf('day').toDate(),
+                end: moment(newRange[newRange.length - 1]).endOf('day').toDate()
+            });
+        } else {
+            setRange({
+                start: moment(newRange.start).startOf('day').toDate(),
+                end: moment(newRange.end).endOf('day').toDate()
+            });
+        }
+    };
+
+    const fetchJobs = async ({ start, end }) => {
         try {
-            const [jobsResponse, membersResponse, indexesResponse] = await Promise.all([
-                axios.get('http://localhost:8000/api/jobs/'),
-                axios.get('http://localhost:8000/api/team-members/'),
-                axios.get('http://localhost:8000/api/indexes/')
-            ]);
+            const jobsResponse = await axios.get('http://localhost:8000/api/jobs/', {
+                params: {
+                    start: start.toISOString(),
+                    end: end.toISOString(),
+                    overlap: true
+                }
+            });
 
             // Format job data for the calendar
             const formattedJobs = jobsResponse.data.map(job => ({
                 id: job.id,
+                series: job.series,
+                original_start: job.original_start,
                 title: job.title,
                 start: new Date(job.start_time),
                 end: new Date(job.end_time),
@@ -48,6 +76,18 @@ const CalendarView = () => {
             }));
 
             setJobs(formattedJobs);
+        } catch (error) {
+            console.error('Error fetching jobs:', error);
+        }
+    };
+
+    const fetchData = async () => {
+        try {
+            const [membersResponse, indexesResponse] = await Promise.all([
+                axios.get('http://localhost:8000/api/team-members/'),
+                axios.get('http://localhost:8000/api/indexes/')
+            ]);
+
             setTeamMembers(membersResponse.data);
             setIndexes(indexesResponse.data);
         } catch (error) {
@@ -68,11 +108,21 @@ const CalendarView = () => {
     };
 
     // Handle job assignment update
-    const handleAssignJob = async (jobId, teamMemberId) => {
+    const handleAssignJob = async (jobId, teamMemberId, force = false) => {
         try {
-            const response = await axios.put(`http://localhost:8000/api/assign-job/${jobId}/`, {
-                team_member_id: teamMemberId
-            });
+            const job = jobs.find(j => j.id === jobId);
+            
+            // Occurrences of recurring jobs are reassigned as one-off overrides
+            const response = job && job.series
+                ? await axios.put(`http://localhost:8000/api/job-series/${job.series}/occurrences/`, {
+                    original_start: job.original_start,
+                    assigned_to: teamMemberId || null,
+                    force: force
+                })
+                : await axios.put(`http://localhost:8000/api/assign-job/${jobId}/`, {
+                    team_member_id: teamMemberId,
+                    force: force
+                });
 
             // Update the jobs state with the updated job
             setJobs(prevJobs =>
@@ -90,6 +140,13 @@ const CalendarView = () => {
             // Close the modal
             setModalOpen(false);
         } catch (error) {
+            // The member is already booked; let the user decide whether to double-book
+            if (error.response && error.response.status === 409 && !force) {
+                if (window.confirm(`${error.response.data.error} Assign anyway?`)) {
+                    await handleAssignJob(jobId, teamMemberId, true);
+                }
+                return;
+            }
             console.error('Error assigning job:', error);
         }
     };
@@ -172,6 +229,7 @@ const CalendarView = () => {
                     selectable={true}
                     view={viewType}
                     onView={setViewType}
+                    onRangeChange={handleRangeChange}
                     views={['month', 'week', 'day']}
                 />
             </div>
@@ -45,7 +45,7 @@ const TaskDashboard = () => {
                 const [timeSlotsRes, teamMembersRes, historyRes] = await Promise.all([
                     axios.get('http://localhost:8000/api/time-slots/'),
                     axios.get('http://localhost:8000/api/team-members/'),
-                    axios.get('http://localhost:8000/api/task-history/')
+                    axios.get('http://localhost:8000/api/task-history/', { params: { limit: 10 } })
                 ]);
                 
                 // Sort time slots by order
@@ -104,6 +104,44 @@ const TaskDashboard = () => {
         fetchTasks();
     }, [activeTimeSlotId, currentDate]);
 
+    // Patch a task group's latest sign-off in place
+    const applySignOff = (taskGroupId, latestSignoff) => {
+        setCompanies(prevCompanies => prevCompanies.map(company => ({
+            ...company,
+            task_groups: company.task_groups.map(taskGroup => (
+                taskGroup.id === taskGroupId
+                    ? { ...taskGroup, latest_signoff: latestSignoff }
+                    : taskGroup
+            ))
+        })));
+    };
+
+    // Receive other operators' sign-offs for the visible date and time slot
+    useEffect(() => {
+        if (!activeTimeSlotId || typeof EventSource === 'undefined') return;
+        
+        const source = new EventSource(
+            `http://localhost:8000/api/task-signoffs/stream/?time_slot=${activeTimeSlotId}&date=${currentDate}`
+        );
+        
+        source.addEventListener('signoff', (e) => {
+            const event = JSON.parse(e.data);
+            applySignOff(event.task_group, event.latest_signoff);
+        });
+        
+        // The server dropped events for us, so reload the dashboard
+        source.addEventListener('resync', async () => {
+            const response = await axios.get(
+                `http://localhost:8000/api/companies/with_tasks/?time_slot=${activeTimeSlotId}&date=${currentDate}`
+            );
+            setCompanies(response.data.filter(
+                company => company.task_groups && company.task_groups.length > 0
+            ));
+        });
+        
+        return () => source.close();
+    }, [activeTimeSlotId, currentDate]);
+
     // Handle time slot tab click
     const handleTimeSlotClick = (timeSlotId) => {
         setActiveTimeSlotId(timeSlotId);
@@ -118,27 +156,24 @@ const TaskDashboard = () => {
     // Handle sign off completion
     const handleSignOffComplete = async (taskGroupId, teamMemberId, notes) => {
         try {
-            await axios.post('http://localhost:8000/api/task-signoffs/sign_off/', {
+            const response = await axios.post('http://localhost:8000/api/task-signoffs/sign_off/', {
                 task_group_id: taskGroupId,
                 team_member_id: teamMemberId,
                 notes: notes,
                 completed_date: currentDate
             });
+            const signOff = response.data;
 
-            // Refresh task data
-            const response = await axios.get(
-                `http://localhost:8000/api/companies/with_tasks/?time_slot=${activeTimeSlotId}&date=${currentDate}`
-            );
-            
-            const companiesWithTasks = response.data.filter(
-                company => company.task_groups && company.task_groups.length > 0
-            );
-            
-            setCompanies(companiesWithTasks);
-            
-            // Refresh history
-            const historyRes = await axios.get('http://localhost:8000/api/task-history/');
-            setTaskHistory(historyRes.data);
+            // Patch task data and history from the sign-off instead of re-fetching
+            applySignOff(signOff.task_group, {
+                id: signOff.id,
+                team_member_name: signOff.team_member_name,
+                sign_off_date: signOff.sign_off_date
+            });
+            setTaskHistory(prevHistory => [
+                signOff,
+                ...prevHistory.filter(entry => entry.id !== signOff.id)
+            ]);
             
             // Close modal
             setShowSignOffModal(false);
@@ -1,7 +1,7 @@
 # scheduler/admin.py
 from django.contrib import admin
 from .models import (
-    Index, TeamMember, Job, 
+    Index, TeamMember, Job, JobSeries, JobOccurrence,
     Company, TimeSlot, TaskGroup, Task, TaskSignOff
 )
 
@@ -22,6 +22,18 @@ class JobAdmin(admin.ModelAdmin):
     search_fields = ('title', 'index__name', 'assigned_to__name')
     date_hierarchy = 'start_time'
 
+class JobOccurrenceInline(admin.TabularInline):
+    model = JobOccurrence
+    extra = 0
+    ordering = ('original_start',)
+
+@admin.register(JobSeries)
+class JobSeriesAdmin(admin.ModelAdmin):
+    list_display = ('title', 'index', 'start_time', 'recurrence', 'assigned_to')
+    list_filter = ('index', 'assigned_to')
+    search_fields = ('title', 'index__name', 'assigned_to__name')
+    inlines = [JobOccurrenceInline]
+
 # Admin classes for new models
 
 @admin.register(Company)
@@ -0,0 +1,75 @@
+# scheduler/archive.py
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .models import ArchivedSignOff, TaskSignOff
+from .versioning import bump
+from .writes import raw_delete
+
+# Sign-offs moved per archive transaction
+ARCHIVE_BATCH_SIZE = 2000
+
+
+def archive_horizon(days=None):
+    """The first completed date kept in the hot table."""
+    if days is None:
+        days = settings.SIGNOFF_ARCHIVE_DAYS
+    return date.today() - timedelta(days=days)
+
+
+def latest_archived_date():
+    """The newest completed date in the archive, or None when it is empty."""
+    return ArchivedSignOff.objects.aggregate(latest=Max('completed_date'))['latest']
+
+
+def _archived(signoff):
+    task_group = signoff.task_group
+    return ArchivedSignOff(
+        id=signoff.id,
+        task_group_id=task_group.id,
+        company_id=task_group.company_id,
+        time_slot_id=task_group.time_slot_id,
+        team_member_id=signoff.team_member_id,
+        task_group_name=task_group.name,
+        company_name=task_group.company.name,
+        time_slot_name=task_group.time_slot.name,
+        team_member_name=signoff.team_member.name,
+        sign_off_date=signoff.sign_off_date,
+        completed_date=signoff.completed_date,
+        notes=signoff.notes,
+    )
+
+
+def archive_signoffs(before, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move sign-offs completed before the given date into the archive database.
+
+    Each batch is copied into the archive first and only then deleted from
+    the hot table, so an interrupted run leaves rows in both places and the
+    next run finishes the move. The delete is a raw one that sends no
+    signals, and on purpose writes no ChangeLog tombstones and refreshes no
+    rollups: the rows are moved, not removed. History, the sign-off matrix
+    and the rollups read the archive too, so to every client the sign-offs
+    still exist, and a tombstone would make delta syncs drop rows that are
+    still there. Returns the number of sign-offs moved.
+    """
+    old = TaskSignOff.objects.filter(completed_date__lt=before).order_by('id')
+    moved = 0
+    while True:
+        batch = list(old.select_related(
+            'task_group__company', 'task_group__time_slot', 'team_member'
+        )[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic(using='archive'):
+            ArchivedSignOff.objects.bulk_create(
+                [_archived(signoff) for signoff in batch], ignore_conflicts=True
+            )
+        with transaction.atomic():
+            raw_delete(TaskSignOff.objects.filter(pk__in=[signoff.id for signoff in batch]))
+        moved += len(batch)
+    if moved:
+        bump('signoffs')
+    return moved
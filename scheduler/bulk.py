@@ -0,0 +1,160 @@
+# scheduler/bulk.py
+from django.db import transaction
+
+from .conflicts import batch_conflicts
+from .jobs import record_job_durations
+from .models import Index, TeamMember, Job
+from .serializers import BulkJobSerializer
+from .versioning import bump
+
+# Most create, update and assign items accepted in one bulk request
+MAX_BULK_ITEMS = 1000
+
+SECTIONS = ['create', 'update', 'assign']
+
+# Fields written back for updated and reassigned jobs
+UPDATE_FIELDS = ['index', 'title', 'start_time', 'end_time', 'assigned_to', 'color', 'notes']
+
+
+class BulkJobError(Exception):
+    """A bulk job request that was rejected as a whole."""
+
+    def __init__(self, message, status, **details):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.details = details
+
+
+def _id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ids(values):
+    return {_id(value) for value in values} - {None}
+
+
+def _sections(data):
+    if not isinstance(data, dict):
+        raise BulkJobError("Expected an object with create, update and assign lists.", 400)
+    sections = {}
+    for section in SECTIONS:
+        items = data.get(section) or []
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise BulkJobError(f"{section} must be a list of objects.", 400)
+        sections[section] = items
+    total = sum(len(items) for items in sections.values())
+    if total > MAX_BULK_ITEMS:
+        raise BulkJobError(f"At most {MAX_BULK_ITEMS} items can be sent at once.", 400)
+    return sections
+
+
+def apply_bulk_jobs(data):
+    """Validate and apply a batch of job creates, updates and assignments.
+
+    The batch is all-or-nothing: related objects are loaded with one query
+    per model, every item is validated before anything is written, the
+    whole batch is checked for double-bookings at once, and the writes are
+    a single bulk insert and bulk update in one transaction. Returns the
+    created and updated jobs; raises BulkJobError with per-item details
+    when the batch is refused. Double-bookings are allowed with "force".
+    """
+    sections = _sections(data)
+    creates, updates, assigns = sections['create'], sections['update'], sections['assign']
+
+    jobs = Job.objects.select_related('index', 'assigned_to').in_bulk(
+        _ids(item.get('id') for item in updates + assigns)
+    )
+    context = {
+        'indexes': Index.objects.in_bulk(
+            _ids(item.get('index') for item in creates + updates)
+        ),
+        'team_members': TeamMember.objects.in_bulk(
+            _ids(item.get('assigned_to') for item in creates + updates)
+            | _ids(item.get('team_member_id') for item in assigns)
+        ),
+    }
+
+    errors = {}
+    # (section, position, job) for every item, in request order
+    planned = []
+
+    for position, item in enumerate(creates):
+        serializer = BulkJobSerializer(data=item, context=context)
+        if serializer.is_valid():
+            planned.append(('create', position, Job(**serializer.validated_data)))
+        else:
+            errors.setdefault('create', {})[position] = serializer.errors
+
+    for position, item in enumerate(updates):
+        job = jobs.get(_id(item.get('id')))
+        if job is None:
+            errors.setdefault('update', {})[position] = {'id': ['Job not found.']}
+            continue
+        serializer = BulkJobSerializer(job, data=item, partial=True, context=context)
+        if serializer.is_valid():
+            for field, value in serializer.validated_data.items():
+                setattr(job, field, value)
+            planned.append(('update', position, job))
+        else:
+            errors.setdefault('update', {})[position] = serializer.errors
+
+    for position, item in enumerate(assigns):
+        job = jobs.get(_id(item.get('id')))
+        if job is None:
+            errors.setdefault('assign', {})[position] = {'id': ['Job not found.']}
+            continue
+        member_id = item.get('team_member_id')
+        if member_id in (None, ''):
+            job.assigned_to = None
+        else:
+            member = context['team_members'].get(_id(member_id))
+            if member is None:
+                errors.setdefault('assign', {})[position] = {
+                    'team_member_id': ['Team member not found.']
+                }
+                continue
+            job.assigned_to = member
+        planned.append(('assign', position, job))
+
+    for section, position, job in planned:
+        if job.start_time >= job.end_time:
+            errors.setdefault(section, {}).setdefault(position, {})['end_time'] = [
+                'End time must be after start time.'
+            ]
+    if errors:
+        raise BulkJobError("Some items are invalid; nothing was saved.", 400, errors=errors)
+
+    # A job updated and reassigned in the same request is written once
+    unique_jobs = list({id(job): job for _, _, job in planned}.values())
+    if not data.get('force'):
+        clashes = batch_conflicts(unique_jobs)
+        if clashes:
+            labels = {}
+            for section, position, job in planned:
+                labels.setdefault(id(job), f'{section}[{position}]')
+            conflicts = {}
+            for position, others in clashes.items():
+                job = unique_jobs[position]
+                conflicts[labels[id(job)]] = sorted(
+                    {labels[id(unique_jobs[other[1]])] if isinstance(other, tuple) else other
+                     for other in others},
+                    key=str
+                )
+            raise BulkJobError(
+                "Some assignments double-book team members; nothing was saved.",
+                409, conflicts=conflicts
+            )
+
+    created = [job for job in unique_jobs if job.pk is None]
+    updated = [job for job in unique_jobs if job.pk is not None]
+    with transaction.atomic():
+        Job.objects.bulk_create(created)
+        Job.objects.bulk_update(updated, UPDATE_FIELDS)
+        # Bulk writes send no model signals
+        record_job_durations(created + updated)
+        bump('jobs')
+    return created, updated
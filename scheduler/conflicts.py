@@ -0,0 +1,201 @@
+# scheduler/conflicts.py
+import heapq
+from collections import defaultdict
+from datetime import timedelta, timezone as datetime_timezone
+
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .jobs import overlapping
+from .models import Job, JobOccurrence
+from .recurrence import expand_series, occurrence_starts
+
+# Days ahead of a series' start (or today) its occurrences are checked for double-bookings
+SERIES_CONFLICT_DAYS = 90
+
+
+def assigned_occurrences(start, end, member_ids=None):
+    """Return the assigned series occurrences overlapping [start, end), optionally for some members."""
+    return [
+        occurrence for occurrence in expand_series(start, end)
+        if occurrence.assigned_to is not None
+        and (member_ids is None or occurrence.assigned_to.id in member_ids)
+    ]
+
+
+def member_conflicts(member_id, start, end, exclude_job_id=None, exclude_occurrence=None,
+                     exclude_series_id=None):
+    """Return the ids of the member's jobs and series occurrences overlapping [start, end).
+
+    Jobs come from an indexed probe on (assigned_to, start_time), so its
+    cost does not grow with the member's history; occurrences, whose ids
+    are "series:original start" strings, are expanded for the window only.
+    exclude_occurrence is a (series id, original start) pair.
+    """
+    jobs = overlapping(Job.objects.filter(assigned_to_id=member_id), start, end)
+    if exclude_job_id is not None:
+        jobs = jobs.exclude(pk=exclude_job_id)
+    booked = [(job_start, job_id) for job_id, job_start in jobs.values_list('id', 'start_time')]
+    for occurrence in assigned_occurrences(start, end, {member_id}):
+        series_id = occurrence.series.id
+        if series_id != exclude_series_id and (series_id, occurrence.original_start) != exclude_occurrence:
+            booked.append((occurrence.start_time, occurrence.id))
+    booked.sort(key=lambda booking: booking[0])
+    return [ref for _, ref in booked]
+
+
+def series_conflicts(series, member_id):
+    """Return the member's bookings that a new or changed series would overlap.
+
+    The series' generated occurrences are checked over SERIES_CONFLICT_DAYS
+    from its start, or from now for a series already running. Occurrences
+    it has stored overrides for keep their own time and assignee, so they
+    are skipped, as are the series' current occurrences.
+    """
+    start = max(series.start_time, timezone.now())
+    end = start + timedelta(days=SERIES_CONFLICT_DAYS)
+    overridden = set()
+    if series.pk:
+        overridden = set(JobOccurrence.objects.filter(series_id=series.pk).values_list(
+            'original_start', flat=True
+        ))
+    conflicts = []
+    for original_start in occurrence_starts(series, start, end):
+        if original_start in overridden:
+            continue
+        for ref in member_conflicts(
+            member_id, original_start, original_start + series.duration, exclude_series_id=series.pk
+        ):
+            if ref not in conflicts:
+                conflicts.append(ref)
+    return conflicts
+
+
+def find_conflicts(start=None, end=None):
+    """Report every double-booking among assigned jobs and occurrences overlapping [start, end).
+
+    Rows are ordered by member and start time, then swept once per member:
+    a job conflicts with the earlier job that runs furthest past its start.
+    Each overlapping job is reported once, against that job, rather than
+    listing every overlapping pair. Series occurrences take part as jobs
+    with "series:original start" ids; an open bound is closed at the
+    assigned jobs' extent before the series are expanded.
+    """
+    jobs = overlapping(Job.objects.filter(assigned_to__isnull=False), start, end)
+    window_start, window_end = start, end
+    if start is None or end is None:
+        extent = jobs.aggregate(first=Min('start_time'), last=Max('end_time'))
+        window_start, window_end = start or extent['first'], end or extent['last']
+    occurrences = []
+    if window_start is not None and window_end is not None:
+        occurrences = assigned_occurrences(window_start, window_end)
+
+    # Members without occurrences are swept straight from the cursor
+    members = {occurrence.assigned_to.id for occurrence in occurrences}
+    rows = jobs.exclude(assigned_to_id__in=members).order_by(
+        'assigned_to_id', 'start_time'
+    ).values_list('id', 'assigned_to_id', 'start_time', 'end_time')
+    conflicts = list(_sweep(_raw_rows(rows)))
+    if members:
+        mixed = list(jobs.filter(assigned_to_id__in=members).values_list(
+            'id', 'assigned_to_id', 'start_time', 'end_time'
+        ))
+        mixed.extend(
+            (occurrence.id, occurrence.assigned_to.id, occurrence.start_time, occurrence.end_time)
+            for occurrence in occurrences
+        )
+        mixed.sort(key=lambda row: (row[1], row[2]))
+        conflicts.extend(_sweep(mixed))
+        conflicts.sort(key=lambda conflict: (conflict['team_member'], conflict['overlap_start']))
+    return conflicts
+
+
+def _sweep(rows):
+    member = None
+    furthest_id = furthest_end = None
+    for job_id, member_id, job_start, job_end in rows:
+        if member_id != member:
+            member = member_id
+            furthest_id, furthest_end = job_id, job_end
+            continue
+        if job_start < furthest_end:
+            yield {
+                'team_member': member_id,
+                'job': job_id,
+                'conflicts_with': furthest_id,
+                'overlap_start': _aware(job_start),
+                'overlap_end': _aware(min(job_end, furthest_end)),
+            }
+        if job_end > furthest_end:
+            furthest_id, furthest_end = job_id, job_end
+
+
+def batch_conflicts(jobs):
+    """Find double-bookings caused by a batch of jobs about to be written.
+
+    Each job is checked against the other jobs in the batch, against
+    stored jobs (other than those being rewritten) in a single query, and
+    against the series occurrences of the window.
+    Returns a dict mapping the position of each conflicting job in the batch
+    to what it clashes with: stored job ids and ('batch', position) pairs.
+    """
+    assigned = [(position, job) for position, job in enumerate(jobs) if job.assigned_to_id]
+    if not assigned:
+        return {}
+
+    rewritten = {job.pk for job in jobs if job.pk}
+    start = min(job.start_time for _, job in assigned)
+    end = max(job.end_time for _, job in assigned)
+    stored = overlapping(
+        Job.objects.filter(assigned_to_id__in={job.assigned_to_id for _, job in assigned}),
+        start, end
+    ).exclude(pk__in=rewritten).values_list('id', 'assigned_to_id', 'start_time', 'end_time')
+
+    by_member = defaultdict(list)
+    for job_id, member_id, job_start, job_end in stored:
+        by_member[member_id].append((job_start, job_end, job_id))
+    for occurrence in assigned_occurrences(start, end, {job.assigned_to_id for _, job in assigned}):
+        by_member[occurrence.assigned_to.id].append(
+            (occurrence.start_time, occurrence.end_time, occurrence.id)
+        )
+    for position, job in assigned:
+        by_member[job.assigned_to_id].append((job.start_time, job.end_time, ('batch', position)))
+
+    conflicts = defaultdict(list)
+    for intervals in by_member.values():
+        intervals.sort(key=lambda interval: interval[0])
+        active = []  # Heap of (end, sequence, ref) for intervals still running
+        for sequence, (job_start, job_end, ref) in enumerate(intervals):
+            while active and active[0][0] <= job_start:
+                heapq.heappop(active)
+            for _, _, other in active:
+                if isinstance(ref, tuple):
+                    conflicts[ref[1]].append(other)
+                if isinstance(other, tuple):
+                    conflicts[other[1]].append(ref)
+            heapq.heappush(active, (job_end, sequence, ref))
+    return dict(conflicts)
+
+
+def _raw_rows(queryset, batch_size=10000):
+    """Yield a values_list queryset's rows straight from the database cursor.
+
+    This skips the ORM's per-value converters, which dominate the cost of a
+    sweep over 100k jobs. Timestamps within one backend compare correctly
+    either way, so only the reported ones are made aware.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+def _aware(value):
+    if timezone.is_naive(value):
+        return timezone.make_aware(value, datetime_timezone.utc)
+    return value
@@ -0,0 +1,287 @@
+# scheduler/dashboard.py
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch
+from .archive import latest_archived_date
+from .models import Company, TimeSlot, TaskGroup, TaskSignOff, DashboardSnapshot, ArchivedSignOff
+from .serializers import (
+    CompanyTasksSerializer, TaskGroupSerializer, TaskGroupWithSignoffsSerializer, signoff_summary
+)
+from .versioning import bump, current_versions
+
+# Model families whose changes the stored snapshots are patched for
+SNAPSHOT_FAMILIES = ['runbook', 'signoffs', 'team', 'time_slots']
+
+
+def runbook_task_groups(time_slot_id=None, company_id=None):
+    """Task groups with their company and time slot joined, in dashboard order."""
+    task_groups = TaskGroup.objects.select_related('company', 'time_slot').order_by('id')
+    if time_slot_id:
+        task_groups = task_groups.filter(time_slot_id=time_slot_id)
+    if company_id:
+        task_groups = task_groups.filter(company_id=company_id)
+    return task_groups
+
+
+def dashboard_companies(time_slot_id=None, day=None):
+    """Build the company -> task group -> tasks -> sign-off queryset for a day.
+
+    Everything the dashboard serializers need is fetched with filtered
+    prefetches, so evaluating the queryset costs four queries no matter how
+    many companies, task groups or tasks the runbook holds.
+    """
+    task_groups = runbook_task_groups(time_slot_id)
+
+    signoffs = TaskSignOff.objects.select_related('team_member').filter(completed_date=day)
+
+    task_groups = task_groups.prefetch_related(
+        'tasks',
+        Prefetch('signoffs', queryset=signoffs, to_attr='day_signoffs'),
+    )
+
+    return Company.objects.order_by('name').prefetch_related(
+        Prefetch('task_groups', queryset=task_groups, to_attr='dashboard_task_groups')
+    )
+
+
+def build_dashboard(time_slot_id, day):
+    """Serialize the dashboard for a day, leaving out companies with no task groups."""
+    serializer = CompanyTasksSerializer(
+        dashboard_companies(time_slot_id, day),
+        many=True,
+        context={'time_slot_id': time_slot_id, 'today': day}
+    )
+    return [company for company in serializer.data if company['task_groups']]
+
+
+def signoff_matrix(start, end, time_slot_id=None, company_id=None):
+    """Return the runbook structure once plus a task group x date sign-off matrix.
+
+    Each matrix row lists, per date from start to end inclusive, how many
+    sign-offs the task group received. The counts come from one grouped
+    query (plus one on the archive for old ranges), so the cost does not
+    grow with the length of the range.
+    """
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    column = {day: position for position, day in enumerate(days)}
+
+    task_groups = runbook_task_groups(time_slot_id, company_id).prefetch_related('tasks')
+    companies = Company.objects.order_by('name').prefetch_related(
+        Prefetch('task_groups', queryset=task_groups, to_attr='dashboard_task_groups')
+    )
+    if company_id:
+        companies = companies.filter(pk=company_id)
+
+    structure = []
+    matrix = {}
+    for company in companies:
+        if not company.dashboard_task_groups:
+            continue
+        structure.append({
+            'id': company.id,
+            'name': company.name,
+            'description': company.description,
+            'task_groups': TaskGroupSerializer(company.dashboard_task_groups, many=True).data,
+        })
+        for task_group in company.dashboard_task_groups:
+            matrix[task_group.id] = [0] * len(days)
+
+    counts = TaskSignOff.objects.filter(completed_date__range=(start, end))
+    if time_slot_id:
+        counts = counts.filter(task_group__time_slot_id=time_slot_id)
+    if company_id:
+        counts = counts.filter(task_group__company_id=company_id)
+    counts = [counts]
+    # Ranges reaching into archived history count the archived sign-offs too
+    archived_until = latest_archived_date()
+    if archived_until is not None and archived_until >= start:
+        archived = ArchivedSignOff.objects.filter(completed_date__range=(start, end))
+        if time_slot_id:
+            archived = archived.filter(time_slot_id=time_slot_id)
+        if company_id:
+            archived = archived.filter(company_id=company_id)
+        counts.append(archived)
+    for source in counts:
+        for row in source.values('task_group_id', 'completed_date').annotate(
+            signoffs=Count('id')
+        ).order_by():
+            if row['task_group_id'] in matrix:
+                matrix[row['task_group_id']][column[row['completed_date']]] += row['signoffs']
+
+    return {
+        'dates': days,
+        'companies': structure,
+        'matrix': matrix,
+    }
+
+
+def get_dashboard(time_slot_id, day):
+    """Return the dashboard payload, serving the stored snapshot when there is one."""
+    snapshot = DashboardSnapshot.objects.filter(
+        completed_date=day, time_slot_id=time_slot_id
+    ).only('payload').first()
+    if snapshot is not None:
+        return snapshot.payload
+
+    versions = current_versions(SNAPSHOT_FAMILIES)
+    data = build_dashboard(time_slot_id, day)
+    # A change committed while building may have found no snapshot to patch,
+    # so only store what was built from a quiet database
+    if versions != current_versions(SNAPSHOT_FAMILIES):
+        return data
+    # Unknown time slots are answered but never stored
+    if time_slot_id is None or TimeSlot.objects.filter(pk=time_slot_id).exists():
+        DashboardSnapshot.objects.get_or_create(
+            completed_date=day, time_slot_id=time_slot_id, defaults={'payload': data}
+        )
+    return data
+
+
+def snapshot_horizon(days=None):
+    """The first completed date whose stored snapshots are kept up to date in place."""
+    if days is None:
+        days = settings.DASHBOARD_SNAPSHOT_DAYS
+    return date.today() - timedelta(days=days)
+
+
+def prune_snapshots(days=None):
+    """Delete the snapshots of days before the horizon, returning how many went.
+
+    Old days are rarely viewed, so they are rebuilt on their next read
+    rather than kept, and patched, forever.
+    """
+    deleted, _ = DashboardSnapshot.objects.filter(completed_date__lt=snapshot_horizon(days)).delete()
+    return deleted
+
+
+def clear_snapshots():
+    """Drop every stored snapshot; they are rebuilt on the next read."""
+    DashboardSnapshot.objects.all().delete()
+    bump('dashboard')
+
+
+def _find_task_group(payload, task_group_id):
+    for company in payload:
+        for position, entry in enumerate(company['task_groups']):
+            if entry['id'] == task_group_id:
+                return company, position
+    return None, None
+
+
+def refresh_signoffs(keys):
+    """Patch the latest sign-off of each (task group, date) pair in stored snapshots."""
+    keys = set(keys)
+    if not keys:
+        return
+    days = {day for _, day in keys}
+    task_group_ids = {task_group_id for task_group_id, _ in keys}
+
+    with transaction.atomic():
+        snapshots = list(
+            DashboardSnapshot.objects.select_for_update().filter(completed_date__in=days)
+        )
+        if not snapshots:
+            return
+
+        # Sign-offs are ordered newest first, so the first one seen per key wins
+        latest = {}
+        signoffs = TaskSignOff.objects.select_related('team_member').filter(
+            task_group_id__in=task_group_ids, completed_date__in=days
+        )
+        for signoff in signoffs:
+            latest.setdefault((signoff.task_group_id, signoff.completed_date), signoff)
+
+        for snapshot in snapshots:
+            changed = False
+            for task_group_id in task_group_ids:
+                key = (task_group_id, snapshot.completed_date)
+                if key not in keys:
+                    continue
+                company, position = _find_task_group(snapshot.payload, task_group_id)
+                if company is None:
+                    continue
+                signoff = latest.get(key)
+                company['task_groups'][position]['latest_signoff'] = (
+                    signoff_summary(signoff) if signoff else None
+                )
+                changed = True
+            if changed:
+                snapshot.save(update_fields=['payload', 'updated_at'])
+        # Readers may have tagged an unpatched snapshot with the new model versions
+        bump('dashboard')
+
+
+def refresh_task_groups(task_group_ids):
+    """Re-serialize the given task groups in the stored snapshots of recent days.
+
+    Groups that no longer exist are removed, groups that moved to another
+    time slot are moved between snapshots, and companies left without task
+    groups are dropped, so the snapshot matches what build_dashboard would
+    produce. Snapshots of days before the horizon are deleted instead, so
+    an edit's cost does not grow with the days ever viewed.
+    """
+    task_group_ids = set(task_group_ids)
+    if not task_group_ids:
+        return
+
+    with transaction.atomic():
+        pruned = prune_snapshots()
+        snapshots = list(
+            DashboardSnapshot.objects.select_for_update().filter(completed_date__gte=snapshot_horizon())
+        )
+        if not snapshots:
+            if pruned:
+                bump('dashboard')
+            return
+
+        task_groups = {
+            task_group.id: task_group
+            for task_group in TaskGroup.objects.filter(pk__in=task_group_ids)
+            .select_related('company', 'time_slot')
+            .prefetch_related('tasks')
+        }
+        latest = {}
+        signoffs = TaskSignOff.objects.select_related('team_member').filter(
+            task_group_id__in=task_groups,
+            completed_date__in={snapshot.completed_date for snapshot in snapshots}
+        )
+        for signoff in signoffs:
+            latest.setdefault((signoff.task_group_id, signoff.completed_date), signoff)
+
+        for snapshot in snapshots:
+            payload = snapshot.payload
+            for task_group_id in task_group_ids:
+                company, position = _find_task_group(payload, task_group_id)
+                if company is not None:
+                    del company['task_groups'][position]
+
+                task_group = task_groups.get(task_group_id)
+                if task_group is None:
+                    continue
+                if snapshot.time_slot_id not in (None, task_group.time_slot_id):
+                    continue
+
+                signoff = latest.get((task_group_id, snapshot.completed_date))
+                task_group.day_signoffs = [signoff] if signoff else []
+                entry = TaskGroupWithSignoffsSerializer(
+                    task_group, context={'today': snapshot.completed_date}
+                ).data
+
+                company = next((c for c in payload if c['id'] == task_group.company_id), None)
+                if company is None:
+                    company = {
+                        'id': task_group.company.id,
+                        'name': task_group.company.name,
+                        'description': task_group.company.description,
+                        'task_groups': [],
+                    }
+                    payload.append(company)
+                    payload.sort(key=lambda c: c['name'])
+                company['task_groups'].append(entry)
+                company['task_groups'].sort(key=lambda tg: tg['id'])
+
+            snapshot.payload = [company for company in payload if company['task_groups']]
+            snapshot.save(update_fields=['payload', 'updated_at'])
+        bump('dashboard')
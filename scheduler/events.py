@@ -0,0 +1,100 @@
+# scheduler/events.py
+import asyncio
+import json
+import threading
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .serializers import signoff_summary
+
+# Events a subscriber may fall behind by before it is told to resync
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """A single stream client, fed on its own event loop."""
+
+    def __init__(self, loop, completed_date=None, time_slot_id=None):
+        self.loop = loop
+        self.completed_date = completed_date
+        self.time_slot_id = time_slot_id
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.overflowed = False
+
+    def matches(self, event):
+        if self.completed_date and event['completed_date'] != self.completed_date:
+            return False
+        if self.time_slot_id and event['time_slot'] != self.time_slot_id:
+            return False
+        return True
+
+    def deliver(self, message):
+        # Runs on the subscriber's loop
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Drop the backlog and tell the client to reload instead
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class SignOffBroker:
+    """In-process fan-out of sign-off events to stream subscribers.
+
+    Subscribers are asyncio queues rather than threads, so one event loop
+    can serve hundreds of open streams. Publishing is thread-safe and never
+    blocks, which lets synchronous views publish directly.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, completed_date=None, time_slot_id=None):
+        subscription = Subscription(asyncio.get_running_loop(), completed_date, time_slot_id)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        """Send an event to every matching subscriber.
+
+        The event is encoded once and handed to each subscriber's loop.
+        """
+        message = json.dumps(event, cls=JSONEncoder)
+        with self._lock:
+            subscribers = [s for s in self._subscribers if s.matches(event)]
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's loop has already closed
+                self.unsubscribe(subscription)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+
+broker = SignOffBroker()
+
+
+def signoff_event(signoff, created):
+    """Build the event published when a sign-off is created or updated."""
+    task_group = signoff.task_group
+    return {
+        'type': 'signoff.created' if created else 'signoff.updated',
+        'task_group': task_group.id,
+        'company': task_group.company_id,
+        'time_slot': task_group.time_slot_id,
+        'completed_date': signoff.completed_date.isoformat(),
+        'latest_signoff': signoff_summary(signoff),
+        'notes': signoff.notes,
+    }
@@ -0,0 +1,121 @@
+# scheduler/exports.py
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from .renderers import CSVRenderer, XLSXRenderer
+
+# Rows fetched per database round trip while an export streams
+EXPORT_CHUNK_SIZE = 2000
+
+# Bytes of CSV gathered before a chunk is sent
+EXPORT_WRITE_SIZE = 64 * 2**10
+
+JOB_HEADER = [
+    'id', 'series', 'title', 'index', 'assigned_to', 'start_time', 'end_time', 'hours',
+    'color', 'notes',
+]
+
+SIGNOFF_HEADER = [
+    'id', 'completed_date', 'sign_off_date', 'company', 'time_slot', 'task_group',
+    'team_member', 'notes', 'archived',
+]
+
+
+class _Echo:
+    """File-like object whose write hands the text straight back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(header, rows):
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(header)]
+    buffered = 0
+    for row in rows:
+        line = writer.writerow([
+            value.isoformat() if isinstance(value, datetime) else value for value in row
+        ])
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= EXPORT_WRITE_SIZE:
+            yield ''.join(buffer)
+            buffer, buffered = [], 0
+    yield ''.join(buffer)
+
+
+def _xlsx_file(title, header, rows):
+    from openpyxl import Workbook
+
+    # Write-only sheets spool rows to disk, and the workbook is saved to a temp file
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(header)
+    for row in rows:
+        sheet.append([
+            timezone.localtime(value).replace(tzinfo=None)
+            if isinstance(value, datetime) and timezone.is_aware(value) else value
+            for value in row
+        ])
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+def export_response(name, header, rows, file_format):
+    """Return rows as a downloadable CSV stream or XLSX file.
+
+    rows is an iterator, so neither format holds the export in memory: CSV
+    is written out as it is read, and XLSX is built on disk by openpyxl's
+    write-only mode and then streamed from there.
+    """
+    filename = f'{name}-{timezone.localdate().isoformat()}.{file_format}'
+    if file_format == XLSXRenderer.format:
+        return FileResponse(
+            _xlsx_file(name, header, rows), as_attachment=True, filename=filename,
+            content_type=XLSXRenderer.media_type
+        )
+    response = StreamingHttpResponse(
+        _csv_chunks(header, rows), content_type=f'{CSVRenderer.media_type}; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def job_rows(jobs, occurrences=()):
+    """Export rows for jobs, read as tuples, then any recurring occurrences."""
+    for job_id, title, index, member, start, end, color, notes in jobs.values_list(
+        'id', 'title', 'index__name', 'assigned_to__name', 'start_time', 'end_time',
+        'color', 'notes'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        hours = round((end - start).total_seconds() / 3600, 2)
+        yield [job_id, None, title, index, member, start, end, hours, color, notes]
+    for occurrence in occurrences:
+        series = occurrence.series
+        hours = round((occurrence.end_time - occurrence.start_time).total_seconds() / 3600, 2)
+        yield [
+            occurrence.id, series.id, series.title, series.index.name,
+            occurrence.assigned_to.name if occurrence.assigned_to else None,
+            occurrence.start_time, occurrence.end_time, hours, series.color, occurrence.notes,
+        ]
+
+
+def signoff_rows(signoffs, archived):
+    """Export rows for sign-offs, read as tuples, followed by archived ones."""
+    yield from (
+        [*row, False] for row in signoffs.order_by('id').values_list(
+            'id', 'completed_date', 'sign_off_date', 'task_group__company__name',
+            'task_group__time_slot__name', 'task_group__name', 'team_member__name', 'notes'
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    yield from (
+        [*row, True] for row in archived.order_by('id').values_list(
+            'id', 'completed_date', 'sign_off_date', 'company_name', 'time_slot_name',
+            'task_group_name', 'team_member_name', 'notes'
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
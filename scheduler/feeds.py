@@ -0,0 +1,281 @@
+# scheduler/feeds.py
+import calendar
+from datetime import datetime, timedelta, timezone as datetime_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import Job, JobSeries, JobOccurrence
+from .versioning import current_versions
+
+PRODID = '-//Rebalance Scheduler//Job Calendar//EN'
+
+# Jobs fetched per database round trip while a feed streams
+FEED_CHUNK_SIZE = 2000
+
+# Bytes gathered before a chunk of the feed is sent
+FEED_WRITE_SIZE = 64 * 2**10
+
+# Feeds larger than this are streamed every time instead of being cached
+FEED_CACHE_MAX_BYTES = 256 * 2**10
+
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+def _escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Fold a content line at 75 octets, as RFC 5545 requires, without splitting characters."""
+    parts = []
+    current = ''
+    size = 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > 75:
+            parts.append(current)
+            current, size = ' ', 1
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n'.join(parts) + '\r\n'
+
+
+def _utc(value):
+    return value.astimezone(datetime_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _wall_clock(name, value):
+    # Series rules run on local wall-clock time, so their dates carry the zone
+    if settings.TIME_ZONE == 'UTC':
+        return f'{name}:{_utc(value)}'
+    local = timezone.localtime(value).strftime('%Y%m%dT%H%M%S')
+    return f'{name};TZID={settings.TIME_ZONE}:{local}'
+
+
+def _offset(delta):
+    minutes = int(delta.total_seconds()) // 60
+    sign = '-' if minutes < 0 else '+'
+    return f'{sign}{abs(minutes) // 60:02d}{abs(minutes) % 60:02d}'
+
+
+def _transitions(zone, year):
+    """The UTC instants in a year at which the zone's offset changes."""
+    moment = datetime(year, 1, 1, tzinfo=datetime_timezone.utc)
+    end = datetime(year + 1, 1, 1, tzinfo=datetime_timezone.utc)
+    while moment < end:
+        following = moment + timedelta(days=1)
+        if moment.astimezone(zone).utcoffset() != following.astimezone(zone).utcoffset():
+            low, high = moment, following
+            while high - low > timedelta(minutes=1):
+                middle = low + (high - low) / 2
+                if middle.astimezone(zone).utcoffset() == low.astimezone(zone).utcoffset():
+                    low = middle
+                else:
+                    high = middle
+            yield high.replace(second=0, microsecond=0)
+        moment = following
+
+
+def _first_rule_date(day, week):
+    """The date in 1970 on the same nth (or, for -1, last) weekday of the month as day."""
+    first_weekday, days = calendar.monthrange(1970, day.month)
+    if week > 0:
+        return datetime(1970, day.month, 1 + (day.weekday() - first_weekday) % 7 + 7 * (week - 1))
+    last_weekday = (first_weekday + days - 1) % 7
+    return datetime(1970, day.month, days - (last_weekday - day.weekday()) % 7)
+
+
+def _vtimezone():
+    """VTIMEZONE lines for settings.TIME_ZONE, the zone series dates are given in.
+
+    The offset changes of the current year become yearly rules on the
+    nth (or last) weekday of their month, which is how zones with daylight
+    saving time shift, starting in 1970 so they cover every series.
+    """
+    zone = timezone.get_default_timezone()
+    year = timezone.now().year
+    yield 'BEGIN:VTIMEZONE'
+    yield f'TZID:{settings.TIME_ZONE}'
+    transitions = list(_transitions(zone, year))
+    if not transitions:
+        standard = datetime(year, 1, 1, tzinfo=zone)
+        yield 'BEGIN:STANDARD'
+        yield 'DTSTART:19700101T000000'
+        yield f'TZOFFSETFROM:{_offset(standard.utcoffset())}'
+        yield f'TZOFFSETTO:{_offset(standard.utcoffset())}'
+        yield f'TZNAME:{standard.tzname()}'
+        yield 'END:STANDARD'
+    for moment in transitions:
+        before = (moment - timedelta(minutes=1)).astimezone(zone)
+        after = moment.astimezone(zone)
+        # Observances start at the local time the old offset would have shown
+        local = moment + before.utcoffset()
+        days = calendar.monthrange(year, local.month)[1]
+        week = -1 if local.day + 7 > days else (local.day - 1) // 7 + 1
+        kind = 'DAYLIGHT' if after.dst() else 'STANDARD'
+        yield f'BEGIN:{kind}'
+        yield f'DTSTART:{_first_rule_date(local, week):%Y%m%d}T{local:%H%M%S}'
+        yield f'RRULE:FREQ=YEARLY;BYMONTH={local.month};BYDAY={week}{WEEKDAYS[local.weekday()]}'
+        yield f'TZOFFSETFROM:{_offset(before.utcoffset())}'
+        yield f'TZOFFSETTO:{_offset(after.utcoffset())}'
+        yield f'TZNAME:{after.tzname()}'
+        yield f'END:{kind}'
+    yield 'END:VTIMEZONE'
+
+
+def _event(uid, start, end, title, stamp, notes='', index=None, member=None, extra=()):
+    description = '\n'.join(filter(None, [
+        f'Index: {index.name}' if index else '',
+        f'Assigned to: {member.name}' if member else 'Unassigned',
+        notes,
+    ]))
+    yield 'BEGIN:VEVENT'
+    yield f'UID:{uid}'
+    yield f'DTSTAMP:{stamp}'
+    yield from extra
+    if not any(line.startswith('DTSTART') for line in extra):
+        yield f'DTSTART:{_utc(start)}'
+        yield f'DTEND:{_utc(end)}'
+    yield f'SUMMARY:{_escape(title)}'
+    yield f'DESCRIPTION:{_escape(description)}'
+    yield 'END:VEVENT'
+
+
+def _series_events(series, stamp, member_id=None):
+    """The master event of a series plus its exceptions.
+
+    Cancelled occurrences, and in a member's feed those reassigned to
+    someone else, become EXDATEs; other overrides become RECURRENCE-ID
+    events replacing the generated occurrence.
+    """
+    rule = series.recurrence.strip()
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[len('RRULE:'):]
+    uid = f'series-{series.id}@rebalance-scheduler'
+
+    excluded = []
+    replaced = []
+    for override in series.overrides.all():
+        if override.cancelled or (member_id and override.assigned_to_id != member_id):
+            excluded.append(override)
+        else:
+            replaced.append(override)
+
+    yield from _event(
+        uid, None, None, series.title, stamp, series.notes, series.index, series.assigned_to,
+        extra=[
+            _wall_clock('DTSTART', series.start_time),
+            _wall_clock('DTEND', series.start_time + series.duration),
+            f'RRULE:{rule}',
+            *(_wall_clock('EXDATE', override.original_start) for override in excluded),
+        ],
+    )
+    for override in replaced:
+        yield from _event(
+            uid, override.start_time, override.end_time, series.title, stamp,
+            override.notes, series.index, override.assigned_to,
+            extra=[_wall_clock('RECURRENCE-ID', override.original_start)],
+        )
+
+
+def _calendar(name, jobs, series_list, moved_in=(), member_id=None):
+    stamp = _utc(timezone.now())
+    yield 'BEGIN:VCALENDAR'
+    yield 'VERSION:2.0'
+    yield f'PRODID:{PRODID}'
+    yield 'CALSCALE:GREGORIAN'
+    yield f'X-WR-CALNAME:{_escape(name)}'
+    # TZID references must be defined in the feed itself
+    if settings.TIME_ZONE != 'UTC':
+        yield from _vtimezone()
+    for job in jobs.iterator(chunk_size=FEED_CHUNK_SIZE):
+        yield from _event(
+            f'job-{job.id}@rebalance-scheduler', job.start_time, job.end_time,
+            job.title, stamp, job.notes, job.index, job.assigned_to,
+        )
+    for series in series_list:
+        yield from _series_events(series, stamp, member_id)
+    # Occurrences reassigned to the member from a series they don't own stand alone
+    for override in moved_in:
+        series = override.series
+        yield from _event(
+            f'series-{series.id}-{_utc(override.original_start)}@rebalance-scheduler',
+            override.start_time, override.end_time, series.title, stamp,
+            override.notes, series.index, override.assigned_to,
+        )
+    yield 'END:VCALENDAR'
+
+
+def _series(queryset):
+    overrides = JobOccurrence.objects.select_related('assigned_to').order_by('original_start')
+    return queryset.select_related('index', 'assigned_to').prefetch_related(
+        Prefetch('overrides', queryset=overrides)
+    ).order_by('id')
+
+
+def member_calendar(member):
+    """iCalendar lines for every job, series and occurrence assigned to a member."""
+    jobs = Job.objects.filter(assigned_to=member).select_related('index', 'assigned_to')
+    moved_in = JobOccurrence.objects.filter(
+        assigned_to=member, cancelled=False
+    ).exclude(series__assigned_to=member).select_related('series__index', 'assigned_to')
+    return _calendar(
+        member.name, jobs.order_by('start_time', 'id'),
+        _series(JobSeries.objects.filter(assigned_to=member)),
+        moved_in.order_by('start_time'), member_id=member.id,
+    )
+
+
+def index_calendar(index):
+    """iCalendar lines for every job and series of an index."""
+    jobs = Job.objects.filter(index=index).select_related('index', 'assigned_to')
+    return _calendar(
+        index.name, jobs.order_by('start_time', 'id'),
+        _series(JobSeries.objects.filter(index=index)),
+    )
+
+
+def cached_feed(key, lines):
+    """Yield the encoded feed, from the cache when the jobs have not changed.
+
+    A miss streams the lines as they are generated and stores the result
+    in the bounded 'feeds' cache once it is complete, unless it grew past
+    FEED_CACHE_MAX_BYTES; any job, index or team change moves the key on.
+    """
+    cache = caches['feeds']
+    versions = ','.join(map(str, current_versions(['jobs', 'indexes', 'team'])))
+    cache_key = f'scheduler:feed:{key}:{versions}'
+    body = cache.get(cache_key)
+    if body is not None:
+        yield body
+        return
+
+    chunks = []
+    size = 0
+    buffer = []
+    buffered = 0
+    for line in lines:
+        data = _fold(line).encode()
+        buffer.append(data)
+        buffered += len(data)
+        if buffered < FEED_WRITE_SIZE:
+            continue
+        chunk = b''.join(buffer)
+        buffer, buffered = [], 0
+        if chunks is not None:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > FEED_CACHE_MAX_BYTES:
+                chunks = None
+        yield chunk
+
+    chunk = b''.join(buffer)
+    yield chunk
+    if chunks is not None:
+        chunks.append(chunk)
+        cache.set(cache_key, b''.join(chunks))
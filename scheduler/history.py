@@ -0,0 +1,93 @@
+# scheduler/history.py
+import base64
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .archive import latest_archived_date
+from .models import ArchivedSignOff, TaskSignOff
+from .serializers import ArchivedSignOffSerializer, TaskSignOffSerializer
+
+# Sign-offs per day of the window on a page unless the client asks for a limit
+HISTORY_ROWS_PER_DAY = 10
+MAX_HISTORY_PAGE_SIZE = 500
+
+
+def encode_position(signoff):
+    """Opaque keyset position of a sign-off in newest-first history order."""
+    raw = f'{signoff.sign_off_date.isoformat()}|{signoff.id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_position(token):
+    """Return the (sign_off_date, id) a position token points at, or raise ValueError."""
+    try:
+        stamp, signoff_id = base64.urlsafe_b64decode(token.encode()).decode().split('|')
+        sign_off_date = parse_datetime(stamp)
+        signoff_id = int(signoff_id)
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid page position.")
+    if sign_off_date is None:
+        raise ValueError("Invalid page position.")
+    return sign_off_date, signoff_id
+
+
+def _page(signoffs, start, end, before, limit):
+    signoffs = signoffs.filter(
+        completed_date__gt=start, completed_date__lte=end
+    ).order_by('-sign_off_date', '-id')
+    if before is not None:
+        sign_off_date, signoff_id = before
+        # The plain bound lets the index seek; the OR only breaks ties within it
+        signoffs = signoffs.filter(sign_off_date__lte=sign_off_date).filter(
+            Q(sign_off_date__lt=sign_off_date) | Q(id__lt=signoff_id)
+        )
+    return list(signoffs[:limit + 1])
+
+
+def history_page(end, days, before=None, limit=None):
+    """Return one page of sign-offs completed in the days-long window ending on end.
+
+    Pages are ordered newest sign-off first and continue from a keyset
+    position rather than an offset. The index on (completed_date,
+    sign_off_date, id) confines each page to the window however old it is.
+    It only holds that order within one completed date, though, so a page
+    of a window spanning several days sorts the window's sign-offs past
+    the position: the cost of a page grows with the window, not with the
+    whole history. Pages hold days * HISTORY_ROWS_PER_DAY sign-offs unless
+    limit is given. Task group, company, time slot and member names come
+    from the same query. Windows reaching back past the archive horizon
+    read the archived sign-offs too and merge both pages, so old history
+    reads the same as recent history.
+
+    Returns (serialized sign-offs, next position or None).
+    """
+    start = end - timedelta(days=days)
+    limit = limit or days * HISTORY_ROWS_PER_DAY
+    if before is not None:
+        before = decode_position(before)
+
+    page = _page(
+        TaskSignOff.objects.select_related(
+            'task_group__company', 'task_group__time_slot', 'team_member'
+        ),
+        start, end, before, limit
+    )
+    archived_until = latest_archived_date()
+    if archived_until is not None and archived_until > start:
+        hot = {signoff.id for signoff in page}
+        # An interrupted archive run can leave a sign-off in both places
+        page += [
+            signoff for signoff in _page(ArchivedSignOff.objects.all(), start, end, before, limit)
+            if signoff.id not in hot
+        ]
+        page.sort(key=lambda signoff: (signoff.sign_off_date, signoff.id), reverse=True)
+
+    next_position = encode_position(page[limit - 1]) if len(page) > limit else None
+    data = [
+        (ArchivedSignOffSerializer if isinstance(signoff, ArchivedSignOff)
+         else TaskSignOffSerializer)(signoff).data
+        for signoff in page[:limit]
+    ]
+    return data, next_position
@@ -0,0 +1,650 @@
+# scheduler/importer.py
+import csv
+import numbers
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+import django
+import pandas as pd
+from django.db import connection, transaction
+from openpyxl import load_workbook
+
+from .models import ChangeLog, Company, TaskGroup, Task, TimeSlot
+from .versioning import bump
+from .writes import delete_task_groups, raw_delete
+from . import dashboard
+
+RUNBOOK_SHEET = 'Runbook'
+
+# Runbook columns; the unlabelled second column holds the time of day
+COMPANY_COLUMN = 'Customer'
+TIME_SLOT_COLUMN = 'Unnamed: 1'
+TASK_COLUMN = 'Task'
+TIME_COLUMN = 'Dallas Time'
+RUNBOOK_COLUMNS = [COMPANY_COLUMN, TIME_SLOT_COLUMN, TASK_COLUMN, TIME_COLUMN]
+
+# Time slots created on import, with their sort order
+DEFAULT_TIME_SLOTS = {
+    'Morning': 1,
+    'Afternoon 1': 2,
+    'Afternoon 2': 3,
+    'T3': 4,
+}
+
+# Rows written per bulk insert
+IMPORT_BATCH_SIZE = 5000
+
+# Counts reported by an incremental import
+SYNC_COUNTS = [
+    'rows', 'companies', 'task_groups', 'updated_task_groups', 'unchanged_task_groups',
+    'removed_task_groups', 'tasks', 'reordered_tasks', 'removed_tasks', 'removed_signoffs',
+]
+
+
+def _cell(value):
+    # As pandas reads cells: whole-number floats become ints
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _csv_time(value):
+    # CSV cells are text; a number in the time column is an Excel day fraction
+    try:
+        return _cell(float(value))
+    except (TypeError, ValueError):
+        return value
+
+
+def _runbook_rows(rows, cell):
+    header = next(rows, None)
+    if header is None:
+        return
+    # Unlabelled columns are named the way pandas names them
+    names = [
+        f'Unnamed: {position}' if value is None or value == '' else str(value)
+        for position, value in enumerate(header)
+    ]
+    missing = [column for column in RUNBOOK_COLUMNS if column not in names]
+    if missing:
+        raise ValueError(f"missing runbook columns: {', '.join(missing)}")
+    positions = [names.index(column) for column in RUNBOOK_COLUMNS]
+    for row in rows:
+        yield tuple(cell(row[position]) if position < len(row) else None for position in positions)
+
+
+def read_runbook_rows(path, sheet=RUNBOOK_SHEET):
+    """Yield the runbook columns of each row of a workbook sheet, or of a CSV file.
+
+    Rows are streamed: a workbook is opened read-only, so only the sheet
+    being read is parsed and none of it is held in memory.
+    """
+    if str(path).lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            for *row, slot_time in _runbook_rows(csv.reader(handle), lambda value: value or None):
+                yield (*row, _csv_time(slot_time))
+        return
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet not in workbook.sheetnames:
+            raise ValueError(f"no sheet named {sheet!r}")
+        yield from _runbook_rows(workbook[sheet].iter_rows(values_only=True), _cell)
+    finally:
+        workbook.close()
+
+
+def read_runbook(path, sheet=RUNBOOK_SHEET, chunk_size=IMPORT_BATCH_SIZE):
+    """Yield the runbook of a workbook sheet or CSV file as frames of chunk_size rows."""
+    rows = read_runbook_rows(path, sheet)
+    while chunk := list(islice(rows, chunk_size)):
+        yield pd.DataFrame.from_records(chunk, columns=RUNBOOK_COLUMNS)
+
+
+def dallas_time(value):
+    """Format a Dallas time cell: Excel day fractions become HH:MM, text is kept, anything else is None."""
+    if isinstance(value, numbers.Real):
+        # Rounded to the minute: 09:30 is stored as 0.395833...
+        hours, minutes = divmod(round(value * 24 * 60), 60)
+        return f"{hours:02d}:{minutes:02d}"
+    if isinstance(value, str):
+        return value
+    return None
+
+
+def _text(column):
+    return column.fillna('').astype(str).str.strip()
+
+
+class RunbookParser:
+    """Resolve runbook rows into task groups and their tasks.
+
+    The rules are import_tasks.py's, applied a frame at a time with column
+    operations instead of row by row. Only rows with a task count. A
+    company cell, or a known time slot, sets the context for the rows
+    below it and starts a task group, as does a row whose next row names a
+    company or any time slot. Other rows are tasks of the group above
+    them. Groups are keyed by company, time slot and name, so a repeated
+    group collects the tasks of each of its appearances, and a task
+    repeated within a group is kept once.
+
+    The position in the hierarchy carries over between calls to feed, so a
+    runbook can be parsed in chunks.
+    """
+
+    def __init__(self, time_slot_names):
+        self.time_slot_names = list(time_slot_names)
+        self.company = None
+        self.time_slot = None
+        self.group = None
+        # Whether the next row in context starts a group; None until the next chunk says
+        self.starts_group = True
+        self.group_ids = {}
+        self.task_keys = set()
+        self.task_counts = {}
+
+    def feed(self, frame):
+        """Parse the next rows of the runbook.
+
+        Returns the task groups they add, as (group, company, time slot,
+        name, dallas time), and the tasks, as (group, description, order),
+        where group numbers the task groups in the order they were found.
+        """
+        frame = frame.reset_index(drop=True)
+        company = _text(frame[COMPANY_COLUMN])
+        time_slot = _text(frame[TIME_SLOT_COLUMN])
+        task = _text(frame[TASK_COLUMN])
+        has_task = task != ''
+        has_company = company != ''
+        valid_slot = time_slot.isin(self.time_slot_names)
+        announces = has_company | (time_slot != '')
+        if self.starts_group is None and len(frame):
+            self.starts_group = bool(announces.iloc[0])
+
+        # Only rows with a task move the context; the string dtype keeps ffill from downcasting
+        current_company = company.where(has_task & has_company).astype('string').ffill()
+        current_slot = time_slot.where(has_task & valid_slot).astype('string').ffill()
+        if self.company is not None:
+            current_company = current_company.fillna(self.company)
+        if self.time_slot is not None:
+            current_slot = current_slot.fillna(self.time_slot)
+        in_context = has_task & current_company.notna() & current_slot.notna()
+        if len(frame):
+            self.company = current_company.iloc[-1] if pd.notna(current_company.iloc[-1]) else None
+            self.time_slot = current_slot.iloc[-1] if pd.notna(current_slot.iloc[-1]) else None
+
+        rows = in_context[in_context].index
+        if rows.empty:
+            return [], []
+        # A row followed by a company or time slot cell makes the next row in context start a group
+        announced = announces.shift(-1, fill_value=False)
+        heads = (
+            has_company[rows] | valid_slot[rows]
+            | announced[rows].shift(1, fill_value=self.starts_group)
+        )
+        self.starts_group = None if rows[-1] == len(frame) - 1 else bool(announced[rows[-1]])
+
+        new_groups = []
+        head_groups = []
+        head_rows = heads[heads].index
+        for *key, slot_time in zip(
+            current_company[head_rows].tolist(), current_slot[head_rows].tolist(),
+            task[head_rows].tolist(), frame[TIME_COLUMN].fillna('')[head_rows].tolist(),
+        ):
+            key = tuple(key)
+            group = self.group_ids.get(key)
+            if group is None:
+                group = self.group_ids[key] = len(self.group_ids)
+                new_groups.append((group, *key, dallas_time(slot_time)))
+            head_groups.append(group)
+        groups = pd.Series(head_groups, index=head_rows, dtype='float').reindex(rows).ffill()
+        if self.group is not None:
+            groups = groups.fillna(self.group)
+        self.group = int(groups.iloc[-1])
+
+        tasks = pd.DataFrame({
+            'group': groups[~heads].astype(int), 'description': task[rows][~heads]
+        }).drop_duplicates()
+        fresh = [key not in self.task_keys for key in zip(tasks['group'], tasks['description'])]
+        tasks = tasks.loc[fresh]
+        self.task_keys.update(zip(tasks['group'], tasks['description']))
+        # A task's order is the number of tasks its group had before it
+        order = tasks.groupby('group').cumcount() + tasks['group'].map(self.task_counts).fillna(0).astype(int)
+        for group, count in tasks['group'].value_counts().items():
+            self.task_counts[group] = self.task_counts.get(group, 0) + count
+        return new_groups, list(zip(tasks['group'], tasks['description'], order))
+
+
+class ImportTimings:
+    """Wall time, rows handled and database queries of each phase of an import.
+
+    The phases are read (cells into row frames), parse (frames into task
+    groups and tasks), hierarchy (tasks gathered under their groups, and
+    sources merged), diff (the plan compared with the stored runbook) and
+    write. A phase may be entered many times, as a streamed read
+    interleaves with parsing, and its figures add up. Timings from worker
+    processes are merged with add, so in a parallel import the read and
+    parse seconds are summed across workers, not elapsed.
+    """
+
+    PHASES = ['read', 'parse', 'hierarchy', 'diff', 'write']
+
+    def __init__(self):
+        self.phases = {phase: {'seconds': 0.0, 'rows': 0, 'queries': 0} for phase in self.PHASES}
+
+    @contextmanager
+    def phase(self, name, rows=0):
+        """Time the block as part of the named phase; yields its figures, to count rows into."""
+        figures = self.phases[name]
+        figures['rows'] += rows
+
+        def count(execute, sql, params, many, context):
+            figures['queries'] += 1
+            return execute(sql, params, many, context)
+
+        began = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count):
+                yield figures
+        finally:
+            figures['seconds'] += time.perf_counter() - began
+
+    def frames(self, frames):
+        """Yield the frames, timing each one's read."""
+        frames = iter(frames)
+        while True:
+            with self.phase('read') as figures:
+                frame = next(frames, None)
+                if frame is not None:
+                    figures['rows'] += len(frame)
+            if frame is None:
+                return
+            yield frame
+
+    def add(self, other):
+        for name, figures in other.phases.items():
+            for key, value in figures.items():
+                self.phases[name][key] += value
+
+
+def plan_runbook(frames, time_slot_names, timings=None):
+    """Parse row frames into a plan of the runbook: the row count and its task groups.
+
+    Each task group is (company, time slot, name), dallas time and its
+    task descriptions in order, listed in the order they were found.
+    """
+    timings = ImportTimings() if timings is None else timings
+    parser = RunbookParser(time_slot_names)
+    rows = 0
+    planned = {}
+    for frame in timings.frames(frames):
+        rows += len(frame)
+        with timings.phase('parse', len(frame)):
+            groups, tasks = parser.feed(frame)
+        with timings.phase('hierarchy', len(groups) + len(tasks)):
+            for group, company, time_slot, name, slot_time in groups:
+                planned[group] = ((company, time_slot, name), slot_time, [])
+            for group, description, _ in tasks:
+                planned[group][2].append(description)
+    return rows, list(planned.values())
+
+
+def plan_runbook_source(source, time_slot_names, chunk_size=IMPORT_BATCH_SIZE):
+    """Read and plan one (path, sheet) source; run in the import worker processes.
+
+    Returns the row count, the plan and the timings of its reading and parsing.
+    """
+    path, sheet = source
+    timings = ImportTimings()
+    rows, planned = plan_runbook(read_runbook(path, sheet, chunk_size), time_slot_names, timings)
+    return rows, planned, timings
+
+
+def merge_plans(plans):
+    """Merge runbook plans as if their sources were one runbook read in the order given.
+
+    A task group found in several sources keeps the dallas time of its
+    first appearance and collects the tasks of each, a repeated task kept
+    once, just as a group repeated within one sheet does. The result
+    depends only on the order of the plans, not on which parsed first.
+    """
+    merged = {}
+    for plan in plans:
+        for key, slot_time, descriptions in plan:
+            # Dicts keep the tasks in the order they were first seen
+            merged.setdefault(key, (slot_time, {}))[1].update(dict.fromkeys(descriptions))
+    return [(key, slot_time, list(descriptions)) for key, (slot_time, descriptions) in merged.items()]
+
+
+def _time_slots(time_slots, summary):
+    """Create the time slots that are missing and return every time slot id by name.
+
+    A dry run lists the names it created in summary['new_time_slots'].
+    """
+    for name, order in time_slots.items():
+        _, created = TimeSlot.objects.get_or_create(name=name, defaults={'order': order})
+        if created and 'new_time_slots' in summary:
+            summary['new_time_slots'].append(name)
+    return dict(TimeSlot.objects.values_list('name', 'id'))
+
+
+def _batches(items, size=IMPORT_BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _create_companies(names, company_ids, summary):
+    """Create the named companies not in company_ids, adding them to it and counting them in summary."""
+    created = Company.objects.bulk_create([
+        Company(name=name) for name in dict.fromkeys(names) if name not in company_ids
+    ])
+    company_ids.update((company.name, company.id) for company in created)
+    summary['companies'] += len(created)
+    if 'new_companies' in summary:
+        summary['new_companies'].extend(company.name for company in created)
+
+
+def _create_planned(planned, time_slot_ids, summary):
+    """Create planned task groups and their companies, counting new companies in summary.
+
+    Returns the new groups and their tasks, unsaved.
+    """
+    company_ids = dict(Company.objects.values_list('name', 'id'))
+    _create_companies((key[0] for key, _, _ in planned), company_ids, summary)
+    task_groups = TaskGroup.objects.bulk_create([
+        TaskGroup(name=name, company_id=company_ids[company],
+                  time_slot_id=time_slot_ids[time_slot], dallas_time=slot_time)
+        for (company, time_slot, name), slot_time, _ in planned
+    ], batch_size=IMPORT_BATCH_SIZE)
+    tasks = [
+        Task(task_group_id=task_group.id, description=description, order=order)
+        for task_group, (_, _, descriptions) in zip(task_groups, planned)
+        for order, description in enumerate(descriptions)
+    ]
+    return task_groups, tasks
+
+
+def _log_task_groups(task_group_ids):
+    ChangeLog.objects.bulk_create([
+        ChangeLog(kind=ChangeLog.TASK_GROUP, object_id=task_group_id, task_group_id=task_group_id)
+        for task_group_id in task_group_ids
+    ], batch_size=IMPORT_BATCH_SIZE)
+
+
+def _summary(counts, dry_run):
+    """Zeroed counts; a dry run also lists what it created, changed and removed."""
+    summary = dict.fromkeys(counts, 0)
+    if dry_run:
+        summary.update(new_time_slots=[], new_companies=[], created=[], changed=[], removed=[])
+    return summary
+
+
+def import_runbook(frames, time_slots=DEFAULT_TIME_SLOTS, timings=None, dry_run=False):
+    """Replace the runbook with the task groups and tasks in the given row frames.
+
+    Like import_tasks.py, every existing task group, task and sign-off is
+    deleted first; companies and time slots are kept and created as
+    needed. Everything happens in one transaction with a few bulk inserts
+    per frame, instead of several queries per row. Returns counts of what
+    was created and removed; the time of each phase is added to timings,
+    when given. A dry run does all of it and rolls the transaction back,
+    listing in the summary the time slots, companies and task groups it
+    created and the task groups it removed (see _summary).
+    """
+    timings = ImportTimings() if timings is None else timings
+    summary = _summary(['rows', 'companies', 'task_groups', 'tasks'], dry_run)
+    with transaction.atomic():
+        with timings.phase('write') as figures:
+            time_slot_ids = _time_slots(time_slots, summary)
+            if dry_run:
+                summary['removed'] = [tuple(key) for key in TaskGroup.objects.values_list(
+                    'company__name', 'time_slot__name', 'name'
+                ).order_by('id')]
+            (summary['removed_task_groups'], summary['removed_tasks'],
+             summary['removed_signoffs']) = delete_task_groups(TaskGroup.objects.all())
+            figures['rows'] += sum(summary[count] for count in [
+                'removed_task_groups', 'removed_tasks', 'removed_signoffs'
+            ])
+            company_ids = dict(Company.objects.values_list('name', 'id'))
+        parser = RunbookParser(time_slot_ids)
+        task_group_ids = {}
+        planned = {}
+
+        for frame in timings.frames(frames):
+            summary['rows'] += len(frame)
+            with timings.phase('parse', len(frame)):
+                groups, tasks = parser.feed(frame)
+            with timings.phase('write', len(groups) + len(tasks)):
+                _create_companies((company for _, company, _, _, _ in groups), company_ids, summary)
+                created = TaskGroup.objects.bulk_create([
+                    TaskGroup(name=name, company_id=company_ids[company],
+                              time_slot_id=time_slot_ids[time_slot], dallas_time=slot_time)
+                    for _, company, time_slot, name, slot_time in groups
+                ], batch_size=IMPORT_BATCH_SIZE)
+                task_group_ids.update(
+                    (group[0], task_group.id) for group, task_group in zip(groups, created)
+                )
+                Task.objects.bulk_create([
+                    Task(task_group_id=task_group_ids[group], description=description, order=order)
+                    for group, description, order in tasks
+                ], batch_size=IMPORT_BATCH_SIZE)
+            summary['task_groups'] += len(created)
+            summary['tasks'] += len(tasks)
+            if dry_run:
+                planned.update((group, (tuple(key), slot_time)) for group, *key, slot_time in groups)
+
+        with timings.phase('write'):
+            _log_task_groups(task_group_ids.values())
+            bump('runbook')
+        if dry_run:
+            summary['created'] = [
+                (key, slot_time, parser.task_counts.get(group, 0))
+                for group, (key, slot_time) in planned.items()
+            ]
+            transaction.set_rollback(True)
+        else:
+            transaction.on_commit(dashboard.clear_snapshots)
+    return summary
+
+
+def sync_runbook(frames, time_slots=DEFAULT_TIME_SLOTS, timings=None, dry_run=False):
+    """Bring the runbook in line with the given row frames, changing only what differs.
+
+    Task groups are matched on company, time slot and name and keep their
+    ids, so their sign-off history stays; only groups no longer in the
+    runbook are deleted, with their sign-offs. Each group's fingerprint,
+    its dallas time and ordered tasks, is compared with the stored one, and
+    only groups that differ are written: tasks are inserted, reordered or
+    deleted, matched on their description. An unchanged runbook costs a few
+    reads and writes nothing. Returns counts of every kind of change; the
+    time of each phase is added to timings, when given. A dry run does all
+    of it and rolls the transaction back, as import_runbook's does.
+    """
+    timings = ImportTimings() if timings is None else timings
+    summary = _summary(SYNC_COUNTS, dry_run)
+    with transaction.atomic():
+        with timings.phase('write'):
+            time_slot_ids = _time_slots(time_slots, summary)
+        summary['rows'], planned = plan_runbook(frames, time_slot_ids, timings)
+        _write_plan(planned, True, time_slot_ids, summary, timings)
+        if dry_run:
+            transaction.set_rollback(True)
+    return summary
+
+
+def _diff_plan(planned, incremental):
+    """Compare a plan with the stored runbook, reading it but writing nothing.
+
+    Returns the changes as lists: task groups to create, to change (with
+    their stored and planned dallas time and how many tasks they gain,
+    reorder and lose) and to remove, with the unsaved task inserts and
+    updates, and the ids of the tasks to delete. Replacing the runbook
+    removes every stored group and creates every planned one.
+    """
+    diff = {
+        'incremental': incremental, 'created': [], 'changed': [], 'unchanged': 0, 'removed': [],
+        'group_updates': [], 'new_tasks': [], 'task_updates': [], 'stale_tasks': [],
+    }
+    stored = {}
+    for task_group_id, *key, slot_time in TaskGroup.objects.values_list(
+        'id', 'company__name', 'time_slot__name', 'name', 'dallas_time'
+    ).order_by('id'):
+        if tuple(key) in stored:
+            diff['removed'].append((task_group_id, tuple(key)))
+        else:
+            stored[tuple(key)] = (task_group_id, slot_time, [])
+    if not incremental:
+        diff['created'] = planned
+        diff['removed'][:0] = [(task_group_id, key) for key, (task_group_id, _, _) in stored.items()]
+        return diff
+
+    stored_tasks = {task_group_id: tasks for task_group_id, _, tasks in stored.values()}
+    for task_id, task_group_id, description, order in Task.objects.values_list(
+        'id', 'task_group_id', 'description', 'order'
+    ).order_by('task_group_id', 'order', 'id'):
+        if task_group_id in stored_tasks:
+            stored_tasks[task_group_id].append((task_id, description, order))
+
+    for key, slot_time, descriptions in planned:
+        match = stored.pop(key, None)
+        if match is None:
+            diff['created'].append((key, slot_time, descriptions))
+            continue
+        task_group_id, stored_time, tasks = match
+        fingerprint = (slot_time, list(enumerate(descriptions)))
+        if fingerprint == (stored_time, [(order, description) for _, description, order in tasks]):
+            diff['unchanged'] += 1
+            continue
+
+        if slot_time != stored_time:
+            diff['group_updates'].append(TaskGroup(id=task_group_id, dallas_time=slot_time))
+        added = reordered = 0
+        stale = []
+        existing = {}
+        for task_id, description, order in tasks:
+            if description in existing:
+                stale.append(task_id)
+            else:
+                existing[description] = (task_id, order)
+        for order, description in enumerate(descriptions):
+            task = existing.pop(description, None)
+            if task is None:
+                diff['new_tasks'].append(
+                    Task(task_group_id=task_group_id, description=description, order=order)
+                )
+                added += 1
+            elif task[1] != order:
+                diff['task_updates'].append(Task(id=task[0], order=order))
+                reordered += 1
+        stale.extend(task_id for task_id, _ in existing.values())
+        diff['stale_tasks'].extend(stale)
+        diff['changed'].append((task_group_id, key, stored_time, slot_time, added, reordered, len(stale)))
+
+    diff['removed'][:0] = [(task_group_id, key) for key, (task_group_id, _, _) in stored.items()]
+    return diff
+
+
+def _apply_diff(diff, time_slot_ids, summary):
+    """Write a diff of the runbook, adding the counts of what was written to summary."""
+    removed = [task_group_id for task_group_id, _ in diff['removed']]
+    for batch in _batches(removed):
+        groups, tasks, signoffs = delete_task_groups(TaskGroup.objects.filter(pk__in=batch))
+        summary['removed_task_groups'] += groups
+        summary['removed_tasks'] += tasks
+        summary['removed_signoffs'] += signoffs
+    for batch in _batches(diff['stale_tasks']):
+        summary['removed_tasks'] += raw_delete(Task.objects.filter(pk__in=batch))
+
+    new_groups, tasks = _create_planned(diff['created'], time_slot_ids, summary)
+    TaskGroup.objects.bulk_update(diff['group_updates'], ['dallas_time'], batch_size=IMPORT_BATCH_SIZE)
+    Task.objects.bulk_create(diff['new_tasks'] + tasks, batch_size=IMPORT_BATCH_SIZE)
+    Task.objects.bulk_update(diff['task_updates'], ['order'], batch_size=IMPORT_BATCH_SIZE)
+    summary['task_groups'] = len(new_groups)
+    summary['updated_task_groups'] = len(diff['changed'])
+    summary['unchanged_task_groups'] = diff['unchanged']
+    summary['tasks'] = len(diff['new_tasks']) + len(tasks)
+    summary['reordered_tasks'] = len(diff['task_updates'])
+
+    touched = [task_group_id for task_group_id, *_ in diff['changed']] + [group.id for group in new_groups]
+    if not diff['incremental']:
+        _log_task_groups(touched)
+        bump('runbook')
+        transaction.on_commit(dashboard.clear_snapshots)
+    elif touched or removed or summary['companies']:
+        _log_task_groups(touched)
+        bump('runbook')
+        refreshed = touched + removed
+        transaction.on_commit(lambda: dashboard.refresh_task_groups(refreshed))
+
+
+def _write_plan(planned, incremental, time_slot_ids, summary, timings):
+    """Diff a plan against the stored runbook and write it, timing both phases."""
+    with timings.phase('diff', len(planned)):
+        diff = _diff_plan(planned, incremental)
+    with timings.phase('write') as figures:
+        _apply_diff(diff, time_slot_ids, summary)
+        figures['rows'] += sum(summary[count] for count in [
+            'task_groups', 'updated_task_groups', 'removed_task_groups',
+            'tasks', 'reordered_tasks', 'removed_tasks', 'removed_signoffs',
+        ])
+    if 'created' in summary:
+        summary['created'] = [
+            (key, slot_time, len(descriptions)) for key, slot_time, descriptions in diff['created']
+        ]
+        summary['changed'] = [change[1:] for change in diff['changed']]
+        summary['removed'] = [key for _, key in diff['removed']]
+
+
+def plan_runbooks(sources, time_slot_names, workers=None, chunk_size=IMPORT_BATCH_SIZE):
+    """Plan each (path, sheet) source in parallel worker processes, returning their plans in source order.
+
+    Each plan comes with its row count and timings, as plan_runbook_source
+    returns it. Workers only read and parse, handing back plain tuples;
+    they never touch the database. With one worker, or one source, the
+    sources are planned in this process.
+    """
+    sources = list(sources)
+    if workers == 1 or len(sources) <= 1:
+        return [plan_runbook_source(source, time_slot_names, chunk_size) for source in sources]
+    # Workers set up Django themselves, as a spawned process starts bare
+    with ProcessPoolExecutor(workers, initializer=django.setup) as executor:
+        return list(executor.map(
+            plan_runbook_source, sources,
+            [time_slot_names] * len(sources), [chunk_size] * len(sources),
+        ))
+
+
+def _plan_sources(sources, time_slots, workers, timings):
+    time_slot_names = [*time_slots, *TimeSlot.objects.values_list('name', flat=True)]
+    plans = plan_runbooks(sources, time_slot_names, workers)
+    for _, _, source_timings in plans:
+        timings.add(source_timings)
+    with timings.phase('hierarchy'):
+        planned = merge_plans(plan for _, plan, _ in plans)
+    return sum(rows for rows, _, _ in plans), planned
+
+
+def import_runbooks(sources, incremental=False, workers=None, time_slots=DEFAULT_TIME_SLOTS,
+                    timings=None, dry_run=False):
+    """Import several runbook sheets as one runbook, parsing them in parallel.
+
+    Sources are (path, sheet) pairs; a CSV file's sheet is ignored. They
+    are parsed in worker processes and merged in the order given, so
+    companies and task groups that appear in several sources resolve the
+    same way on every run (see merge_plans). A single writer then replaces
+    the runbook, or applies only the differences when incremental, in one
+    transaction. Returns the counts of an incremental import; the time of
+    each phase is added to timings, when given. A dry run rolls the
+    transaction back, as import_runbook's does.
+    """
+    timings = ImportTimings() if timings is None else timings
+    summary = _summary(SYNC_COUNTS, dry_run)
+    summary['rows'], planned = _plan_sources(sources, time_slots, workers, timings)
+    with transaction.atomic():
+        with timings.phase('write'):
+            time_slot_ids = _time_slots(time_slots, summary)
+        _write_plan(planned, incremental, time_slot_ids, summary, timings)
+        if dry_run:
+            transaction.set_rollback(True)
+    return summary
@@ -0,0 +1,159 @@
+# scheduler/jobs.py
+import math
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, DateField, DurationField, ExpressionWrapper, F, Max, Sum, Value
+from django.db.models.functions import Greatest, Trunc
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import DataVersion, Job
+from .recurrence import expand_series
+
+# Workload grouping: query field, name field and label for jobs without one
+WORKLOAD_GROUPS = {
+    'member': ('assigned_to_id', 'assigned_to__name', 'Unassigned'),
+    'index': ('index_id', 'index__name', None),
+}
+
+# DataVersion row whose counter holds the longest job duration stored so far, in seconds
+LONGEST_JOB_KEY = 'longest_job'
+
+
+def parse_bound(value):
+    """Parse a range bound given as an ISO date or datetime into an aware datetime."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date or datetime: {value}")
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _seconds(duration):
+    return max(math.ceil(duration.total_seconds()), 0)
+
+
+def reset_longest_job():
+    """Store the longest job duration found by scanning every job, and return it."""
+    duration = ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+    longest = Job.objects.aggregate(longest=Max(duration))['longest'] or timedelta(0)
+    DataVersion.objects.update_or_create(family=LONGEST_JOB_KEY, defaults={'version': _seconds(longest)})
+    return timedelta(seconds=_seconds(longest))
+
+
+def longest_job_duration():
+    """Return the longest duration any job has had, as an upper bound for range scans.
+
+    Job writes only ever raise the stored value, so a read is one lookup
+    by key. Shortening or deleting the longest job leaves the bound looser
+    than it needs to be, never too tight. Only a database that has never
+    stored it scans the jobs.
+    """
+    seconds = DataVersion.objects.filter(family=LONGEST_JOB_KEY).values_list('version', flat=True).first()
+    if seconds is None:
+        return reset_longest_job()
+    return timedelta(seconds=seconds)
+
+
+def record_job_durations(jobs):
+    """Raise the stored longest job duration to cover jobs that were just saved."""
+    seconds = max((_seconds(job.end_time - job.start_time) for job in jobs), default=0)
+    updated = DataVersion.objects.filter(family=LONGEST_JOB_KEY).update(
+        version=Greatest(F('version'), Value(seconds))
+    )
+    if not updated:
+        reset_longest_job()
+
+
+def overlapping(queryset, start, end):
+    """Filter jobs to those overlapping the half-open window [start, end).
+
+    Besides the overlap condition itself, start_time is bounded below by
+    the window start minus the longest job, so the (start_time, end_time)
+    index is range-scanned over the visible window instead of all history.
+    """
+    if start is not None and end is not None:
+        return queryset.filter(
+            start_time__gte=start - longest_job_duration(),
+            start_time__lt=end,
+            end_time__gt=start,
+        )
+    if start is not None:
+        return queryset.filter(end_time__gt=start)
+    if end is not None:
+        return queryset.filter(start_time__lt=end)
+    return queryset
+
+
+def bucket_by_day(jobs, start, end):
+    """Group serialized jobs by each calendar day of [start, end) they overlap."""
+    buckets = defaultdict(list)
+    for job in jobs:
+        job_start = max(parse_datetime(job['start_time']), start)
+        job_end = min(parse_datetime(job['end_time']), end)
+        day = timezone.localtime(job_start).date()
+        last = timezone.localtime(job_end - timedelta(microseconds=1)).date()
+        while day <= last:
+            buckets[day.isoformat()].append(job)
+            day += timedelta(days=1)
+    return dict(sorted(buckets.items()))
+
+
+def _bucket_start(moment, bucket):
+    day = timezone.localtime(moment).date()
+    if bucket == 'week':
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def workload(start, end, bucket='day', group='member'):
+    """Booked hours and job counts per member or index, per day or week.
+
+    Jobs count towards the bucket they start in. One-off jobs are summed in
+    a single grouped query over the start_time index; recurring occurrences
+    are only generated for the window and added to the same buckets.
+    """
+    key, name, missing = WORKLOAD_GROUPS[group]
+    duration = ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())
+    rows = Job.objects.filter(start_time__gte=start, start_time__lt=end).annotate(
+        bucket=Trunc('start_time', bucket, output_field=DateField())
+    ).values('bucket', key, name).annotate(
+        booked=Sum(duration), jobs=Count('id')
+    ).order_by()
+
+    totals = {}
+    for row in rows:
+        totals[(row['bucket'], row[key])] = {
+            'name': row[name] or missing, 'booked': row['booked'], 'jobs': row['jobs']
+        }
+
+    for occurrence in expand_series(start, end):
+        if occurrence.start_time < start:
+            continue
+        owner = occurrence.assigned_to if group == 'member' else occurrence.series.index
+        entry = totals.setdefault(
+            (_bucket_start(occurrence.start_time, bucket), owner.id if owner else None),
+            {'name': owner.name if owner else missing, 'booked': timedelta(0), 'jobs': 0}
+        )
+        entry['booked'] += occurrence.end_time - occurrence.start_time
+        entry['jobs'] += 1
+
+    return [
+        {
+            'bucket': day,
+            group: owner,
+            f'{group}_name': entry['name'],
+            'hours': round(entry['booked'].total_seconds() / 3600, 2),
+            'jobs': entry['jobs'],
+        }
+        for (day, owner), entry in sorted(
+            totals.items(), key=lambda item: (item[0][0], item[1]['name'] or '')
+        )
+    ]
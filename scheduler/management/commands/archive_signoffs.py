@@ -0,0 +1,26 @@
+# scheduler/management/commands/archive_signoffs.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from scheduler.archive import ARCHIVE_BATCH_SIZE, archive_horizon, archive_signoffs
+
+
+class Command(BaseCommand):
+    help = "Move old sign-offs from the task sign-off table into the archive database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help="Keep sign-offs completed in the last DAYS days "
+                                 "(default: settings.SIGNOFF_ARCHIVE_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+                            help="Sign-offs moved per transaction")
+
+    def handle(self, *args, **options):
+        before = archive_horizon(options['days'])
+        began = time.perf_counter()
+        moved = archive_signoffs(before, batch_size=options['batch_size'])
+        self.stdout.write(
+            f"Archived {moved} sign-offs completed before {before} "
+            f"in {time.perf_counter() - began:.2f}s."
+        )
@@ -0,0 +1,30 @@
+# scheduler/management/commands/backfill_rollups.py
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.rollups import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the sign-off analytics rollups from raw sign-offs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First completed date to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--end', help="Last completed date to rebuild (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        try:
+            start, end = (
+                datetime.strptime(options[bound], '%Y-%m-%d').date() if options[bound] else None
+                for bound in ('start', 'end')
+            )
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+
+        began = time.perf_counter()
+        total = backfill_rollups(start, end)
+        self.stdout.write(
+            f"Rolled up {total} sign-offs in {time.perf_counter() - began:.2f}s."
+        )
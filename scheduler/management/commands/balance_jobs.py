@@ -0,0 +1,103 @@
+# scheduler/management/commands/balance_jobs.py
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.jobs import parse_bound, reset_longest_job
+from scheduler.management.scratch import scratch_databases
+from scheduler.models import Index, Job, TeamMember
+from scheduler.solver import balance_unassigned
+
+
+class Command(BaseCommand):
+    help = "Assign unassigned jobs in a date range to team members, balancing their hours"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="Window start (ISO date or datetime)")
+        parser.add_argument('--end', help="Window end (ISO date or datetime, exclusive)")
+        parser.add_argument('--no-refine', action='store_true',
+                            help="Keep the greedy assignment without the balancing pass")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report the assignment without saving it")
+        parser.add_argument('--benchmark', nargs=2, type=int, metavar=('JOBS', 'MEMBERS'),
+                            help="Time the whole command on synthetic data in scratch databases")
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self.benchmark(*options['benchmark'], refine_loads=not options['no_refine'])
+
+        try:
+            start = parse_bound(options['start'])
+            end = parse_bound(options['end'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if start is None or end is None:
+            raise CommandError("Both --start and --end are required.")
+
+        result = balance_unassigned(
+            start, end, refine_loads=not options['no_refine'], dry_run=options['dry_run']
+        )
+        verb = "Would assign" if result['dry_run'] else "Assigned"
+        self.stdout.write(
+            f"{verb} {result['assigned']} jobs ({result['moved']} moved while balancing); "
+            f"{len(result['unassigned'])} left unassigned."
+        )
+        for member, hours in sorted(result['hours'].items()):
+            self.stdout.write(f"  member {member}: {hours} h")
+
+    def benchmark(self, job_count, member_count, refine_loads=True):
+        """Balance a synthetic quarter on scratch databases, loading and saving included.
+
+        Jobs run 30 min to 4 h, and each member is already booked for a
+        quarter of their share of the jobs in one-hour slots.
+        """
+        rng = random.Random(0)
+        origin = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        horizon = 90 * 24 * 3600
+        with scratch_databases():
+            index = Index.objects.create(name='Benchmark Index')
+            members = TeamMember.objects.bulk_create([
+                TeamMember(name=f'Member {m}', email=f'member{m}@example.com')
+                for m in range(member_count)
+            ])
+            jobs = []
+            for n in range(job_count):
+                start = rng.randrange(0, horizon, 900)
+                jobs.append(Job(
+                    index=index, title=f'Job {n}', start_time=origin + timedelta(seconds=start),
+                    end_time=origin + timedelta(seconds=start + rng.randrange(1800, 4 * 3600 + 1, 900)),
+                ))
+            for member in members:
+                for _ in range(job_count // member_count // 4):
+                    start = origin + timedelta(seconds=rng.randrange(0, horizon, 900))
+                    jobs.append(Job(
+                        index=index, title='Booked', assigned_to=member,
+                        start_time=start, end_time=start + timedelta(hours=1),
+                    ))
+            Job.objects.bulk_create(jobs, batch_size=5000)
+            reset_longest_job()
+
+            end = origin + timedelta(seconds=horizon)
+            # Tracing allocations slows the ORM down, so memory is measured on a dry run of its own
+            tracemalloc.start()
+            balance_unassigned(origin, end, refine_loads=refine_loads, dry_run=True)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            timings = {}
+            began = time.perf_counter()
+            result = balance_unassigned(origin, end, refine_loads=refine_loads, timings=timings)
+            total_seconds = time.perf_counter() - began
+
+        hours = list(result['hours'].values())
+        self.stdout.write(
+            f"{job_count} jobs x {member_count} members: assigned {result['assigned']}, "
+            f"unassigned {len(result['unassigned'])}, moved {result['moved']}\n"
+            f"load {timings['load']:.2f}s, solve {timings['solve']:.2f}s, "
+            f"save {timings['save']:.2f}s, total {total_seconds:.2f}s, "
+            f"peak memory {peak / 2**20:.1f} MiB\n"
+            f"hours per member: min {min(hours):.1f}, max {max(hours):.1f}"
+        )
@@ -0,0 +1,185 @@
+# scheduler/management/commands/generate_load_data.py
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from scheduler.dashboard import clear_snapshots
+from scheduler.importer import DEFAULT_TIME_SLOTS
+from scheduler.jobs import reset_longest_job
+from scheduler.models import Company, Index, Job, Task, TaskGroup, TaskSignOff, TeamMember, TimeSlot
+from scheduler.rollups import backfill_rollups
+from scheduler.versioning import bump
+
+COLORS = ['#3174ad', '#ff6b6b', '#5cb85c', '#f0ad4e', '#9467bd']
+
+# Sign-off columns written by insert, in the order signoffs yields them
+SIGNOFF_FIELDS = ['task_group', 'team_member', 'completed_date', 'sign_off_date', 'notes']
+
+
+class Command(BaseCommand):
+    help = ("Fill a fresh database with a reproducible, production-sized runbook, team, "
+            "job calendar and sign-off history")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (default 0)")
+        parser.add_argument('--companies', type=int, default=50, help="Companies (default 50)")
+        parser.add_argument('--groups-per-slot', type=int, default=10,
+                            help="Task groups per company and time slot (default 10)")
+        parser.add_argument('--tasks-per-group', type=int, default=7, help="Tasks per group (default 7)")
+        parser.add_argument('--members', type=int, default=40, help="Team members (default 40)")
+        parser.add_argument('--indexes', type=int, default=25, help="Indexes (default 25)")
+        parser.add_argument('--years', type=float, default=3, help="Years of history (default 3)")
+        parser.add_argument('--jobs-per-day', type=int, default=1000,
+                            help="Jobs scheduled each day (default 1000)")
+        parser.add_argument('--signoff-density', type=float, default=0.9,
+                            help="Share of task groups signed off each weekday (default 0.9)")
+        parser.add_argument('--end', help="Last day of history, YYYY-MM-DD (default today)")
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help="Rows per bulk insert transaction (default 10000)")
+
+    def handle(self, *args, **options):
+        if min(options['members'], options['indexes'], options['batch_size']) < 1:
+            raise CommandError("--members, --indexes and --batch-size must be at least 1.")
+        if not 0 <= options['signoff_density'] <= 1:
+            raise CommandError("--signoff-density must be between 0 and 1.")
+        try:
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else None
+        except ValueError:
+            raise CommandError("Invalid date format. Use YYYY-MM-DD.")
+        if any(model.objects.exists() for model in (Company, TaskGroup, TeamMember, Index, Job)):
+            raise CommandError(
+                "The database already holds data; run this against a freshly migrated one."
+            )
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        end = end or date.today()
+        self.days = [end - timedelta(days=n) for n in range(round(options['years'] * 365), -1, -1)]
+        began = time.perf_counter()
+
+        for name, order in DEFAULT_TIME_SLOTS.items():
+            TimeSlot.objects.get_or_create(name=name, defaults={'order': order})
+        time_slots = list(TimeSlot.objects.all())
+        companies = self.write(Company, (
+            Company(name=f'Company {c}') for c in range(options['companies'])
+        ))
+        groups = self.write(TaskGroup, (
+            TaskGroup(name=f'Group {g}', company_id=company.id, time_slot_id=time_slot.id,
+                      dallas_time=f'{7 + 3 * n + g % 3:02d}:{15 * (g % 4):02d}')
+            for company in companies
+            for n, time_slot in enumerate(time_slots)
+            for g in range(options['groups_per_slot'])
+        ))
+        self.write(Task, (
+            Task(task_group_id=group.id, description=f'Task {t}', order=t)
+            for group in groups
+            for t in range(options['tasks_per_group'])
+        ), keep=False)
+        members = self.write(TeamMember, (
+            TeamMember(name=f'Member {m}', email=f'member{m}@example.com')
+            for m in range(options['members'])
+        ))
+        indexes = self.write(Index, (
+            Index(name=f'Index {i}', description=f'Synthetic index {i}')
+            for i in range(options['indexes'])
+        ))
+        self.write(Job, self.jobs(indexes, members, options['jobs_per_day']), keep=False)
+        reset_longest_job()
+        self.write(
+            TaskSignOff, self.signoffs(groups, members, options['signoff_density']), keep=False,
+            fields=SIGNOFF_FIELDS,
+        )
+
+        self.stdout.write("Rebuilding analytics rollups...")
+        backfill_rollups()
+        for family in ('time_slots', 'runbook', 'team', 'indexes', 'jobs', 'signoffs'):
+            bump(family)
+        clear_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - began:.1f}s."))
+
+    def write(self, model, objects, keep=True, fields=None):
+        """Bulk-insert objects a batch per transaction, returning them when keep is set.
+
+        With fields, the objects are tuples of those fields' values, inserted
+        as they are (see insert).
+        """
+        began = time.perf_counter()
+        written = []
+        total = 0
+        objects = iter(objects)
+        while batch := list(islice(objects, self.batch_size)):
+            with transaction.atomic():
+                if fields:
+                    self.insert(model, fields, batch)
+                else:
+                    model.objects.bulk_create(batch)
+            total += len(batch)
+            if keep:
+                written.extend(batch)
+        elapsed = time.perf_counter() - began
+        self.stdout.write(
+            f"{model._meta.verbose_name_plural}: {total} rows in {elapsed:.1f}s "
+            f"({total / max(elapsed, 1e-9):.0f} rows/s)"
+        )
+        return written
+
+    def insert(self, model, fields, rows):
+        """Insert rows of field values with one executemany.
+
+        bulk_create would replace an auto_now_add field's value with the
+        current time; a plain INSERT keeps the generated one.
+        """
+        fields = [model._meta.get_field(name) for name in fields]
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(field.column) for field in fields)
+        sql = (
+            f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+            f"VALUES ({', '.join(['%s'] * len(fields))})"
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+                for row in rows
+            ])
+
+    def jobs(self, indexes, members, per_day):
+        """Jobs spread over working hours, mostly assigned, a few left open."""
+        for day in self.days:
+            midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            for _ in range(per_day):
+                index = self.rng.choice(indexes)
+                start = midnight + timedelta(minutes=self.rng.randrange(7 * 60, 19 * 60, 15))
+                member = self.rng.choice(members) if self.rng.random() < 0.9 else None
+                yield Job(
+                    index_id=index.id, title=f'{index.name} run', start_time=start,
+                    end_time=start + timedelta(minutes=self.rng.choice([30, 60, 90, 120, 240])),
+                    assigned_to_id=member.id if member else None,
+                    color=COLORS[index.id % len(COLORS)],
+                )
+
+    def signoffs(self, groups, members, density):
+        """One sign-off per signed-off group and weekday, around its dallas time, some late.
+
+        Sign-offs are yielded as rows of SIGNOFF_FIELDS values.
+        """
+        for day in self.days:
+            if day.weekday() >= 5:
+                continue
+            midnight = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+            for group in groups:
+                if self.rng.random() >= density:
+                    continue
+                hours, minutes = map(int, group.dallas_time.split(':'))
+                # Minutes after the dallas time; one in twenty is hours late
+                if self.rng.random() < 0.95:
+                    delay = self.rng.expovariate(1 / 45)
+                else:
+                    delay = self.rng.uniform(600, 1800)
+                yield (
+                    group.id, self.rng.choice(members).id, day,
+                    midnight + timedelta(hours=hours, minutes=minutes + delay), '',
+                )
@@ -0,0 +1,208 @@
+# scheduler/management/commands/import_runbook.py
+import os
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from scheduler.importer import (
+    COMPANY_COLUMN, DEFAULT_TIME_SLOTS, IMPORT_BATCH_SIZE, RUNBOOK_SHEET, TASK_COLUMN, TIME_COLUMN,
+    TIME_SLOT_COLUMN, ImportTimings, import_runbook, import_runbooks, plan_runbooks, read_runbook,
+    sync_runbook,
+)
+from scheduler.management.scratch import scratch_databases
+
+
+def synthetic_runbook(rows, tasks_per_group=7, groups_per_company=20):
+    """A runbook frame shaped like Runbook.xlsx: each group is a header row and its tasks."""
+    slots = list(DEFAULT_TIME_SLOTS)
+    records = []
+    for row in range(rows):
+        group, position = divmod(row, tasks_per_group + 1)
+        if position == 0:
+            company = group // groups_per_company
+            records.append((
+                f'Company {company}' if group % groups_per_company == 0 else None,
+                slots[group % len(slots)], f'Group {group}', (group % 96) / 96,
+            ))
+        else:
+            records.append((None, None, f'Task {position}', None))
+    return pd.DataFrame.from_records(
+        records, columns=[COMPANY_COLUMN, TIME_SLOT_COLUMN, TASK_COLUMN, TIME_COLUMN]
+    )
+
+
+class Command(BaseCommand):
+    help = "Replace the task runbook with the task groups and tasks of a workbook sheet or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', metavar='path', default=['Runbook.xlsx'],
+                            help="Workbooks or CSV files to import as one runbook (default Runbook.xlsx)")
+        parser.add_argument('--sheet', action='append', dest='sheets', metavar='SHEET',
+                            help=f"Sheet holding the runbook, repeatable (default {RUNBOOK_SHEET})")
+        parser.add_argument('--workers', type=int,
+                            help="Processes parsing several sheets in parallel (default one per core)")
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help=f"Rows read and written at a time (default {IMPORT_BATCH_SIZE})")
+        parser.add_argument('--incremental', action='store_true',
+                            help="Apply only the differences, keeping task groups and their sign-offs")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Print the changes the import would make without writing them")
+        parser.add_argument('--timings', action='store_true',
+                            help="Report the time, rows and queries of each phase of the import")
+        parser.add_argument('--benchmark', type=int, metavar='ROWS',
+                            help="Time an import of a synthetic runbook into scratch databases")
+        parser.add_argument('--benchmark-parse', type=int, metavar='ROWS',
+                            help="Time parsing one synthetic workbook of ROWS rows per core with 1 to all cores")
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self.benchmark(options['benchmark'])
+        if options['benchmark_parse']:
+            return self.benchmark_parse(options['benchmark_parse'])
+
+        paths = options['paths']
+        sources = [(path, sheet) for path in paths for sheet in options['sheets'] or [RUNBOOK_SHEET]]
+        timings = ImportTimings()
+        # Timings and dry runs only report on the import; they never change how it runs
+        try:
+            if len(sources) > 1:
+                summary = import_runbooks(
+                    sources, options['incremental'], options['workers'], timings=timings,
+                    dry_run=options['dry_run'],
+                )
+            else:
+                # Frames are read as they are imported, so a bad file rolls the import back
+                frames = read_runbook(*sources[0], options['chunk_size'])
+                summary = (sync_runbook if options['incremental'] else import_runbook)(
+                    frames, timings=timings, dry_run=options['dry_run']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {', '.join(paths)}: {e}")
+
+        if options['dry_run']:
+            self.stdout.write("Dry run: the import was rolled back, nothing was written.")
+            self.report_plan(summary, options['verbosity'])
+        if options['incremental']:
+            self.report_sync(summary)
+        else:
+            self.report(summary, options['dry_run'])
+        if options['timings']:
+            self.report_timings(timings)
+
+    def report_plan(self, summary, verbosity):
+        for name in summary['new_time_slots']:
+            self.stdout.write(f"+ time slot {name}")
+        for name in summary['new_companies']:
+            self.stdout.write(f"+ company {name}")
+        if verbosity < 2:
+            return
+        # Every task group change, one per line
+        for (company, time_slot, name), time_of_day, tasks in summary['created']:
+            self.stdout.write(f"+ {company} / {time_slot} / {name} at {time_of_day or '-'}: {tasks} tasks")
+        for key, stored_time, time_of_day, added, reordered, removed in summary['changed']:
+            company, time_slot, name = key
+            time_change = ''
+            if stored_time != time_of_day:
+                time_change = f"at {stored_time or '-'} -> {time_of_day or '-'}, "
+            self.stdout.write(
+                f"~ {company} / {time_slot} / {name}: {time_change}"
+                f"{added} tasks new, {reordered} reordered, {removed} removed"
+            )
+        for company, time_slot, name in summary['removed']:
+            self.stdout.write(f"- {company} / {time_slot} / {name}")
+
+    def report_timings(self, timings):
+        self.stdout.write(f"{'phase':<10}{'seconds':>10}{'rows':>10}{'queries':>10}")
+        for name, figures in timings.phases.items():
+            self.stdout.write(
+                f"{name:<10}{figures['seconds']:>10.2f}{figures['rows']:>10}{figures['queries']:>10}"
+            )
+
+    def report(self, summary, dry_run=False):
+        if dry_run:
+            self.stdout.write(
+                f"Would import {summary['rows']} rows: {summary['task_groups']} task groups, "
+                f"{summary['tasks']} tasks, {summary['companies']} new companies."
+            )
+            self.stdout.write(
+                f"Would delete {summary['removed_task_groups']} task groups, {summary['removed_tasks']} "
+                f"tasks and {summary['removed_signoffs']} sign-offs."
+            )
+            return
+        self.stdout.write(
+            f"Imported {summary['rows']} rows: {summary['task_groups']} task groups, "
+            f"{summary['tasks']} tasks, {summary['companies']} new companies."
+        )
+        self.stdout.write(
+            f"Replaced {summary['removed_task_groups']} task groups and {summary['removed_tasks']} "
+            f"tasks; {summary['removed_signoffs']} sign-offs removed."
+        )
+
+    def report_sync(self, summary):
+        self.stdout.write(
+            f"Compared {summary['rows']} rows. Task groups: {summary['task_groups']} new, "
+            f"{summary['updated_task_groups']} changed, {summary['unchanged_task_groups']} unchanged, "
+            f"{summary['removed_task_groups']} removed."
+        )
+        self.stdout.write(
+            f"Tasks: {summary['tasks']} new, {summary['reordered_tasks']} reordered, "
+            f"{summary['removed_tasks']} removed. {summary['companies']} new companies; "
+            f"{summary['removed_signoffs']} sign-offs removed with their task groups."
+        )
+
+    def benchmark(self, rows):
+        frame = synthetic_runbook(rows)
+        edited = frame.copy()
+        edited.loc[len(edited) // 2 + 1, TASK_COLUMN] = 'Edited task'
+        with scratch_databases():
+            for label, run, report, data in [
+                ('empty database', import_runbook, self.report, frame),
+                ('re-import', import_runbook, self.report, frame),
+                ('incremental, unchanged', sync_runbook, self.report_sync, frame),
+                ('incremental, one cell edited', sync_runbook, self.report_sync, edited),
+            ]:
+                began = time.perf_counter()
+                summary = run([data])
+                self.stdout.write(f"{label}: {time.perf_counter() - began:.2f} s")
+                report(summary)
+
+            # The same runbook streamed back from a workbook, with the peak memory it took
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'Runbook.xlsx')
+                frame.to_excel(path, sheet_name=RUNBOOK_SHEET, index=False)
+                tracemalloc.start()
+                began = time.perf_counter()
+                summary = import_runbook(read_runbook(path))
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"streamed from a workbook: {time.perf_counter() - began:.2f} s, "
+                    f"peak {peak / 2 ** 20:.1f} MiB"
+                )
+                self.report(summary)
+
+    def benchmark_parse(self, rows):
+        cores = os.cpu_count() or 1
+        with tempfile.TemporaryDirectory() as directory:
+            sources = []
+            for number in range(cores):
+                path = os.path.join(directory, f'Runbook {number}.xlsx')
+                synthetic_runbook(rows).to_excel(path, sheet_name=RUNBOOK_SHEET, index=False)
+                sources.append((path, RUNBOOK_SHEET))
+            workers = 1
+            baseline = None
+            while True:
+                began = time.perf_counter()
+                plan_runbooks(sources, list(DEFAULT_TIME_SLOTS), workers)
+                elapsed = time.perf_counter() - began
+                baseline = baseline or elapsed
+                self.stdout.write(
+                    f"{len(sources)} workbooks, {workers} workers: {elapsed:.2f} s, "
+                    f"{baseline / elapsed:.1f}x"
+                )
+                if workers == cores:
+                    break
+                workers = min(workers * 2, cores)
@@ -0,0 +1,112 @@
+# scheduler/management/commands/load_test_writes.py
+import statistics
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+
+from scheduler.jobs import reset_longest_job
+from scheduler.management.scratch import scratch_databases
+from scheduler.models import Company, Index, Job, TaskGroup, TeamMember, TimeSlot
+
+
+class Command(BaseCommand):
+    help = ("Measure concurrent sign-off and job assignment throughput on scratch SQLite "
+            "databases, with and without the write-behind queue")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16,
+                            help="Concurrent clients (default 16)")
+        parser.add_argument('--requests', type=int, default=50,
+                            help="Writes sent by each client (default 50)")
+
+    def handle(self, *args, **options):
+        workers, requests = options['workers'], options['requests']
+        with scratch_databases():
+            targets = self.seed(workers * requests)
+            self.stdout.write(f"{workers} clients x {requests} writes, half sign-offs, half assignments")
+            for offset, write_behind in enumerate([False, True]):
+                with override_settings(SCHEDULER_WRITE_BEHIND=write_behind):
+                    self.report(
+                        'write-behind' if write_behind else 'direct',
+                        self.run_load(targets, workers, requests, date(2025, 3, 24) + timedelta(days=offset))
+                    )
+
+    def seed(self, count):
+        """One task group and one job per write, spread over a few members."""
+        time_slot = TimeSlot.objects.create(name='Morning', order=1)
+        company = Company.objects.create(name='Load Test')
+        index = Index.objects.create(name='Load Test Index')
+        members = TeamMember.objects.bulk_create([
+            TeamMember(name=f'Member {m}', email=f'member{m}@example.com') for m in range(8)
+        ])
+        task_groups = TaskGroup.objects.bulk_create([
+            TaskGroup(name=f'Group {g}', company=company, time_slot=time_slot, dallas_time='09:00')
+            for g in range(count)
+        ])
+        start = datetime(2025, 3, 24, 9, tzinfo=timezone.utc)
+        jobs = Job.objects.bulk_create([
+            Job(index=index, title=f'Job {j}', start_time=start + timedelta(hours=j),
+                end_time=start + timedelta(hours=j, minutes=30))
+            for j in range(count)
+        ])
+        reset_longest_job()
+        return [
+            (task_group.id, job.id, members[n % len(members)].id)
+            for n, (task_group, job) in enumerate(zip(task_groups, jobs))
+        ]
+
+    def run_load(self, targets, workers, requests, day):
+        latencies = []
+        errors = []
+        barrier = threading.Barrier(workers)
+
+        def client(share):
+            browser = Client()
+            barrier.wait()
+            for n, (task_group_id, job_id, member_id) in enumerate(share):
+                began = time.perf_counter()
+                try:
+                    if n % 2:
+                        response = browser.put(
+                            f'/api/assign-job/{job_id}/',
+                            {'team_member_id': member_id, 'force': True},
+                            content_type='application/json',
+                        )
+                    else:
+                        response = browser.post('/api/task-signoffs/sign_off/', {
+                            'task_group_id': task_group_id, 'team_member_id': member_id,
+                            'completed_date': day.isoformat(),
+                        })
+                    if response.status_code >= 400:
+                        errors.append(str(response.status_code))
+                except Exception as e:
+                    errors.append(str(e))
+                latencies.append(time.perf_counter() - began)
+            connections.close_all()
+
+        threads = [
+            threading.Thread(target=client, args=(targets[w * requests:(w + 1) * requests],))
+            for w in range(workers)
+        ]
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - began, latencies, errors
+
+    def report(self, mode, result):
+        elapsed, latencies, errors = result
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"  {mode:>12}: {len(latencies) / elapsed:7.1f} writes/s, "
+            f"p50 {statistics.median(latencies) * 1000:6.1f} ms, p99 {p99 * 1000:7.1f} ms, "
+            f"{len(errors)} failed"
+        )
+        for error in sorted(set(errors)):
+            self.stdout.write(f"      {errors.count(error)} x {error}")
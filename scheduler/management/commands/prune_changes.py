@@ -0,0 +1,19 @@
+# scheduler/management/commands/prune_changes.py
+from django.core.management.base import BaseCommand
+
+from scheduler.sync import change_horizon, prune_changes
+
+
+class Command(BaseCommand):
+    help = "Delete delta sync changes past the retention window; older cursors then get 410 Gone"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help="Keep changes of the last DAYS days "
+                                 "(default: settings.CHANGELOG_RETENTION_DAYS)")
+
+    def handle(self, *args, **options):
+        deleted = prune_changes(options['days'])
+        self.stdout.write(
+            f"Deleted {deleted} changes recorded before {change_horizon(options['days']):%Y-%m-%d %H:%M}."
+        )
@@ -0,0 +1,22 @@
+# scheduler/management/commands/prune_snapshots.py
+from django.core.management.base import BaseCommand
+
+from scheduler.dashboard import prune_snapshots, snapshot_horizon
+from scheduler.versioning import bump
+
+
+class Command(BaseCommand):
+    help = "Delete stored dashboard snapshots of old days; they are rebuilt when next viewed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            help="Keep snapshots of the last DAYS days "
+                                 "(default: settings.DASHBOARD_SNAPSHOT_DAYS)")
+
+    def handle(self, *args, **options):
+        deleted = prune_snapshots(options['days'])
+        if deleted:
+            bump('dashboard')
+        self.stdout.write(
+            f"Deleted {deleted} dashboard snapshots before {snapshot_horizon(options['days'])}."
+        )
@@ -0,0 +1,38 @@
+# scheduler/management/scratch.py
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+)
+
+ALIASES = {'default', 'archive'}
+
+
+@contextmanager
+def scratch_databases():
+    """Run the block against freshly migrated, throwaway SQLite files.
+
+    Used by the benchmark commands, which must not touch the real data.
+    File databases, unlike the in-memory test ones, lock and sync like
+    production.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        for alias in ALIASES:
+            settings.DATABASES[alias]['TEST']['NAME'] = os.path.join(scratch, f'{alias}.sqlite3')
+        setup_test_environment()
+        # Failed requests are counted, not logged one traceback at a time
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        old_config = setup_databases(
+            verbosity=0, interactive=False, aliases=ALIASES, serialized_aliases=set()
+        )
+        try:
+            yield
+        finally:
+            connections.close_all()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-18 12:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+import rest_framework.utils.encoders
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0002_company_timeslot_taskgroup_task_tasksignoff'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_date', models.DateField()),
+                ('payload', models.JSONField(default=list, encoder=rest_framework.utils.encoders.JSONEncoder)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('time_slot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_snapshots', to='scheduler.timeslot')),
+            ],
+            options={
+                'unique_together': {('completed_date', 'time_slot')},
+            },
+        ),
+    ]
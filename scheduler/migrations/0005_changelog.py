@@ -0,0 +1,27 @@
+# Generated by Django 4.2 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0004_dataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('task_group', 'Task group'), ('task', 'Task'), ('signoff', 'Sign-off')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('task_group_id', models.BigIntegerField()),
+                ('completed_date', models.DateField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
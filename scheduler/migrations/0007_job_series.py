@@ -0,0 +1,52 @@
+# Generated by Django 4.2 on 2026-10-18 12:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0006_job_range_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('start_time', models.DateTimeField()),
+                ('duration', models.DurationField()),
+                ('recurrence', models.CharField(max_length=500)),
+                ('color', models.CharField(default='#3174ad', max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_series', to='scheduler.teammember')),
+                ('index', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_series', to='scheduler.index')),
+            ],
+            options={
+                'verbose_name_plural': 'Job series',
+            },
+        ),
+        migrations.CreateModel(
+            name='JobOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField()),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('notes', models.TextField(blank=True)),
+                ('cancelled', models.BooleanField(default=False)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_occurrences', to='scheduler.teammember')),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='overrides', to='scheduler.jobseries')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='joboccurrence',
+            index=models.Index(fields=['start_time', 'end_time'], name='occurrence_start_end_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='joboccurrence',
+            unique_together={('series', 'original_start')},
+        ),
+    ]
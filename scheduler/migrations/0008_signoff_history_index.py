@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0007_job_series'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasksignoff',
+            index=models.Index(fields=['sign_off_date', 'id'], name='signoff_history_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 12:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0008_signoff_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_date', models.DateField()),
+                ('signoffs', models.PositiveIntegerField(default=0)),
+                ('late_signoffs', models.PositiveIntegerField(default=0)),
+                ('late_seconds', models.PositiveBigIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_rollups', to='scheduler.company')),
+                ('team_member', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signoff_rollups', to='scheduler.teammember')),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='member_rollups', to='scheduler.timeslot')),
+            ],
+            options={
+                'unique_together': {('completed_date', 'team_member', 'company', 'time_slot')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CompletionRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completed_date', models.DateField()),
+                ('completed_task_groups', models.PositiveIntegerField(default=0)),
+                ('signoffs', models.PositiveIntegerField(default=0)),
+                ('late_signoffs', models.PositiveIntegerField(default=0)),
+                ('late_seconds', models.PositiveBigIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completion_rollups', to='scheduler.company')),
+                ('time_slot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completion_rollups', to='scheduler.timeslot')),
+            ],
+            options={
+                'unique_together': {('completed_date', 'company', 'time_slot')},
+            },
+        ),
+    ]
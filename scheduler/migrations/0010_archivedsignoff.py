@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0009_signoff_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSignOff',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('task_group_id', models.BigIntegerField()),
+                ('company_id', models.BigIntegerField()),
+                ('time_slot_id', models.BigIntegerField()),
+                ('team_member_id', models.BigIntegerField()),
+                ('task_group_name', models.CharField(max_length=200)),
+                ('company_name', models.CharField(max_length=100)),
+                ('time_slot_name', models.CharField(max_length=50)),
+                ('team_member_name', models.CharField(max_length=100)),
+                ('sign_off_date', models.DateTimeField()),
+                ('completed_date', models.DateField()),
+                ('notes', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-sign_off_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedsignoff',
+            index=models.Index(fields=['sign_off_date', 'id'], name='archived_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedsignoff',
+            index=models.Index(fields=['completed_date'], name='archived_completed_idx'),
+        ),
+    ]
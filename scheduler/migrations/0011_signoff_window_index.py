@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0010_archivedsignoff'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tasksignoff',
+            index=models.Index(fields=['completed_date', 'sign_off_date', 'id'], name='signoff_window_idx'),
+        ),
+    ]
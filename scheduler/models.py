@@ -1,6 +1,7 @@
 # scheduler/models.py
 from django.db import models
 from django.contrib.auth.models import User
+from rest_framework.utils.encoders import JSONEncoder
 
 class Index(models.Model):
     """Model representing an index that needs to be calculated or maintained."""
@@ -37,6 +38,66 @@ class Job(models.Model):
     
     def __str__(self):
         return f"{self.index.name} - {self.start_time.strftime('%Y-%m-%d %H:%M')}"
+    
+    class Meta:
+        indexes = [
+            # Calendar range scans and per-member overlap probes
+            models.Index(fields=['start_time', 'end_time'], name='job_start_end_idx'),
+            models.Index(fields=['assigned_to', 'start_time'], name='job_member_start_idx'),
+        ]
+
+class JobSeries(models.Model):
+    """Model representing a recurring job, expanded into occurrences on demand."""
+    index = models.ForeignKey(Index, on_delete=models.CASCADE, related_name='job_series')
+    title = models.CharField(max_length=200)
+    start_time = models.DateTimeField()  # Start of the first occurrence (DTSTART)
+    duration = models.DurationField()
+    recurrence = models.CharField(max_length=500)  # RFC 5545 RRULE, e.g. FREQ=WEEKLY;BYDAY=MO
+    assigned_to = models.ForeignKey(
+        TeamMember, 
+        on_delete=models.SET_NULL, 
+        null=True, 
+        blank=True,
+        related_name='assigned_series'
+    )
+    color = models.CharField(max_length=20, default='#3174ad')  # For calendar display
+    notes = models.TextField(blank=True)
+    
+    def __str__(self):
+        return f"{self.index.name} - {self.title} ({self.recurrence})"
+    
+    class Meta:
+        verbose_name_plural = "Job series"
+
+class JobOccurrence(models.Model):
+    """Model storing an exception to one occurrence of a job series.
+
+    Only occurrences that differ from their series are stored. An override
+    holds the occurrence's full values, so a null assigned_to means the
+    occurrence is unassigned.
+    """
+    series = models.ForeignKey(JobSeries, on_delete=models.CASCADE, related_name='overrides')
+    original_start = models.DateTimeField()  # Start the series rule generated (RECURRENCE-ID)
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    assigned_to = models.ForeignKey(
+        TeamMember, 
+        on_delete=models.SET_NULL, 
+        null=True, 
+        blank=True,
+        related_name='assigned_occurrences'
+    )
+    notes = models.TextField(blank=True)
+    cancelled = models.BooleanField(default=False)
+    
+    def __str__(self):
+        return f"{self.series.title} - {self.original_start.strftime('%Y-%m-%d %H:%M')}"
+    
+    class Meta:
+        unique_together = ('series', 'original_start')
+        indexes = [
+            models.Index(fields=['start_time', 'end_time'], name='occurrence_start_end_idx'),
+        ]
 
 # New models for the runbook tasks
 
@@ -100,4 +161,133 @@ class TaskSignOff(models.Model):
     
     class Meta:
         unique_together = ('task_group', 'team_member', 'completed_date')
-        ordering = ['-sign_off_date']
\ No newline at end of file
+        ordering = ['-sign_off_date']
+        indexes = [
+            # Keyset pages of the task history
+            models.Index(fields=['sign_off_date', 'id'], name='signoff_history_idx'),
+            # Task history windows on completed_date, ordered within them
+            models.Index(fields=['completed_date', 'sign_off_date', 'id'], name='signoff_window_idx'),
+        ]
+
+class DashboardSnapshot(models.Model):
+    """Model caching the serialized task dashboard for a date and time slot."""
+    completed_date = models.DateField()
+    time_slot = models.ForeignKey(
+        TimeSlot,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='dashboard_snapshots'
+    )  # Null means the dashboard across all time slots
+    payload = models.JSONField(default=list, encoder=JSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        slot = self.time_slot.name if self.time_slot_id else 'All time slots'
+        return f"Dashboard {self.completed_date} ({slot})"
+    
+    class Meta:
+        unique_together = ('completed_date', 'time_slot')
+
+class DataVersion(models.Model):
+    """Model holding a change counter for a family of related models."""
+    family = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.family} v{self.version}"
+
+class ChangeLog(models.Model):
+    """Model journaling runbook and sign-off changes for delta sync.
+
+    The id is the change cursor handed to clients. Rows keep plain ids rather
+    than foreign keys so deletions survive as tombstones.
+    """
+    TASK_GROUP = 'task_group'
+    TASK = 'task'
+    SIGNOFF = 'signoff'
+    KIND_CHOICES = [
+        (TASK_GROUP, 'Task group'),
+        (TASK, 'Task'),
+        (SIGNOFF, 'Sign-off'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    task_group_id = models.BigIntegerField()
+    completed_date = models.DateField(null=True, blank=True)  # Sign-offs only
+    deleted = models.BooleanField(default=False)
+    recorded_at = models.DateTimeField(auto_now_add=True)  # For pruning past the retention window
+    
+    def __str__(self):
+        action = 'deleted' if self.deleted else 'changed'
+        return f"#{self.pk} {self.kind} {self.object_id} {action}"
+    
+    class Meta:
+        ordering = ['id']
+
+class CompletionRollup(models.Model):
+    """Model holding one day's sign-off totals for a company and time slot.
+
+    Rows are derived from TaskSignOff and only exist for days with sign-offs.
+    A sign-off is late when it was made after the day it completes had ended.
+    """
+    completed_date = models.DateField()
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='completion_rollups')
+    time_slot = models.ForeignKey(TimeSlot, on_delete=models.CASCADE, related_name='completion_rollups')
+    completed_task_groups = models.PositiveIntegerField(default=0)  # Distinct groups signed off
+    signoffs = models.PositiveIntegerField(default=0)
+    late_signoffs = models.PositiveIntegerField(default=0)
+    late_seconds = models.PositiveBigIntegerField(default=0)  # Total lateness of the late ones
+    
+    def __str__(self):
+        return f"{self.company.name} {self.time_slot.name} {self.completed_date}"
+    
+    class Meta:
+        unique_together = ('completed_date', 'company', 'time_slot')
+
+class MemberRollup(models.Model):
+    """Model holding one day's sign-off totals for a team member, company and time slot."""
+    completed_date = models.DateField()
+    team_member = models.ForeignKey(TeamMember, on_delete=models.CASCADE, related_name='signoff_rollups')
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='member_rollups')
+    time_slot = models.ForeignKey(TimeSlot, on_delete=models.CASCADE, related_name='member_rollups')
+    signoffs = models.PositiveIntegerField(default=0)
+    late_signoffs = models.PositiveIntegerField(default=0)
+    late_seconds = models.PositiveBigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.team_member.name} {self.completed_date}"
+    
+    class Meta:
+        unique_together = ('completed_date', 'team_member', 'company', 'time_slot')
+
+class ArchivedSignOff(models.Model):
+    """Model holding a sign-off moved out of TaskSignOff into the archive database.
+
+    Rows keep their original ids and carry the names they were shown with,
+    since the runbook rows they point to live in another database and may
+    be gone by the time the history is read.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    task_group_id = models.BigIntegerField()
+    company_id = models.BigIntegerField()
+    time_slot_id = models.BigIntegerField()
+    team_member_id = models.BigIntegerField()
+    task_group_name = models.CharField(max_length=200)
+    company_name = models.CharField(max_length=100)
+    time_slot_name = models.CharField(max_length=50)
+    team_member_name = models.CharField(max_length=100)
+    sign_off_date = models.DateTimeField()
+    completed_date = models.DateField()
+    notes = models.TextField(blank=True)
+    
+    def __str__(self):
+        return f"{self.company_name} - {self.task_group_name} - Signed by {self.team_member_name} (archived)"
+    
+    class Meta:
+        ordering = ['-sign_off_date']
+        indexes = [
+            models.Index(fields=['sign_off_date', 'id'], name='archived_history_idx'),
+            models.Index(fields=['completed_date'], name='archived_completed_idx'),
+        ]
@@ -0,0 +1,125 @@
+# scheduler/recurrence.py
+from dataclasses import dataclass
+from datetime import datetime
+
+from dateutil.rrule import rrulestr
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import JobSeries, JobOccurrence, TeamMember
+
+
+def parse_rule(recurrence, dtstart):
+    """Parse an RFC 5545 RRULE (with or without the RRULE: prefix).
+
+    Rules are evaluated on naive wall-clock times in the configured time
+    zone, so a daily 09:00 job stays at 09:00 across DST changes.
+    """
+    rule = recurrence.strip()
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[len('RRULE:'):]
+    return rrulestr(rule, dtstart=_local(dtstart))
+
+
+def _local(value):
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def _aware(value):
+    return timezone.make_aware(value)
+
+
+def is_occurrence(series, original_start):
+    """Whether the series rule generates an occurrence starting at original_start."""
+    return _local(original_start) in parse_rule(series.recurrence, series.start_time)
+
+
+@dataclass
+class Occurrence:
+    """One occurrence of a job series, generated or overridden."""
+    series: JobSeries
+    original_start: datetime
+    start_time: datetime
+    end_time: datetime
+    assigned_to: TeamMember
+    notes: str
+
+    @property
+    def id(self):
+        return f"{self.series.id}:{self.original_start.isoformat()}"
+
+    @classmethod
+    def generated(cls, series, original_start):
+        return cls(
+            series=series,
+            original_start=original_start,
+            start_time=original_start,
+            end_time=original_start + series.duration,
+            assigned_to=series.assigned_to,
+            notes=series.notes,
+        )
+
+    @classmethod
+    def overridden(cls, series, override):
+        return cls(
+            series=series,
+            original_start=override.original_start,
+            start_time=override.start_time,
+            end_time=override.end_time,
+            assigned_to=override.assigned_to,
+            notes=override.notes,
+        )
+
+
+def occurrence_starts(series, start, end):
+    """Return the original starts of the occurrences the series rule generates overlapping [start, end).
+
+    Works on unsaved series too; stored overrides are not consulted.
+    """
+    rule = parse_rule(series.recurrence, series.start_time)
+    # Occurrences starting up to one duration before the window still overlap it
+    return [_aware(local_start) for local_start in rule.between(_local(start - series.duration), _local(end))]
+
+
+def expand_series(start, end, index_id=None, contained=False):
+    """Expand every job series into its occurrences overlapping [start, end).
+
+    Only the window is expanded: series are read in one query, stored
+    overrides in another, and the rest is generated from the rules. With
+    contained=True only occurrences lying entirely inside the window are
+    returned, matching the contained-range job filter.
+    """
+    series_list = list(
+        JobSeries.objects.select_related('index', 'assigned_to').filter(start_time__lt=end)
+    )
+    if index_id:
+        series_list = [series for series in series_list if str(series.index_id) == str(index_id)]
+    if not series_list:
+        return []
+
+    longest = max(series.duration for series in series_list)
+    overrides = {}
+    for override in JobOccurrence.objects.select_related('assigned_to').filter(
+        Q(original_start__gt=start - longest, original_start__lt=end)
+        | Q(start_time__lt=end, end_time__gt=start),
+        series__in=series_list,
+    ):
+        overrides[(override.series_id, override.original_start)] = override
+
+    occurrences = []
+    for series in series_list:
+        for original_start in occurrence_starts(series, start, end):
+            if (series.id, original_start) not in overrides:
+                occurrences.append(Occurrence.generated(series, original_start))
+
+    series_by_id = {series.id: series for series in series_list}
+    for (series_id, _), override in overrides.items():
+        if not override.cancelled:
+            occurrences.append(Occurrence.overridden(series_by_id[series_id], override))
+
+    if contained:
+        occurrences = [o for o in occurrences if o.start_time >= start and o.end_time <= end]
+    else:
+        occurrences = [o for o in occurrences if o.start_time < end and o.end_time > start]
+    occurrences.sort(key=lambda o: o.start_time)
+    return occurrences
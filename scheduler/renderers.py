@@ -0,0 +1,54 @@
+# scheduler/renderers.py
+import csv
+import io
+
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """Render a list of flat dicts as CSV, one column per key of the first row.
+
+    Selected with `?format=csv` or an `Accept: text/csv` header. Error
+    responses, which are single dicts, are written as one row.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        buffer = io.StringIO()
+        if rows:
+            writer = csv.DictWriter(buffer, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return buffer.getvalue().encode(self.charset)
+
+
+class XLSXRenderer(BaseRenderer):
+    """Render a list of flat dicts as a one-sheet Excel workbook.
+
+    Selected with `?format=xlsx`. Large exports stream their own workbook;
+    this covers small payloads and error responses.
+    """
+    media_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    format = 'xlsx'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        from openpyxl import Workbook
+
+        rows = data if isinstance(data, list) else [data]
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        if rows:
+            sheet.append(list(rows[0]))
+            for row in rows:
+                sheet.append([str(value) if isinstance(value, (dict, list)) else value
+                              for value in row.values()])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return buffer.getvalue()
@@ -0,0 +1,235 @@
+# scheduler/rollups.py
+from collections import defaultdict
+from itertools import chain
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from .models import ArchivedSignOff, CompletionRollup, MemberRollup, TaskGroup, TaskSignOff
+from .versioning import bump
+
+# Days of sign-offs aggregated per step of a backfill
+BACKFILL_DAYS = 31
+
+# Keys refreshed per query; SQLite caps the depth of the OR'd filter at 1000
+REFRESH_BATCH_SIZE = 200
+
+ROLLUP_FIELDS = [
+    'completed_date', 'task_group_id', 'task_group__company_id', 'task_group__time_slot_id',
+    'team_member_id', 'sign_off_date',
+]
+
+# Archived sign-offs carry their company and time slot themselves
+ARCHIVED_ROLLUP_FIELDS = [
+    'completed_date', 'task_group_id', 'company_id', 'time_slot_id',
+    'team_member_id', 'sign_off_date',
+]
+
+
+def lateness(completed_date, sign_off_date):
+    """Seconds a sign-off was made after its completed day ended, or 0."""
+    day_end = timezone.make_aware(datetime.combine(completed_date + timedelta(days=1), time.min))
+    return max(0, int((sign_off_date - day_end).total_seconds()))
+
+
+def _aggregate(rows):
+    """Fold sign-off rows into unsaved completion and member rollups."""
+    completion = {}
+    members = {}
+    groups = defaultdict(set)
+    for day, task_group_id, company_id, time_slot_id, member_id, sign_off_date in rows:
+        key = (day, company_id, time_slot_id)
+        if key not in completion:
+            completion[key] = CompletionRollup(
+                completed_date=day, company_id=company_id, time_slot_id=time_slot_id
+            )
+        if key + (member_id,) not in members:
+            members[key + (member_id,)] = MemberRollup(
+                completed_date=day, company_id=company_id, time_slot_id=time_slot_id,
+                team_member_id=member_id
+            )
+        groups[key].add(task_group_id)
+
+        late = lateness(day, sign_off_date)
+        for rollup in (completion[key], members[key + (member_id,)]):
+            rollup.signoffs += 1
+            if late:
+                rollup.late_signoffs += 1
+                rollup.late_seconds += late
+
+    for key, rollup in completion.items():
+        rollup.completed_task_groups = len(groups[key])
+    return list(completion.values()), list(members.values())
+
+
+def _key_filter(keys, through=''):
+    # Sign-offs reach company and time slot through their task group
+    query = Q()
+    for day, company_id, time_slot_id in keys:
+        query |= Q(**{
+            'completed_date': day,
+            f'{through}company_id': company_id,
+            f'{through}time_slot_id': time_slot_id,
+        })
+    return query
+
+
+def refresh_rollups(keys):
+    """Recompute the rollups of the given (completed_date, company, time slot) keys.
+
+    Each key is rebuilt from its own sign-offs, which the unique index on
+    (task group, member, date) keeps to a handful of rows, so creates,
+    deletes and edits that move a sign-off all come out right. Keys are
+    refreshed REFRESH_BATCH_SIZE at a time, in one transaction.
+    """
+    keys = sorted(set(keys), key=lambda key: (key[0], key[1] or 0, key[2] or 0))
+    if not keys:
+        return
+    with transaction.atomic():
+        for start in range(0, len(keys), REFRESH_BATCH_SIZE):
+            batch = keys[start:start + REFRESH_BATCH_SIZE]
+            completion, members = _aggregate(chain(
+                TaskSignOff.objects.filter(_key_filter(batch, 'task_group__'))
+                .values_list(*ROLLUP_FIELDS).order_by(),
+                # A late sign-off for an archived day joins the archived ones
+                ArchivedSignOff.objects.filter(_key_filter(batch))
+                .values_list(*ARCHIVED_ROLLUP_FIELDS).order_by(),
+            ))
+            CompletionRollup.objects.filter(_key_filter(batch)).delete()
+            MemberRollup.objects.filter(_key_filter(batch)).delete()
+            CompletionRollup.objects.bulk_create(completion)
+            MemberRollup.objects.bulk_create(members)
+        bump('analytics')
+
+
+def backfill_rollups(start=None, end=None):
+    """Rebuild every rollup between start and end (inclusive) from raw and archived sign-offs.
+
+    Sign-offs are streamed a month at a time, so memory is bounded by one
+    month of rollups. Returns the number of sign-offs read.
+    """
+    signoffs = TaskSignOff.objects.order_by()
+    archived = ArchivedSignOff.objects.order_by()
+    if start is None or end is None:
+        bounds = [
+            source.aggregate(first=Min('completed_date'), last=Max('completed_date'))
+            for source in (signoffs, archived)
+        ]
+        start = start or min((b['first'] for b in bounds if b['first']), default=None)
+        end = end or max((b['last'] for b in bounds if b['last']), default=None)
+    if start is None or end is None:
+        return 0
+
+    total = 0
+    day = start
+    while day <= end:
+        last = min(day + timedelta(days=BACKFILL_DAYS - 1), end)
+        rows = chain(
+            signoffs.filter(completed_date__range=(day, last))
+            .values_list(*ROLLUP_FIELDS).iterator(chunk_size=5000),
+            archived.filter(completed_date__range=(day, last))
+            .values_list(*ARCHIVED_ROLLUP_FIELDS).iterator(chunk_size=5000),
+        )
+        completion, members = _aggregate(rows)
+        with transaction.atomic():
+            CompletionRollup.objects.filter(completed_date__range=(day, last)).delete()
+            MemberRollup.objects.filter(completed_date__range=(day, last)).delete()
+            CompletionRollup.objects.bulk_create(completion, batch_size=1000)
+            MemberRollup.objects.bulk_create(members, batch_size=1000)
+        total += sum(rollup.signoffs for rollup in completion)
+        day = last + timedelta(days=1)
+    bump('analytics')
+    return total
+
+
+def _totals(rollups, *fields, **aggregates):
+    """Sum rollups grouped by fields, keyed by the tuple of their values."""
+    return {
+        tuple(row[field] for field in fields): row
+        for row in rollups.values(*fields).annotate(
+            total_signoffs=Sum('signoffs'),
+            total_late=Sum('late_signoffs'),
+            total_late_seconds=Sum('late_seconds'),
+            **aggregates
+        ).order_by()
+    }
+
+
+def _rates(row, expected=None):
+    signoffs = row['total_signoffs'] if row else 0
+    late = row['total_late'] if row else 0
+    entry = {}
+    if expected is not None:
+        completed = row['completed'] if row else 0
+        entry.update({
+            'completed': completed,
+            'expected': expected,
+            'completion_rate': round(min(1, completed / expected), 4) if expected else None,
+        })
+    entry.update({
+        'signoffs': signoffs,
+        'late_signoffs': late,
+        'late_rate': round(late / signoffs, 4) if signoffs else None,
+        'average_late_minutes': round(row['total_late_seconds'] / late / 60, 1) if late else None,
+    })
+    return entry
+
+
+def completion_analytics(start, end, company_id=None, time_slot_id=None):
+    """Completion rates and late sign-off trends between start and end, from rollups only.
+
+    A task group is expected to be signed off once a day, measured against
+    the current catalog. The report is five grouped reads: the catalog size
+    and the rollups per day, company, time slot and team member.
+    """
+    catalog = TaskGroup.objects.all()
+    scope = {'completed_date__range': (start, end)}
+    if company_id:
+        catalog = catalog.filter(company_id=company_id)
+        scope['company_id'] = company_id
+    if time_slot_id:
+        catalog = catalog.filter(time_slot_id=time_slot_id)
+        scope['time_slot_id'] = time_slot_id
+    days = (end - start).days + 1
+
+    companies = {}
+    time_slots = {}
+    for size in catalog.values(
+        'company_id', 'company__name', 'time_slot_id', 'time_slot__name'
+    ).annotate(task_groups=Count('id')).order_by('company__name', 'time_slot__name'):
+        companies.setdefault(size['company_id'], [size['company__name'], 0])[1] += size['task_groups']
+        time_slots.setdefault(size['time_slot_id'], [size['time_slot__name'], 0])[1] += size['task_groups']
+    per_day = sum(task_groups for _, task_groups in companies.values())
+
+    completion = CompletionRollup.objects.filter(**scope)
+    completed = Sum('completed_task_groups')
+
+    by_day = _totals(completion, 'completed_date', completed=completed)
+    trend = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        trend.append({'date': day, **_rates(by_day.get((day,)), per_day)})
+
+    def breakdown(field, sizes):
+        totals = _totals(completion, field, completed=completed)
+        return [
+            {'id': key, 'name': name, **_rates(totals.get((key,)), task_groups * days)}
+            for key, (name, task_groups) in sizes.items()
+        ]
+
+    members = _totals(
+        MemberRollup.objects.filter(**scope), 'team_member_id', 'team_member__name'
+    )
+    return {
+        'start': start,
+        'end': end,
+        'days': trend,
+        'companies': breakdown('company_id', companies),
+        'time_slots': breakdown('time_slot_id', time_slots),
+        'team_members': [
+            {'id': member_id, 'name': name, **_rates(row)}
+            for (member_id, name), row in sorted(members.items(), key=lambda item: item[0][1])
+        ],
+    }
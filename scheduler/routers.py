@@ -0,0 +1,27 @@
+# scheduler/routers.py
+
+# Models stored in the archive database rather than the default one
+ARCHIVE_MODELS = {'archivedsignoff'}
+
+
+class ArchiveRouter:
+    """Send archived history to the 'archive' database and everything else to 'default'."""
+
+    def _database(self, model):
+        if model._meta.app_label == 'scheduler' and model._meta.model_name in ARCHIVE_MODELS:
+            return 'archive'
+        return 'default'
+
+    def db_for_read(self, model, **hints):
+        return self._database(model)
+
+    def db_for_write(self, model, **hints):
+        return self._database(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return self._database(type(obj1)) == self._database(type(obj2))
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'scheduler' and model_name in ARCHIVE_MODELS:
+            return db == 'archive'
+        return db == 'default'
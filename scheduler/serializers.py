@@ -1,8 +1,10 @@
 # scheduler/serializers.py
 from rest_framework import serializers
+from .conflicts import member_conflicts, series_conflicts
+from .recurrence import parse_rule
 from .models import (
-    Index, TeamMember, Job, 
-    Company, TimeSlot, TaskGroup, Task, TaskSignOff
+    Index, TeamMember, Job, JobSeries, JobOccurrence,
+    Company, TimeSlot, TaskGroup, Task, TaskSignOff, ArchivedSignOff
 )
 
 class IndexSerializer(serializers.ModelSerializer):
@@ -26,6 +28,122 @@ class JobSerializer(serializers.ModelSerializer):
             'end_time', 'assigned_to', 'assigned_to_name', 
             'color', 'notes'
         ]
+    
+    def validate(self, attrs):
+        """Reject assigning a team member who is already booked for an overlapping job."""
+        def current(field):
+            if field in attrs:
+                return attrs[field]
+            return getattr(self.instance, field, None)
+        
+        start, end = current('start_time'), current('end_time')
+        member = current('assigned_to')
+        if member and start and end:
+            conflict_ids = member_conflicts(
+                member.id, start, end, exclude_job_id=getattr(self.instance, 'pk', None)
+            )[:10]
+            if conflict_ids:
+                raise serializers.ValidationError({
+                    'assigned_to': f'{member.name} is already booked for jobs {conflict_ids}.'
+                })
+        return attrs
+
+class PreloadedRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field resolved from objects the view loaded in bulk.
+
+    The context holds a dict of instances by pk under the field's
+    `preloaded` key, so validating many items costs no query per item.
+    """
+    def __init__(self, preloaded, **kwargs):
+        self.preloaded = preloaded
+        super().__init__(**kwargs)
+    
+    def to_internal_value(self, data):
+        try:
+            return self.context[self.preloaded][int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+class BulkJobSerializer(JobSerializer):
+    """Validates one item of a bulk job request against preloaded related objects.
+
+    Double-bookings are checked for the whole batch at once, so the per-item
+    conflict probe of JobSerializer is skipped.
+    """
+    index = PreloadedRelatedField('indexes', queryset=Index.objects.all())
+    assigned_to = PreloadedRelatedField(
+        'team_members', queryset=TeamMember.objects.all(), allow_null=True, required=False
+    )
+    
+    def validate(self, attrs):
+        return attrs
+
+class JobSeriesSerializer(serializers.ModelSerializer):
+    index_name = serializers.CharField(source='index.name', read_only=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.name', read_only=True)
+    
+    class Meta:
+        model = JobSeries
+        fields = [
+            'id', 'index', 'index_name', 'title', 'start_time', 'duration',
+            'recurrence', 'assigned_to', 'assigned_to_name', 'color', 'notes'
+        ]
+    
+    def validate(self, attrs):
+        """Check the recurrence rule parses, and that the assignee is free for its occurrences."""
+        def current(field):
+            if field in attrs:
+                return attrs[field]
+            return getattr(self.instance, field, None)
+        
+        recurrence, start_time = current('recurrence'), current('start_time')
+        try:
+            parse_rule(recurrence, start_time)
+        except (ValueError, TypeError) as e:
+            raise serializers.ValidationError({'recurrence': f'Invalid RRULE: {e}'})
+        
+        # Only a new assignee or a new schedule can introduce double-bookings
+        member = current('assigned_to')
+        scheduling = ('assigned_to', 'recurrence', 'start_time', 'duration')
+        if member and (self.instance is None or any(
+            field in attrs and attrs[field] != getattr(self.instance, field) for field in scheduling
+        )):
+            series = JobSeries(
+                pk=getattr(self.instance, 'pk', None), recurrence=recurrence,
+                start_time=start_time, duration=current('duration'),
+            )
+            conflict_ids = series_conflicts(series, member.id)[:10]
+            if conflict_ids:
+                raise serializers.ValidationError({
+                    'assigned_to': f'{member.name} is already booked for jobs {conflict_ids}.'
+                })
+        return attrs
+
+class OccurrenceSerializer(serializers.Serializer):
+    """Serializes series occurrences in the same shape as JobSerializer."""
+    id = serializers.CharField(read_only=True)
+    series = serializers.IntegerField(source='series.id', read_only=True)
+    original_start = serializers.DateTimeField(read_only=True)
+    index = serializers.IntegerField(source='series.index_id', read_only=True)
+    index_name = serializers.CharField(source='series.index.name', read_only=True)
+    title = serializers.CharField(source='series.title', read_only=True)
+    start_time = serializers.DateTimeField(read_only=True)
+    end_time = serializers.DateTimeField(read_only=True)
+    assigned_to = serializers.IntegerField(source='assigned_to.id', read_only=True, allow_null=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.name', read_only=True, allow_null=True)
+    color = serializers.CharField(source='series.color', read_only=True)
+    notes = serializers.CharField(read_only=True)
+
+class JobOccurrenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobOccurrence
+        fields = [
+            'id', 'series', 'original_start', 'start_time', 'end_time',
+            'assigned_to', 'notes', 'cancelled'
+        ]
+        read_only_fields = ['series']
 
 # New serializers for task models
 
@@ -65,8 +183,26 @@ class TaskSignOffSerializer(serializers.ModelSerializer):
         fields = ['id', 'task_group', 'task_group_name', 'team_member', 'team_member_name',
                   'sign_off_date', 'completed_date', 'notes', 'company_name', 'time_slot_name']
         
+class ArchivedSignOffSerializer(serializers.ModelSerializer):
+    """Archived sign-off in the same shape as TaskSignOffSerializer."""
+    task_group = serializers.IntegerField(source='task_group_id', read_only=True)
+    team_member = serializers.IntegerField(source='team_member_id', read_only=True)
+    
+    class Meta:
+        model = ArchivedSignOff
+        fields = ['id', 'task_group', 'task_group_name', 'team_member', 'team_member_name',
+                  'sign_off_date', 'completed_date', 'notes', 'company_name', 'time_slot_name']
+
 # Nested serializers for dashboard views
 
+def signoff_summary(signoff):
+    """Compact sign-off representation embedded in dashboard task groups."""
+    return {
+        'id': signoff.id,
+        'team_member_name': signoff.team_member.name,
+        'sign_off_date': signoff.sign_off_date,
+    }
+
 class TaskGroupWithSignoffsSerializer(serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)
     company_name = serializers.CharField(source='company.name', read_only=True)
@@ -82,13 +218,14 @@ class TaskGroupWithSignoffsSerializer(serializers.ModelSerializer):
         # Get today's date for context
         today = self.context.get('today')
         if today:
-            signoff = obj.signoffs.filter(completed_date=today).first()
+            # Use the sign-offs prefetched by dashboard_companies when present
+            day_signoffs = getattr(obj, 'day_signoffs', None)
+            if day_signoffs is not None:
+                signoff = day_signoffs[0] if day_signoffs else None
+            else:
+                signoff = obj.signoffs.filter(completed_date=today).first()
             if signoff:
-                return {
-                    'id': signoff.id,
-                    'team_member_name': signoff.team_member.name,
-                    'sign_off_date': signoff.sign_off_date,
-                }
+                return signoff_summary(signoff)
         return None
 
 class CompanyTasksSerializer(serializers.ModelSerializer):
@@ -103,10 +240,12 @@ class CompanyTasksSerializer(serializers.ModelSerializer):
         time_slot_id = self.context.get('time_slot_id')
         today = self.context.get('today')
         
-        # Filter task groups by time slot if provided
-        queryset = obj.task_groups.all()
-        if time_slot_id:
-            queryset = queryset.filter(time_slot_id=time_slot_id)
+        # Task groups prefetched by dashboard_companies are already filtered
+        queryset = getattr(obj, 'dashboard_task_groups', None)
+        if queryset is None:
+            queryset = obj.task_groups.all()
+            if time_slot_id:
+                queryset = queryset.filter(time_slot_id=time_slot_id)
             
         serializer = TaskGroupWithSignoffsSerializer(
             queryset, 
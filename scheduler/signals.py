@@ -0,0 +1,141 @@
+# scheduler/signals.py
+import threading
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .jobs import record_job_durations
+from .models import Company, Job, TimeSlot, TeamMember, TaskGroup, Task, TaskSignOff, ChangeLog
+from .sync import record_change
+from .versioning import MODEL_FAMILIES, bump
+from . import dashboard, rollups, writes
+
+# Dashboard and rollup refreshes requested during the current transaction, applied together on commit
+_pending = threading.local()
+
+
+def _schedule(kind, key):
+    if not hasattr(_pending, 'task_groups'):
+        _pending.task_groups = set()
+        _pending.signoffs = set()
+        _pending.rollups = set()
+    getattr(_pending, kind).add(key)
+    # Every change registers a callback; the first one to run drains the sets
+    transaction.on_commit(flush_pending)
+
+
+def flush_pending():
+    """Apply the queued dashboard and rollup refreshes in one transaction.
+
+    Runs on commit, or earlier from perform_write so that the refreshes
+    commit together with the write that caused them.
+    """
+    if not hasattr(_pending, 'task_groups'):
+        return
+    task_groups, signoffs, rollup_keys = _pending.task_groups, _pending.signoffs, _pending.rollups
+    if not task_groups and not signoffs and not rollup_keys:
+        return
+    _pending.task_groups, _pending.signoffs, _pending.rollups = set(), set(), set()
+    _pending.groups = {}
+    # It reads before it writes, so it takes the write lock first
+    with transaction.atomic():
+        writes.lock_for_writing()
+        dashboard.refresh_task_groups(task_groups)
+        dashboard.refresh_signoffs(
+            (task_group_id, day) for task_group_id, day in signoffs
+            if task_group_id not in task_groups
+        )
+        rollups.refresh_rollups(rollup_keys)
+
+
+def _rollup_key(task_group_id, completed_date):
+    # Cascading deletes send one signal per sign-off, so look each group up once
+    if not hasattr(_pending, 'groups'):
+        _pending.groups = {}
+    if task_group_id not in _pending.groups:
+        _pending.groups[task_group_id] = TaskGroup.objects.filter(pk=task_group_id).values_list(
+            'company_id', 'time_slot_id'
+        ).first() or (None, None)
+    return (completed_date, *_pending.groups[task_group_id])
+
+
+@receiver(pre_save, sender=TaskSignOff)
+def signoff_moving(sender, instance, **kwargs):
+    # An edit may move a sign-off to another day or task group, which needs its old rollup fixed
+    if instance.pk:
+        before = TaskSignOff.objects.filter(pk=instance.pk).values_list(
+            'task_group_id', 'completed_date'
+        ).first()
+        if before and before != (instance.task_group_id, instance.completed_date):
+            _schedule('rollups', _rollup_key(*before))
+
+
+@receiver([post_save, post_delete], sender=TaskSignOff)
+def signoff_changed(sender, instance, signal, **kwargs):
+    _schedule('signoffs', (instance.task_group_id, instance.completed_date))
+    _schedule('rollups', _rollup_key(instance.task_group_id, instance.completed_date))
+    record_change(
+        ChangeLog.SIGNOFF, instance.pk, instance.task_group_id,
+        completed_date=instance.completed_date, deleted=signal is post_delete
+    )
+
+
+def signoffs_upserted(signoffs):
+    """Apply what the sign-off signals would for sign-offs written in bulk.
+
+    Bulk writes send no signals. The sign-offs must have their task groups
+    loaded; bulk writes never move a sign-off, so only the new keys are queued.
+    """
+    if not signoffs:
+        return
+    for signoff in signoffs:
+        task_group = signoff.task_group
+        _schedule('signoffs', (task_group.id, signoff.completed_date))
+        _schedule('rollups', (signoff.completed_date, task_group.company_id, task_group.time_slot_id))
+    ChangeLog.objects.bulk_create([
+        ChangeLog(
+            kind=ChangeLog.SIGNOFF, object_id=signoff.pk, task_group_id=signoff.task_group_id,
+            completed_date=signoff.completed_date
+        )
+        for signoff in signoffs
+    ])
+    bump('signoffs')
+
+
+@receiver([post_save, post_delete], sender=TaskGroup)
+def task_group_changed(sender, instance, signal, **kwargs):
+    _schedule('task_groups', instance.pk)
+    record_change(ChangeLog.TASK_GROUP, instance.pk, instance.pk, deleted=signal is post_delete)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def task_changed(sender, instance, signal, **kwargs):
+    _schedule('task_groups', instance.task_group_id)
+    record_change(
+        ChangeLog.TASK, instance.pk, instance.task_group_id, deleted=signal is post_delete
+    )
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, **kwargs):
+    # Keeps the bound that overlap queries scan back from
+    record_job_durations([instance])
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=TimeSlot)
+@receiver(post_save, sender=TeamMember)
+def names_changed(sender, instance, created, **kwargs):
+    # Renames touch every snapshot, so drop them instead of patching
+    if not created:
+        transaction.on_commit(dashboard.clear_snapshots)
+
+
+def version_changed(sender, **kwargs):
+    bump(MODEL_FAMILIES[sender])
+
+
+for model in MODEL_FAMILIES:
+    post_save.connect(version_changed, sender=model, dispatch_uid=f'version_{model.__name__}')
+    post_delete.connect(version_changed, sender=model, dispatch_uid=f'version_delete_{model.__name__}')
@@ -0,0 +1,142 @@
+# scheduler/signoffs.py
+from datetime import date, datetime
+
+from django.db import transaction
+
+from .models import TaskGroup, TaskSignOff, TeamMember
+from .signals import signoffs_upserted
+
+# Most sign-offs accepted in one bulk request
+MAX_BULK_SIGNOFFS = 500
+
+# The unique key an upsert resolves conflicts on
+UNIQUE_FIELDS = ['task_group', 'team_member', 'completed_date']
+
+
+class SignOffError(Exception):
+    """A sign-off request that was rejected as a whole."""
+
+    def __init__(self, message, status, **details):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.details = details
+
+
+def _id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _completed_date(value):
+    if not value:
+        return date.today()
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _signoff(entry, task_groups, team_members):
+    """Build the unsaved sign-off for an entry, or return its field errors."""
+    errors = {}
+    task_group = task_groups.get(_id(entry.get('task_group_id')))
+    team_member = team_members.get(_id(entry.get('team_member_id')))
+    completed_date = _completed_date(entry.get('completed_date'))
+    notes = entry.get('notes') or ''
+    if task_group is None:
+        errors['task_group_id'] = "Task group not found"
+    if team_member is None:
+        errors['team_member_id'] = "Team member not found"
+    if completed_date is None:
+        errors['completed_date'] = "Invalid date format. Use YYYY-MM-DD."
+    if not isinstance(notes, str):
+        errors['notes'] = "Notes must be text."
+    if errors:
+        return errors
+    return TaskSignOff(
+        task_group=task_group, team_member=team_member,
+        completed_date=completed_date, notes=notes
+    )
+
+
+def _stored(signoffs):
+    """The stored sign-offs for the keys of signoffs, by key."""
+    if not signoffs:
+        return {}
+    return {
+        (signoff.task_group_id, signoff.team_member_id, signoff.completed_date): signoff
+        for signoff in TaskSignOff.objects.filter(
+            task_group_id__in={key[0] for key in signoffs},
+            team_member_id__in={key[1] for key in signoffs},
+            completed_date__in={key[2] for key in signoffs},
+        ).order_by()
+        if (signoff.task_group_id, signoff.team_member_id, signoff.completed_date) in signoffs
+    }
+
+
+def upsert_signoffs(entries, defaults=None):
+    """Create or update a batch of sign-offs with one insert statement.
+
+    Task groups and team members are loaded with one query each and every
+    entry is validated before anything is written. Sign-offs already made
+    by the same member for the same task group and date get the new notes,
+    as the one-at-a-time sign-off always did; within a batch the last entry
+    for a key wins. Rows whose notes are unchanged are not written again.
+    A sign-off counts as created when its key was not stored before the
+    upsert; run through writes.perform_write, whose write lock keeps other
+    requests from adding a key in between. Returns (sign-off, created) pairs in entry order, with task
+    group, company, time slot and member loaded; raises SignOffError with
+    per-entry details when the batch is refused. Fields missing from an
+    entry are taken from defaults.
+    """
+    if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+        raise SignOffError("signoffs must be a list of objects.", 400)
+    if len(entries) > MAX_BULK_SIGNOFFS:
+        raise SignOffError(f"At most {MAX_BULK_SIGNOFFS} sign-offs can be sent at once.", 400)
+    if defaults:
+        entries = [{**defaults, **entry} for entry in entries]
+
+    task_groups = TaskGroup.objects.select_related('company', 'time_slot').in_bulk(
+        {_id(entry.get('task_group_id')) for entry in entries} - {None}
+    )
+    team_members = TeamMember.objects.in_bulk(
+        {_id(entry.get('team_member_id')) for entry in entries} - {None}
+    )
+    signoffs = {}
+    keys = []
+    errors = {}
+    for position, entry in enumerate(entries):
+        signoff = _signoff(entry, task_groups, team_members)
+        if isinstance(signoff, dict):
+            errors[position] = signoff
+            continue
+        key = (signoff.task_group_id, signoff.team_member_id, signoff.completed_date)
+        signoffs[key] = signoff
+        keys.append(key)
+    if errors:
+        raise SignOffError("Some sign-offs are invalid.", 400, errors=errors)
+    if not signoffs:
+        return []
+
+    with transaction.atomic():
+        existing = _stored(signoffs)
+        written = {
+            key: signoff for key, signoff in signoffs.items()
+            if key not in existing or existing[key].notes != signoff.notes
+        }
+        TaskSignOff.objects.bulk_create(
+            written.values(), update_conflicts=True, unique_fields=UNIQUE_FIELDS, update_fields=['notes']
+        )
+        # The upsert returns no ids, so new rows are read back by their keys
+        new = {key: signoff for key, signoff in signoffs.items() if key not in existing}
+        stored = {**existing, **_stored(new)}
+        for key, signoff in signoffs.items():
+            row = stored[key]
+            row.notes = signoff.notes
+            row.task_group, row.team_member = signoff.task_group, signoff.team_member
+        signoffs_upserted([stored[key] for key in written])
+
+    return [(stored[key], key not in existing) for key in dict.fromkeys(keys)]
@@ -0,0 +1,231 @@
+# scheduler/solver.py
+import heapq
+import time
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import transaction
+
+from .jobs import longest_job_duration, overlapping
+from .models import Job, TeamMember
+from .recurrence import expand_series
+from .versioning import bump
+
+# Jobs updated per statement when an assignment is written back
+WRITE_BATCH_SIZE = 500
+
+
+class Schedule:
+    """One member's booked intervals, kept sorted and non-overlapping."""
+
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        # Merge existing bookings so a member already double-booked stays disjoint
+        for start, end in sorted(intervals):
+            if self.ends and start < self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def is_free(self, start, end):
+        position = bisect_right(self.starts, start)
+        if position and self.ends[position - 1] > start:
+            return False
+        return position == len(self.starts) or self.starts[position] >= end
+
+    def add(self, start, end):
+        position = bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+
+    def remove(self, start, end):
+        position = bisect_right(self.starts, start) - 1
+        del self.starts[position]
+        del self.ends[position]
+
+
+def greedy_assign(jobs, busy, loads):
+    """Assign jobs to members without double-booking, least-loaded member first.
+
+    jobs is a list of (job_id, start, end) with times as numbers; busy maps
+    every candidate member to the intervals they are already booked for,
+    and loads to the time they already carry. Jobs are swept in start
+    order: members whose last solver job has ended wait in a heap keyed by
+    load, so each job costs O(log members) unless the least-loaded members
+    are blocked by existing bookings. loads is updated in place.
+
+    Returns ({job_id: member}, schedules, [job ids nobody was free for]).
+    """
+    schedules = {member: Schedule(busy.get(member, ())) for member in loads}
+    available = [(load, member) for member, load in loads.items()]
+    heapq.heapify(available)
+    working = []  # Heap of (end, member) for members on a solver job
+    assignment = {}
+    unassigned = []
+
+    for job_id, start, end in sorted(jobs, key=lambda job: job[1]):
+        while working and working[0][0] <= start:
+            _, member = heapq.heappop(working)
+            heapq.heappush(available, (loads[member], member))
+
+        blocked = []
+        chosen = None
+        while available:
+            load, member = heapq.heappop(available)
+            if schedules[member].is_free(start, end):
+                chosen = member
+                break
+            blocked.append((load, member))
+        for entry in blocked:
+            heapq.heappush(available, entry)
+
+        if chosen is None:
+            unassigned.append(job_id)
+            continue
+        schedules[chosen].add(start, end)
+        loads[chosen] += end - start
+        assignment[job_id] = chosen
+        heapq.heappush(working, (end, chosen))
+
+    return assignment, schedules, unassigned
+
+
+def _best_move(heavy, light, by_member, intervals, schedules, gap):
+    """The heavy member's job that best halves the gap and the light member is free for."""
+    best = None
+    for job_id in by_member[heavy]:
+        start, end = intervals[job_id]
+        duration = end - start
+        if duration >= gap or not schedules[light].is_free(start, end):
+            continue
+        if best is None or abs(gap - 2 * duration) < abs(gap - 2 * best[1]):
+            best = (job_id, duration)
+    return best
+
+
+def refine(jobs, assignment, schedules, loads, max_moves=None):
+    """Even out loads by moving solver-assigned jobs between any two members.
+
+    Pairs are tried widest gap first: every member, heaviest first, against
+    every lighter member, lightest first. The first pair with a job the
+    lighter member is free for, and shorter than their gap, moves the job
+    closest to half the gap. Each such move lowers the sum of squared
+    loads, so the pass ends; it stops when no pair has a move left.
+    assignment, schedules and loads are updated in place. Returns the
+    number of jobs moved.
+    """
+    if len(loads) < 2:
+        return 0
+    intervals = {job_id: (start, end) for job_id, start, end in jobs}
+    by_member = defaultdict(set)
+    for job_id, member in assignment.items():
+        by_member[member].add(job_id)
+
+    if max_moves is None:
+        max_moves = len(assignment)
+    moves = 0
+    while moves < max_moves:
+        order = sorted(loads, key=loads.get)
+        move = None
+        for heavy in reversed(order):
+            if not by_member[heavy]:
+                continue
+            shortest = min(intervals[job_id][1] - intervals[job_id][0] for job_id in by_member[heavy])
+            for light in order:
+                gap = loads[heavy] - loads[light]
+                # Lighter members come first, so the remaining gaps are all narrower
+                if gap <= shortest:
+                    break
+                best = _best_move(heavy, light, by_member, intervals, schedules, gap)
+                if best is not None:
+                    move = (heavy, light, *best)
+                    break
+            if move is not None:
+                break
+        if move is None:
+            break
+
+        heavy, light, job_id, duration = move
+        start, end = intervals[job_id]
+        schedules[heavy].remove(start, end)
+        schedules[light].add(start, end)
+        by_member[heavy].discard(job_id)
+        by_member[light].add(job_id)
+        loads[heavy] -= duration
+        loads[light] += duration
+        assignment[job_id] = light
+        moves += 1
+    return moves
+
+
+def balance_unassigned(start, end, refine_loads=True, dry_run=False, timings=None):
+    """Assign every unassigned job overlapping [start, end) to a team member.
+
+    Members are never double-booked against their jobs or recurring
+    occurrences, and assigned hours in the window are balanced greedily,
+    then optionally refined. Jobs are read as plain tuples and written back
+    with one UPDATE per member and batch, so memory stays proportional to
+    the jobs in the window. Seconds spent loading, solving and saving are
+    stored in timings when a dict is given.
+    """
+    timings = {} if timings is None else timings
+    began = time.perf_counter()
+    members = list(TeamMember.objects.values_list('id', flat=True))
+    jobs = [
+        (job_id, job_start.timestamp(), job_end.timestamp())
+        for job_id, job_start, job_end in overlapping(
+            Job.objects.filter(assigned_to__isnull=True), start, end
+        ).values_list('id', 'start_time', 'end_time').iterator()
+        if job_end > job_start
+    ]
+
+    # Unassigned jobs may run up to one job length past either end of the window
+    margin = longest_job_duration()
+    busy = defaultdict(list)
+    loads = {member: 0.0 for member in members}
+    booked = overlapping(
+        Job.objects.filter(assigned_to__isnull=False), start - margin, end + margin
+    ).values_list('assigned_to_id', 'start_time', 'end_time').iterator()
+    occurrences = (
+        (occurrence.assigned_to.id, occurrence.start_time, occurrence.end_time)
+        for occurrence in expand_series(start - margin, end + margin)
+        if occurrence.assigned_to is not None
+    )
+    for source in (booked, occurrences):
+        for member, job_start, job_end in source:
+            busy[member].append((job_start.timestamp(), job_end.timestamp()))
+            if job_start < end and job_end > start:
+                loads[member] = loads.get(member, 0.0) + (job_end - job_start).total_seconds()
+
+    loaded = time.perf_counter()
+    timings['load'] = loaded - began
+    assignment, schedules, unassigned = greedy_assign(jobs, busy, loads)
+    moved = refine(jobs, assignment, schedules, loads) if refine_loads else 0
+    solved = time.perf_counter()
+    timings['solve'] = solved - loaded
+
+    if assignment and not dry_run:
+        by_member = defaultdict(list)
+        for job_id, member in assignment.items():
+            by_member[member].append(job_id)
+        with transaction.atomic():
+            for member, job_ids in by_member.items():
+                for offset in range(0, len(job_ids), WRITE_BATCH_SIZE):
+                    # Jobs assigned by someone else meanwhile are left alone
+                    Job.objects.filter(
+                        pk__in=job_ids[offset:offset + WRITE_BATCH_SIZE],
+                        assigned_to__isnull=True,
+                    ).update(assigned_to_id=member)
+            # Queryset updates send no model signals
+            bump('jobs')
+    timings['save'] = time.perf_counter() - solved
+
+    return {
+        'assigned': len(assignment),
+        'moved': moved,
+        'unassigned': sorted(unassigned),
+        'hours': {member: round(load / 3600, 2) for member, load in loads.items()},
+        'dry_run': dry_run,
+    }
@@ -0,0 +1,127 @@
+# scheduler/sync.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .dashboard import runbook_task_groups
+from .models import ChangeLog, TaskSignOff
+from .serializers import TaskGroupWithSignoffsSerializer, TaskSignOffSerializer
+
+# Header carrying the change cursor on full responses
+CURSOR_HEADER = 'X-Change-Cursor'
+
+# Deltas larger than this tell the client to reload instead
+MAX_DELTA_CHANGES = 1000
+
+
+class CursorExpired(Exception):
+    """The changes after a cursor have been pruned; the client must reload in full."""
+
+
+def current_cursor():
+    """Return the cursor of the latest recorded change."""
+    return ChangeLog.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def record_change(kind, object_id, task_group_id, completed_date=None, deleted=False):
+    ChangeLog.objects.create(
+        kind=kind,
+        object_id=object_id,
+        task_group_id=task_group_id,
+        completed_date=completed_date,
+        deleted=deleted
+    )
+
+
+def change_horizon(days=None):
+    """The moment before which recorded changes may be pruned."""
+    if days is None:
+        days = settings.CHANGELOG_RETENTION_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def prune_changes(days=None):
+    """Delete the changes recorded before the horizon, returning how many went.
+
+    Only a run of the oldest ids is deleted, so every cursor from before the
+    first kept change is known to be expired. The latest change is always
+    kept so that ids, and with them cursors, never restart.
+    """
+    expired = ChangeLog.objects.filter(recorded_at__lt=change_horizon(days))
+    cutoff = expired.order_by('-id').values_list('id', flat=True).first()
+    if cutoff is None:
+        return 0
+    deleted, _ = ChangeLog.objects.filter(id__lte=cutoff, id__lt=current_cursor()).delete()
+    return deleted
+
+
+def _changes_since(since):
+    first = ChangeLog.objects.order_by('id').values_list('id', flat=True).first()
+    if first is not None and since < first - 1:
+        raise CursorExpired(current_cursor())
+    changes = list(
+        ChangeLog.objects.filter(id__gt=since)
+        .values_list('id', 'kind', 'object_id', 'task_group_id', 'completed_date')
+        [:MAX_DELTA_CHANGES + 1]
+    )
+    if len(changes) > MAX_DELTA_CHANGES:
+        return None, current_cursor()
+    return changes, changes[-1][0] if changes else since
+
+
+def dashboard_delta(since, time_slot_id, day):
+    """Return the dashboard task groups changed after a cursor.
+
+    Changed groups are re-serialized whole for the day. Groups that were
+    deleted or moved out of the time slot are listed as removed. Raises
+    CursorExpired when the changes after the cursor have been pruned.
+    """
+    changes, cursor = _changes_since(since)
+    if changes is None:
+        return {'cursor': cursor, 'reset': True}
+
+    affected = set()
+    for _, kind, _, task_group_id, completed_date in changes:
+        if kind != ChangeLog.SIGNOFF or completed_date == day:
+            affected.add(task_group_id)
+
+    task_groups = []
+    if affected:
+        signoffs = TaskSignOff.objects.select_related('team_member').filter(completed_date=day)
+        queryset = runbook_task_groups(time_slot_id).filter(pk__in=affected).prefetch_related(
+            'tasks', Prefetch('signoffs', queryset=signoffs, to_attr='day_signoffs')
+        )
+        task_groups = TaskGroupWithSignoffsSerializer(
+            queryset, many=True, context={'today': day}
+        ).data
+
+    present = {task_group['id'] for task_group in task_groups}
+    return {
+        'cursor': cursor,
+        'task_groups': task_groups,
+        'removed_task_groups': sorted(affected - present),
+    }
+
+
+def history_delta(since):
+    """Return the sign-offs created, updated or deleted after a cursor, or raise CursorExpired."""
+    changes, cursor = _changes_since(since)
+    if changes is None:
+        return {'cursor': cursor, 'reset': True}
+
+    affected = {
+        object_id for _, kind, object_id, _, _ in changes if kind == ChangeLog.SIGNOFF
+    }
+    signoffs = TaskSignOff.objects.filter(pk__in=affected).select_related(
+        'task_group__company', 'task_group__time_slot', 'team_member'
+    )
+    data = TaskSignOffSerializer(signoffs, many=True).data
+
+    present = {signoff['id'] for signoff in data}
+    return {
+        'cursor': cursor,
+        'signoffs': data,
+        'removed_signoffs': sorted(affected - present),
+    }
@@ -1,3 +1,1323 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
 
-# Create your tests here.
+import pandas as pd
+from django.db.models import Sum
+from django.db import connection
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from rest_framework.renderers import JSONRenderer
+
+from .archive import archive_signoffs
+from .dashboard import build_dashboard, signoff_matrix
+from .events import QUEUE_SIZE, broker
+from .importer import (
+    ImportTimings, import_runbook, import_runbooks, merge_plans, read_runbook, sync_runbook,
+)
+from .models import (
+    Index, Job, JobSeries, JobOccurrence, Company, TimeSlot, TaskGroup, Task, TaskSignOff,
+    TeamMember, DashboardSnapshot, CompletionRollup, MemberRollup, ChangeLog
+)
+from .rollups import backfill_rollups, completion_analytics
+from .signoffs import upsert_signoffs
+from .solver import Schedule, refine
+from .versioning import current_versions
+from .writes import raw_delete
+
+
+def make_runbook(companies, groups_per_company, tasks_per_group, time_slot, first=0):
+    """Create a synthetic runbook in a single time slot."""
+    for c in range(first, first + companies):
+        company = Company.objects.get_or_create(name=f'Company {c}')[0]
+        for g in range(groups_per_company):
+            task_group = TaskGroup.objects.create(
+                name=f'Group {g}', company=company, time_slot=time_slot, dallas_time='08:00'
+            )
+            for t in range(tasks_per_group):
+                Task.objects.create(task_group=task_group, description=f'Task {t}', order=t)
+
+
+def render(data):
+    """Round-trip data through the API renderer, as a client would see it."""
+    return json.loads(JSONRenderer().render(data))
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class WithTasksQueryCountTests(TestCase):
+    def setUp(self):
+        self.morning = TimeSlot.objects.create(name='Morning', order=1)
+        self.afternoon = TimeSlot.objects.create(name='Afternoon 1', order=2)
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        self.day = date(2025, 3, 24)
+
+    def get_dashboard(self):
+        return self.client.get(
+            '/api/companies/with_tasks/',
+            {'time_slot': self.morning.id, 'date': self.day.isoformat()},
+        )
+
+    def sign_off_all(self):
+        for task_group in TaskGroup.objects.filter(signoffs__isnull=True):
+            TaskSignOff.objects.create(
+                task_group=task_group, team_member=self.member, completed_date=self.day
+            )
+
+    def test_query_count_is_independent_of_runbook_size(self):
+        make_runbook(2, 2, 2, self.morning)
+        self.sign_off_all()
+        with self.assertNumQueries(4):
+            build_dashboard(self.morning.id, self.day)
+
+        make_runbook(10, 10, 5, self.morning, first=2)
+        self.sign_off_all()
+        with self.assertNumQueries(4):
+            build_dashboard(self.morning.id, self.day)
+
+    def test_snapshot_read_is_a_constant_number_of_lookups(self):
+        make_runbook(3, 3, 3, self.morning)
+        first = self.get_dashboard().json()
+        # Versions for the ETag, the change cursor and the snapshot itself
+        with self.assertNumQueries(3):
+            second = self.get_dashboard().json()
+        self.assertEqual(first, second)
+
+    def test_payload_shape(self):
+        make_runbook(2, 1, 2, self.morning)
+        other = Company.objects.create(name='Afternoon Only')
+        TaskGroup.objects.create(name='Late Group', company=other, time_slot=self.afternoon)
+        task_group = TaskGroup.objects.get(company__name='Company 1')
+        TaskSignOff.objects.create(
+            task_group=task_group, team_member=self.member, completed_date=self.day
+        )
+
+        data = self.get_dashboard().json()
+
+        self.assertEqual([c['name'] for c in data], ['Company 0', 'Company 1'])
+        groups = data[1]['task_groups']
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0]['company_name'], 'Company 1')
+        self.assertEqual(groups[0]['time_slot_name'], 'Morning')
+        self.assertEqual([t['description'] for t in groups[0]['tasks']], ['Task 0', 'Task 1'])
+        self.assertEqual(groups[0]['latest_signoff']['team_member_name'], 'Jane Smith')
+        self.assertIsNone(data[0]['task_groups'][0]['latest_signoff'])
+
+
+class DashboardSnapshotTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.morning = TimeSlot.objects.create(name='Morning', order=1)
+        self.afternoon = TimeSlot.objects.create(name='Afternoon 1', order=2)
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        # Snapshots of recent days are patched in place; older ones are dropped
+        self.day = date.today()
+        make_runbook(2, 2, 2, self.morning)
+
+    def get_dashboard(self):
+        return self.client.get(
+            '/api/companies/with_tasks/',
+            {'time_slot': self.morning.id, 'date': self.day.isoformat()},
+        ).json()
+
+    def test_sign_off_patches_snapshot(self):
+        self.get_dashboard()
+        task_group = TaskGroup.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/task-signoffs/sign_off/', {
+                'task_group_id': task_group.id,
+                'team_member_id': self.member.id,
+                'completed_date': self.day.isoformat(),
+            })
+        self.assertEqual(response.status_code, 201)
+        data = self.get_dashboard()
+        self.assertEqual(data, render(build_dashboard(self.morning.id, self.day)))
+        self.assertEqual(data[0]['task_groups'][0]['latest_signoff']['team_member_name'], 'Jane Smith')
+
+    def test_bulk_sign_off_creates_and_updates_in_bulk(self):
+        self.get_dashboard()
+        first, *rest = TaskGroup.objects.order_by('id')
+        TaskSignOff.objects.create(
+            task_group=first, team_member=self.member, completed_date=self.day, notes='Old'
+        )
+        entries = [{'task_group_id': task_group.id} for task_group in [first, *rest]]
+        payload = {'team_member_id': self.member.id, 'completed_date': self.day.isoformat()}
+
+        response = self.client.post(
+            '/api/task-signoffs/bulk_sign_off/',
+            {**payload, 'signoffs': [*entries, {'task_group_id': 999}]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {'4': {'task_group_id': 'Task group not found'}})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/task-signoffs/bulk_sign_off/',
+                {**payload, 'notes': 'Done', 'signoffs': entries},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['created']), 3)
+        self.assertEqual([s['id'] for s in response.json()['updated']],
+                         list(first.signoffs.values_list('id', flat=True)))
+        self.assertEqual(set(TaskSignOff.objects.values_list('notes', flat=True)), {'Done'})
+        self.assertEqual(self.get_dashboard(), render(build_dashboard(self.morning.id, self.day)))
+
+    def test_sign_off_is_created_only_for_a_new_key(self):
+        first, second = TaskGroup.objects.order_by('id')[:2]
+        signoff = TaskSignOff.objects.create(
+            task_group=first, team_member=self.member, completed_date=self.day, notes='Done'
+        )
+        # A sign-off stamped ahead of the clock is still an existing one
+        TaskSignOff.objects.filter(pk=signoff.pk).update(
+            sign_off_date=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+        payload = {'team_member_id': self.member.id, 'completed_date': self.day.isoformat()}
+
+        response = self.client.post(
+            '/api/task-signoffs/sign_off/', {**payload, 'task_group_id': first.id, 'notes': 'Done'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], signoff.id)
+        # Task group, member, stored keys, upsert, new row ids, change log, version bump
+        with self.assertNumQueries(9):
+            [(created, is_new)] = upsert_signoffs([{**payload, 'task_group_id': second.id}])
+        self.assertTrue(is_new)
+        self.assertEqual(created.id, TaskSignOff.objects.get(task_group=second).id)
+
+    def test_structure_edits_patch_snapshot(self):
+        self.get_dashboard()
+        task_group = TaskGroup.objects.last()
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(task_group=task_group, description='New task', order=5)
+            TaskGroup.objects.filter(company__name='Company 0').first().delete()
+            moved = TaskGroup.objects.filter(company__name='Company 0').first()
+            moved.time_slot = self.afternoon
+            moved.save()
+        self.assertEqual(self.get_dashboard(), render(build_dashboard(self.morning.id, self.day)))
+        self.assertEqual([c['name'] for c in self.get_dashboard()], ['Company 1'])
+
+    def test_old_snapshots_are_pruned(self):
+        self.get_dashboard()
+        old_day = self.day - timedelta(days=30)
+        self.client.get('/api/companies/with_tasks/',
+                        {'time_slot': self.morning.id, 'date': old_day.isoformat()})
+        self.assertEqual(DashboardSnapshot.objects.count(), 2)
+
+        # A runbook edit patches today's snapshot and drops the old one
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(task_group=TaskGroup.objects.first(), description='New task', order=5)
+        self.assertEqual(list(DashboardSnapshot.objects.values_list('completed_date', flat=True)),
+                         [self.day])
+
+        call_command('prune_snapshots', days=0, stdout=io.StringIO())
+        self.assertTrue(DashboardSnapshot.objects.exists())
+        DashboardSnapshot.objects.update(completed_date=old_day)
+        call_command('prune_snapshots', stdout=io.StringIO())
+        self.assertFalse(DashboardSnapshot.objects.exists())
+
+
+class ETagTests(TestCase):
+    def setUp(self):
+        TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+
+    def test_unchanged_list_is_not_modified(self):
+        response = self.client.get('/api/team-members/')
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/team-members/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        TeamMember.objects.create(name='John Doe', email='john@example.com')
+        response = self.client.get('/api/team-members/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_tag_depends_on_query(self):
+        first = self.client.get('/api/jobs/', {'index_id': 1})['ETag']
+        second = self.client.get('/api/jobs/', {'index_id': 2})['ETag']
+        self.assertNotEqual(first, second)
+
+
+class SignOffMatrixTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.morning = TimeSlot.objects.create(name='Morning', order=1)
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        make_runbook(2, 2, 1, self.morning)
+
+    def test_matrix_counts_per_day(self):
+        task_group = TaskGroup.objects.first()
+        for day in (date(2025, 3, 24), date(2025, 3, 26)):
+            TaskSignOff.objects.create(
+                task_group=task_group, team_member=self.member, completed_date=day
+            )
+        TaskSignOff.objects.create(
+            task_group=task_group, team_member=self.member, completed_date=date(2025, 4, 2)
+        )
+
+        with self.assertNumQueries(4):
+            data = render(signoff_matrix(date(2025, 3, 24), date(2025, 3, 30), self.morning.id))
+
+        self.assertEqual(len(data['dates']), 7)
+        self.assertEqual(data['matrix'][str(task_group.id)], [1, 0, 1, 0, 0, 0, 0])
+        self.assertEqual(len(data['matrix']), 4)
+        self.assertEqual([c['name'] for c in data['companies']], ['Company 0', 'Company 1'])
+
+    def test_invalid_range(self):
+        response = self.client.get(
+            '/api/companies/signoff_matrix/', {'start': '2025-03-30', 'end': '2025-03-24'}
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            '/api/companies/signoff_matrix/', {'start': '2025-01-01', 'end': '2025-01-31'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class RollupTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.morning = TimeSlot.objects.create(name='Morning', order=1)
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        self.day = date(2025, 3, 24)
+        make_runbook(2, 2, 1, self.morning)
+
+    def test_rollups_follow_signoffs_and_backfill(self):
+        task_groups = list(TaskGroup.objects.order_by('id'))
+        with self.captureOnCommitCallbacks(execute=True):
+            for task_group in task_groups[:3]:
+                TaskSignOff.objects.create(
+                    task_group=task_group, team_member=self.member, completed_date=self.day
+                )
+        totals = CompletionRollup.objects.filter(
+            company=task_groups[0].company, completed_date=self.day
+        ).values_list('completed_task_groups', 'signoffs')
+        self.assertEqual(list(totals), [(2, 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskSignOff.objects.filter(task_group=task_groups[0]).delete()
+        self.assertEqual(list(totals.all()), [(1, 1)])
+
+        # One sign-off on the day, one at 01:30 the next morning
+        TaskSignOff.objects.filter(task_group=task_groups[1]).update(
+            sign_off_date=utc(2025, 3, 24, 17)
+        )
+        TaskSignOff.objects.filter(task_group=task_groups[2]).update(
+            sign_off_date=utc(2025, 3, 25, 1, 30)
+        )
+        backfill_rollups()
+
+        with self.assertNumQueries(5):
+            data = render(completion_analytics(self.day, date(2025, 3, 25)))
+        self.assertEqual(data['days'][0], {
+            'date': '2025-03-24', 'completed': 2, 'expected': 4, 'completion_rate': 0.5,
+            'signoffs': 2, 'late_signoffs': 1, 'late_rate': 0.5, 'average_late_minutes': 90.0,
+        })
+        self.assertEqual(data['days'][1]['completed'], 0)
+        self.assertEqual(
+            [(c['name'], c['completed'], c['expected']) for c in data['companies']],
+            [('Company 0', 1, 4), ('Company 1', 1, 4)]
+        )
+        self.assertEqual(
+            [(m['name'], m['signoffs'], m['late_signoffs']) for m in data['team_members']],
+            [('Jane Smith', 2, 1)]
+        )
+
+    def test_deleting_long_history_refreshes_every_day(self):
+        task_group = TaskGroup.objects.order_by('id').first()
+        TaskSignOff.objects.bulk_create([
+            TaskSignOff(task_group=task_group, team_member=self.member,
+                        completed_date=self.day - timedelta(days=n))
+            for n in range(1500)
+        ])
+        backfill_rollups()
+        self.assertEqual(CompletionRollup.objects.count(), 1500)
+
+        # 1500 keys, more than SQLite allows in one OR'd filter
+        with self.captureOnCommitCallbacks(execute=True):
+            task_group.delete()
+        self.assertFalse(CompletionRollup.objects.exists())
+        self.assertFalse(MemberRollup.objects.exists())
+
+
+class SignOffStreamTests(TestCase):
+    def test_broker_fans_out_matching_events(self):
+        async def scenario():
+            morning = broker.subscribe('2025-03-24', 1)
+            afternoon = broker.subscribe('2025-03-24', 2)
+            any_slot = broker.subscribe()
+            event = {'type': 'signoff.created', 'completed_date': '2025-03-24', 'time_slot': 1}
+            await asyncio.to_thread(broker.publish, event)
+            await asyncio.sleep(0)
+            sizes = [s.queue.qsize() for s in (morning, afternoon, any_slot)]
+            for subscription in (morning, afternoon, any_slot):
+                broker.unsubscribe(subscription)
+            return sizes, json.loads(await morning.queue.get())
+
+        sizes, received = asyncio.run(scenario())
+        self.assertEqual(sizes, [1, 0, 1])
+        self.assertEqual(received['type'], 'signoff.created')
+        self.assertEqual(len(broker), 0)
+
+    def test_slow_subscriber_is_told_to_resync(self):
+        async def scenario():
+            subscription = broker.subscribe()
+            event = {'completed_date': '2025-03-24', 'time_slot': 1}
+            for _ in range(QUEUE_SIZE + 1):
+                broker.publish(event)
+            await asyncio.sleep(0)
+            broker.unsubscribe(subscription)
+            return subscription.queue.qsize(), await subscription.queue.get()
+
+        self.assertEqual(asyncio.run(scenario()), (1, None))
+
+    def test_requires_asgi(self):
+        response = self.client.get('/api/task-signoffs/stream/')
+        self.assertEqual(response.status_code, 501)
+
+
+@override_settings(SCHEDULER_WRITE_BEHIND=True)
+class WriteBehindTests(TransactionTestCase):
+    databases = {'default', 'archive'}
+
+    def test_concurrent_sign_offs_commit_through_the_writer(self):
+        morning = TimeSlot.objects.create(name='Morning', order=1)
+        member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        make_runbook(4, 2, 1, morning)
+        statuses = []
+
+        def sign_off(task_group_id):
+            statuses.append(self.client.post('/api/task-signoffs/sign_off/', {
+                'task_group_id': task_group_id, 'team_member_id': member.id,
+                'completed_date': '2025-03-24',
+            }).status_code)
+
+        threads = [
+            threading.Thread(target=sign_off, args=(task_group_id,))
+            for task_group_id in [*TaskGroup.objects.values_list('id', flat=True), 999]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # A refused sign-off is answered without holding up the rest of its batch
+        self.assertEqual(sorted(statuses), [201] * 8 + [404])
+        self.assertEqual(TaskSignOff.objects.count(), 8)
+        self.assertEqual(CompletionRollup.objects.aggregate(Sum('signoffs'))['signoffs__sum'], 8)
+
+    @override_settings(SCHEDULER_WRITE_BEHIND=False)
+    def test_direct_sign_off_commits_once(self):
+        morning = TimeSlot.objects.create(name='Morning', order=1)
+        member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        make_runbook(1, 1, 1, morning)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/task-signoffs/sign_off/', {
+                'task_group_id': TaskGroup.objects.get().id, 'team_member_id': member.id,
+                'completed_date': '2025-03-24',
+            })
+        self.assertEqual(response.status_code, 201)
+        # The sign-off, its change log entry, rollups and version bumps commit together
+        self.assertEqual([query['sql'] for query in queries if query['sql'] == 'COMMIT'], ['COMMIT'])
+        self.assertEqual(CompletionRollup.objects.get().signoffs, 1)
+
+
+class SignOffTestCase(TestCase):
+    """Two companies of one-task morning groups and a member to sign them off."""
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.morning = TimeSlot.objects.create(name='Morning', order=1)
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        self.day = date(2025, 3, 24)
+        make_runbook(2, 2, 1, self.morning)
+
+
+class DeltaSyncTests(SignOffTestCase):
+    def test_dashboard_delta(self):
+        response = self.client.get(
+            '/api/companies/with_tasks/', {'time_slot': self.morning.id, 'date': self.day}
+        )
+        cursor = response['X-Change-Cursor']
+
+        signed, deleted = TaskGroup.objects.all()[:2]
+        TaskSignOff.objects.create(task_group=signed, team_member=self.member, completed_date=self.day)
+        TaskSignOff.objects.create(
+            task_group=signed, team_member=self.member, completed_date=date(2025, 3, 25)
+        )
+        deleted_id = deleted.id
+        deleted.delete()
+
+        data = self.client.get(
+            '/api/companies/with_tasks/',
+            {'time_slot': self.morning.id, 'date': self.day, 'since': cursor},
+        ).json()
+        self.assertEqual([tg['id'] for tg in data['task_groups']], [signed.id])
+        self.assertEqual(data['task_groups'][0]['latest_signoff']['team_member_name'], 'Jane Smith')
+        self.assertEqual(data['removed_task_groups'], [deleted_id])
+
+        data = self.client.get(
+            '/api/companies/with_tasks/',
+            {'time_slot': self.morning.id, 'date': self.day, 'since': data['cursor']},
+        ).json()
+        self.assertEqual(data['task_groups'], [])
+        self.assertEqual(data['removed_task_groups'], [])
+
+    def test_history_delta(self):
+        task_group = TaskGroup.objects.first()
+        cursor = self.client.get('/api/task-history/')['X-Change-Cursor']
+        kept = TaskSignOff.objects.create(
+            task_group=task_group, team_member=self.member, completed_date=self.day
+        )
+        removed = TaskSignOff.objects.create(
+            task_group=task_group, team_member=self.member, completed_date=date(2025, 3, 25)
+        )
+        removed_id = removed.id
+        removed.delete()
+
+        data = self.client.get('/api/task-history/', {'since': cursor}).json()
+        self.assertEqual([s['id'] for s in data['signoffs']], [kept.id])
+        self.assertEqual(data['removed_signoffs'], [removed_id])
+
+    def test_expired_cursor_is_gone(self):
+        task_group = TaskGroup.objects.first()
+        cursor = self.client.get('/api/task-history/')['X-Change-Cursor']
+        TaskSignOff.objects.create(task_group=task_group, team_member=self.member, completed_date=self.day)
+        TaskSignOff.objects.create(
+            task_group=task_group, team_member=self.member, completed_date=date(2025, 3, 25)
+        )
+        ChangeLog.objects.update(recorded_at=datetime.now(timezone.utc) - timedelta(days=31))
+        call_command('prune_changes', stdout=io.StringIO())
+
+        # The newest change is kept so cursors never restart
+        latest = ChangeLog.objects.get()
+        response = self.client.get('/api/task-history/', {'since': cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.json()['cursor'], latest.id)
+        self.assertTrue(response.json()['reset'])
+        response = self.client.get(
+            '/api/companies/with_tasks/', {'time_slot': self.morning.id, 'date': self.day, 'since': cursor}
+        )
+        self.assertEqual(response.status_code, 410)
+
+        # Reloading in full hands out a cursor that syncs again
+        cursor = self.client.get('/api/task-history/')['X-Change-Cursor']
+        self.assertEqual(int(cursor), latest.id)
+        self.assertEqual(self.client.get('/api/task-history/', {'since': latest.id - 1}).status_code, 200)
+        self.assertEqual(self.client.get('/api/task-history/', {'since': cursor}).json()['signoffs'], [])
+
+
+class HistoryWindowTests(SignOffTestCase):
+    def test_history_window_and_keyset_pages(self):
+        make_runbook(1, 12, 1, self.morning, first=5)
+        task_groups = list(TaskGroup.objects.order_by('id'))
+        for offset, task_group in enumerate(task_groups):
+            TaskSignOff.objects.create(
+                task_group=task_group, team_member=self.member,
+                completed_date=self.day - timedelta(days=offset % 4),
+            )
+        # Same-second sign-offs still page in a stable order
+        TaskSignOff.objects.update(sign_off_date=utc(2025, 3, 24, 18))
+        in_window = TaskSignOff.objects.filter(completed_date__gt=self.day - timedelta(days=2))
+        expected = list(in_window.order_by('-id').values_list('id', flat=True))
+
+        params = {'end': self.day.isoformat(), 'days': 2, 'limit': 4}
+        seen = []
+        url = '/api/task-history/'
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url, params)
+            seen += [signoff['id'] for signoff in response.json()]
+            self.assertEqual(response.json()[0]['company_name'], 'Company 5')
+            link = response.get('Link')
+            url, params = (link[1:link.index('>')], None) if link else (None, None)
+        self.assertEqual(seen, expected)
+
+    def test_history_window_uses_completed_date_index(self):
+        make_runbook(1, 12, 1, self.morning, first=5)
+        for task_group in TaskGroup.objects.all():
+            TaskSignOff.objects.create(
+                task_group=task_group, team_member=self.member, completed_date=date(2020, 1, 2)
+            )
+        # Old windows seek by completed_date rather than walking back from the newest sign-off
+        signoffs = TaskSignOff.objects.filter(
+            completed_date__gt=date(2020, 1, 1), completed_date__lte=date(2020, 1, 8)
+        ).order_by('-sign_off_date', '-id')
+        self.assertIn('signoff_window_idx', signoffs.explain())
+
+        # The default page is as long as the unpaginated history was: ten rows a day
+        response = self.client.get('/api/task-history/', {'end': '2020-01-08', 'days': 1})
+        self.assertEqual(response.json(), [])
+        response = self.client.get('/api/task-history/', {'end': '2020-01-02', 'days': 1})
+        self.assertEqual(len(response.json()), 10)
+        self.assertIn('rel="next"', response['Link'])
+
+
+class ArchiveTests(SignOffTestCase):
+    def test_archived_history_reads_through(self):
+        task_groups = list(TaskGroup.objects.order_by('id'))
+        with self.captureOnCommitCallbacks(execute=True):
+            for offset, task_group in enumerate(task_groups):
+                TaskSignOff.objects.create(
+                    task_group=task_group, team_member=self.member,
+                    completed_date=self.day - timedelta(days=offset),
+                )
+        rollups = list(CompletionRollup.objects.values_list('completed_date', 'signoffs'))
+        params = {'end': self.day.isoformat(), 'days': 4}
+        before = self.client.get('/api/task-history/', params).json()
+
+        self.assertEqual(archive_signoffs(self.day), 3)
+        self.assertEqual(TaskSignOff.objects.count(), 1)
+        # Archiving is not deleting: history, matrix and rollups all still see the rows
+        self.assertEqual(self.client.get('/api/task-history/', params).json(), before)
+        matrix = signoff_matrix(self.day - timedelta(days=3), self.day)['matrix']
+        self.assertEqual(sum(sum(row) for row in matrix.values()), 4)
+        backfill_rollups()
+        self.assertCountEqual(
+            CompletionRollup.objects.values_list('completed_date', 'signoffs'), rollups
+        )
+
+
+class SignOffExportTests(SignOffTestCase):
+    def test_signoff_export_streams_hot_and_archived_rows(self):
+        for offset, task_group in enumerate(TaskGroup.objects.order_by('id')):
+            TaskSignOff.objects.create(
+                task_group=task_group, team_member=self.member,
+                completed_date=self.day - timedelta(days=offset), notes='Checked, ok',
+            )
+        archive_signoffs(self.day - timedelta(days=1))
+
+        response = self.client.get('/api/task-signoffs/export/', {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ['id', 'completed_date', 'sign_off_date'])
+        self.assertEqual([row[-1] for row in rows[1:]], ['False', 'False', 'True', 'True'])
+        self.assertEqual(rows[1][7], 'Checked, ok')
+
+        # Filters apply to both tables; the workbook carries the same rows
+        response = self.client.get(
+            '/api/task-signoffs/export/', {'format': 'xlsx', 'team_member': self.member.id,
+                                           'date': (self.day - timedelta(days=2)).isoformat()}
+        )
+        self.assertIn('attachment; filename="signoffs-', response['Content-Disposition'])
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        rows = list(sheet.values)
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][-1], True)
+
+
+class ImportRunbookTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def runbook(self, *rows):
+        return pd.DataFrame(rows, columns=['Customer', 'Unnamed: 1', 'Task', 'Dallas Time'])
+
+    def test_import_replaces_the_runbook(self):
+        old = TaskGroup.objects.create(
+            name='Old', company=Company.objects.create(name='ALL'),
+            time_slot=TimeSlot.objects.create(name='Morning', order=1),
+        )
+        member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        TaskSignOff.objects.create(task_group=old, team_member=member, completed_date=date(2025, 3, 24))
+
+        summary = import_runbook([self.runbook(
+            (None, 'Morning', 'Orphan', None),
+            ('ALL', 'Morning', 'Ops handover', 0.375),
+            (None, None, 'Call India', None),
+            (None, None, '', None),
+            (None, None, 'Resolve items', None),
+            (None, None, 'Call India', None),
+            ('HSBC', 'Bogus', 'METYS', '10:45'),
+            (None, None, 'Check inputs', None),
+            (None, 'Afternoon 1', 'METYS', None),
+            ('ALL', 'Morning', 'Ops handover', None),
+            (None, None, 'Publish', None),
+        )])
+        self.assertEqual(summary['removed_signoffs'], 1)
+        # Unknown slots keep the previous one, and a repeated group gathers its tasks
+        self.assertEqual(
+            [(g.company.name, g.time_slot.name, g.name, g.dallas_time,
+              list(g.tasks.values_list('description', 'order')))
+             for g in TaskGroup.objects.order_by('id')],
+            [
+                ('ALL', 'Morning', 'Ops handover', '09:00',
+                 [('Call India', 0), ('Resolve items', 1), ('Publish', 2)]),
+                ('HSBC', 'Morning', 'METYS', '10:45', [('Check inputs', 0)]),
+                ('HSBC', 'Afternoon 1', 'METYS', '', []),
+            ],
+        )
+        self.assertTrue(ChangeLog.objects.filter(object_id=old.id, deleted=True).exists())
+        self.assertFalse(CompletionRollup.objects.exists())
+
+    def test_import_replaces_long_sign_off_history(self):
+        rows = [('ALL', 'Morning', 'Ops handover', '09:00'), ('HSBC', 'Morning', 'METYS', '10:45')]
+        member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+
+        def sign_off_history():
+            # 1200 days per group: 1200 rollup keys for each removed group
+            TaskSignOff.objects.bulk_create([
+                TaskSignOff(task_group=task_group, team_member=member,
+                            completed_date=date(2025, 3, 24) - timedelta(days=n))
+                for task_group in TaskGroup.objects.all()
+                for n in range(1200)
+            ])
+            backfill_rollups()
+
+        import_runbook([self.runbook(*rows)])
+        sign_off_history()
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = import_runbook([self.runbook(*rows)])
+        self.assertEqual(summary['removed_signoffs'], 2400)
+        self.assertFalse(CompletionRollup.objects.exists())
+
+        sign_off_history()
+        summary = sync_runbook([self.runbook(rows[0])])
+        self.assertEqual((summary['removed_task_groups'], summary['removed_signoffs']), (1, 1200))
+        self.assertEqual(CompletionRollup.objects.count(), 1200)
+
+    def test_incremental_import_keeps_task_groups(self):
+        rows = [
+            ('ALL', 'Morning', 'Ops handover', '09:00'),
+            (None, None, 'Call India', None),
+            (None, None, 'Resolve items', None),
+            ('HSBC', 'Morning', 'METYS', '10:45'),
+            (None, None, 'Check inputs', None),
+        ]
+        import_runbook([self.runbook(*rows)])
+        handover, metys = TaskGroup.objects.order_by('id')
+        member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        TaskSignOff.objects.create(task_group=handover, team_member=member, completed_date=date(2025, 3, 24))
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = sync_runbook([self.runbook(*rows)])
+        self.assertEqual(summary['unchanged_task_groups'], 2)
+        writes = [query['sql'] for query in queries
+                  if not query['sql'].startswith(('SELECT', 'SAVEPOINT', 'RELEASE'))]
+        self.assertEqual(writes, [])
+
+        summary = sync_runbook([self.runbook(
+            ('ALL', 'Morning', 'Ops handover', '09:30'),
+            (None, None, 'Resolve items', None),
+            (None, None, 'Publish', None),
+            (None, None, 'Call India', None),
+            ('BNP', 'Morning', 'Daily', None),
+        )])
+        self.assertEqual(
+            {key: value for key, value in summary.items() if value and key != 'rows'},
+            {'companies': 1, 'task_groups': 1, 'updated_task_groups': 1, 'removed_task_groups': 1,
+             'tasks': 1, 'reordered_tasks': 2, 'removed_tasks': 1},
+        )
+        handover.refresh_from_db()
+        self.assertEqual(handover.dallas_time, '09:30')
+        self.assertEqual(list(handover.tasks.values_list('description', flat=True)),
+                         ['Resolve items', 'Publish', 'Call India'])
+        self.assertEqual(handover.signoffs.count(), 1)
+        self.assertFalse(TaskGroup.objects.filter(pk=metys.pk).exists())
+
+    def test_runbook_is_read_in_chunks(self):
+        rows = [
+            ('ALL', 'Morning', 'Ops handover', 0.375),
+            (None, None, 'Call India', None),
+            ('HSBC', 'Afternoon 1', 'METYS', None),
+            (None, None, 'Check inputs', None),
+            (None, None, 'Publish', None),
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            workbook = os.path.join(directory, 'Runbook.xlsx')
+            self.runbook(*rows).to_excel(workbook, sheet_name='Runbook', index=False)
+            frames = list(read_runbook(workbook, chunk_size=2))
+            self.assertEqual([len(frame) for frame in frames], [2, 2, 1])
+            self.assertEqual(frames[0].iloc[0].tolist(), ['ALL', 'Morning', 'Ops handover', 0.375])
+
+            runbook = os.path.join(directory, 'Runbook.csv')
+            with open(runbook, 'w', newline='') as handle:
+                csv.writer(handle).writerows([['Customer', '', 'Task', 'Dallas Time'], *rows])
+            summary = import_runbook(read_runbook(runbook, chunk_size=2))
+        self.assertEqual((summary['rows'], summary['task_groups'], summary['tasks']), (5, 2, 3))
+        self.assertEqual(
+            list(TaskGroup.objects.order_by('id').values_list('company__name', 'time_slot__name', 'name')),
+            [('ALL', 'Morning', 'Ops handover'), ('HSBC', 'Afternoon 1', 'METYS')],
+        )
+
+        with self.assertRaisesMessage(ValueError, 'missing runbook columns: Dallas Time'):
+            with tempfile.NamedTemporaryFile('w', suffix='.csv') as handle:
+                handle.write('Customer,,Task\n')
+                handle.flush()
+                list(read_runbook(handle.name))
+
+    def test_timings_keep_the_import_streamed(self):
+        seen = []
+
+        def frames(*args):
+            # How many task groups were written by the time each chunk is read
+            for frame in read_runbook(*args):
+                seen.append(TaskGroup.objects.count())
+                yield frame
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'Runbook.csv')
+            with open(path, 'w', newline='') as handle:
+                csv.writer(handle).writerows([
+                    ['Customer', '', 'Task', 'Dallas Time'],
+                    ('ALL', 'Morning', 'Ops handover', '09:00'), ('', '', 'Call India', ''),
+                    ('HSBC', 'Afternoon 1', 'METYS', ''), ('', '', 'Check inputs', ''),
+                    ('', '', 'Publish', ''),
+                ])
+            out = io.StringIO()
+            with patch('scheduler.management.commands.import_runbook.read_runbook', frames):
+                call_command('import_runbook', path, timings=True, chunk_size=2, stdout=out)
+        self.assertEqual(seen, [0, 1, 2])
+        self.assertIn("Imported 5 rows: 2 task groups, 3 tasks", out.getvalue())
+        self.assertRegex(out.getvalue(), r'read\s+[\d.]+\s+5\s')
+
+    def test_csv_day_fractions_become_times(self):
+        with tempfile.TemporaryDirectory() as directory:
+            runbook = os.path.join(directory, 'Runbook.csv')
+            with open(runbook, 'w', newline='') as handle:
+                csv.writer(handle).writerows([
+                    ['Customer', '', 'Task', 'Dallas Time'],
+                    ('ALL', 'Morning', 'Ops handover', '0.375'),
+                    ('HSBC', 'Morning', 'METYS', '0.395833333'),
+                    ('BNP', 'T3', 'Daily', '10:45'),
+                ])
+            import_runbook(read_runbook(runbook))
+        self.assertEqual(
+            list(TaskGroup.objects.order_by('id').values_list('name', 'dallas_time')),
+            [('Ops handover', '09:00'), ('METYS', '09:30'), ('Daily', '10:45')],
+        )
+
+    def test_several_sheets_import_as_one_runbook(self):
+        self.assertEqual(
+            merge_plans([
+                [(('ALL', 'Morning', 'Ops handover'), '09:00', ['Call India', 'Publish'])],
+                [(('ALL', 'Morning', 'Ops handover'), '09:30', ['Publish', 'Resolve items']),
+                 (('BNP', 'T3', 'Daily'), None, [])],
+            ]),
+            [(('ALL', 'Morning', 'Ops handover'), '09:00', ['Call India', 'Publish', 'Resolve items']),
+             (('BNP', 'T3', 'Daily'), None, [])],
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            sources = []
+            for name, rows in [
+                ('europe.csv', [('ALL', 'Morning', 'Ops handover', '09:00'), (None, None, 'Call India', None)]),
+                ('asia.csv', [('ALL', 'Morning', 'Ops handover', '07:00'), (None, None, 'Publish', None),
+                              ('HSBC', 'T3', 'METYS', None), (None, None, 'Check inputs', None)]),
+            ]:
+                path = os.path.join(directory, name)
+                with open(path, 'w', newline='') as handle:
+                    csv.writer(handle).writerows([['Customer', '', 'Task', 'Dallas Time'], *rows])
+                sources.append((path, None))
+
+            summary = import_runbooks(sources, workers=1)
+            self.assertEqual((summary['rows'], summary['task_groups'], summary['tasks']), (6, 2, 3))
+            handover = TaskGroup.objects.get(name='Ops handover')
+            self.assertEqual(handover.dallas_time, '09:00')
+            self.assertEqual(list(handover.tasks.values_list('description', 'order')),
+                             [('Call India', 0), ('Publish', 1)])
+
+            # Listed first, asia.csv now sets the shared group's time and task order
+            summary = import_runbooks(sources[::-1], incremental=True, workers=1)
+        self.assertEqual(summary['updated_task_groups'], 1)
+        handover.refresh_from_db()
+        self.assertEqual(handover.dallas_time, '07:00')
+        self.assertEqual(list(handover.tasks.values_list('description', flat=True).order_by('order')),
+                         ['Publish', 'Call India'])
+
+    def test_dry_run_predicts_the_import(self):
+        import_runbook([self.runbook(
+            ('ALL', 'Morning', 'Ops handover', '09:00'),
+            (None, None, 'Call India', None),
+            ('HSBC', 'Morning', 'METYS', '10:45'),
+        )])
+        metys = TaskGroup.objects.get(name='METYS')
+        member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        TaskSignOff.objects.create(task_group=metys, team_member=member, completed_date=date(2025, 3, 24))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'Runbook.csv')
+            with open(path, 'w', newline='') as handle:
+                csv.writer(handle).writerows([
+                    ['Customer', '', 'Task', 'Dallas Time'],
+                    ['ALL', 'Morning', 'Ops handover', '09:30'],
+                    ['', '', 'Publish', ''],
+                    ['', '', 'Call India', ''],
+                    ['BNP', 'T3', 'Daily', ''],
+                ])
+            stored = list(TaskGroup.objects.values_list('name', 'dallas_time'))
+            timings = ImportTimings()
+            preview = sync_runbook(read_runbook(path, chunk_size=2), timings=timings, dry_run=True)
+            # The dry run is the import itself, rolled back
+            self.assertEqual(list(TaskGroup.objects.values_list('name', 'dallas_time')), stored)
+            self.assertEqual(TaskSignOff.objects.count(), 1)
+            self.assertFalse(Company.objects.filter(name='BNP').exists())
+            self.assertEqual(preview['new_companies'], ['BNP'])
+            self.assertEqual(preview['created'], [(('BNP', 'T3', 'Daily'), '', 0)])
+            self.assertEqual(
+                preview['changed'], [(('ALL', 'Morning', 'Ops handover'), '09:00', '09:30', 1, 1, 0)]
+            )
+            self.assertEqual(preview['removed'], [('HSBC', 'Morning', 'METYS')])
+            self.assertEqual(timings.phases['read']['rows'], 4)
+
+            out = io.StringIO()
+            call_command('import_runbook', path, dry_run=True, timings=True, verbosity=2, stdout=out)
+            self.assertIn("Would import 4 rows: 2 task groups, 2 tasks, 1 new companies.", out.getvalue())
+            self.assertIn("Would delete 2 task groups, 1 tasks and 1 sign-offs.", out.getvalue())
+            self.assertIn("- HSBC / Morning / METYS", out.getvalue())
+            self.assertIn("+ BNP / T3 / Daily at -: 0 tasks", out.getvalue())
+            self.assertNotIn("Imported", out.getvalue())
+            self.assertEqual(TaskGroup.objects.count(), 2)
+
+            summary = sync_runbook(read_runbook(path, chunk_size=2))
+        for key in ('new_time_slots', 'new_companies', 'created', 'changed', 'removed'):
+            del preview[key]
+        self.assertEqual(preview, summary)
+
+
+class JobRangeTests(TestCase):
+    def setUp(self):
+        index = Index.objects.create(name='Market Index')
+        for title, start, end in [
+            ('Before', utc(2025, 2, 27, 9), utc(2025, 2, 27, 11)),
+            ('Crosses start', utc(2025, 2, 28, 22), utc(2025, 3, 1, 2)),
+            ('Inside', utc(2025, 3, 10, 9), utc(2025, 3, 10, 11)),
+            ('Crosses end', utc(2025, 3, 31, 23), utc(2025, 4, 1, 1)),
+            ('After', utc(2025, 4, 1, 9), utc(2025, 4, 1, 11)),
+        ]:
+            Job.objects.create(index=index, title=title, start_time=start, end_time=end)
+
+    def titles(self, **params):
+        return [job['title'] for job in self.client.get('/api/jobs/', params).json()]
+
+    def test_contained_range_is_unchanged(self):
+        self.assertEqual(self.titles(start='2025-03-01', end='2025-04-01'), ['Inside'])
+
+    def test_overlap_includes_jobs_crossing_the_window(self):
+        self.assertEqual(
+            self.titles(start='2025-03-01', end='2025-04-01', overlap='true'),
+            ['Crosses start', 'Inside', 'Crosses end'],
+        )
+
+    def test_day_buckets(self):
+        data = self.client.get(
+            '/api/jobs/', {'start': '2025-02-28', 'end': '2025-03-02', 'bucket': 'day'}
+        ).json()
+        self.assertEqual(list(data), ['2025-02-28', '2025-03-01'])
+        self.assertEqual([job['title'] for job in data['2025-03-01']], ['Crosses start'])
+
+    def test_export_uses_the_list_filters(self):
+        response = self.client.get(
+            '/api/jobs/export/', {'start': '2025-03-01', 'end': '2025-04-01', 'overlap': 'true',
+                                  'format': 'csv'}
+        )
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['title'] for row in rows], ['Crosses start', 'Inside', 'Crosses end'])
+        self.assertEqual(rows[0]['index'], 'Market Index')
+        self.assertEqual(rows[0]['hours'], '4.0')
+
+
+class BookingTestCase(TestCase):
+    """A member booked 09:00-11:00 and two open jobs, one overlapping and one adjacent."""
+
+    def setUp(self):
+        self.index = Index.objects.create(name='Market Index')
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        self.booked = Job.objects.create(
+            index=self.index, title='Booked', assigned_to=self.member,
+            start_time=utc(2025, 3, 24, 9), end_time=utc(2025, 3, 24, 11),
+        )
+        self.overlapping = Job.objects.create(
+            index=self.index, title='Overlapping',
+            start_time=utc(2025, 3, 24, 10), end_time=utc(2025, 3, 24, 12),
+        )
+        self.adjacent = Job.objects.create(
+            index=self.index, title='Adjacent',
+            start_time=utc(2025, 3, 24, 11), end_time=utc(2025, 3, 24, 13),
+        )
+
+    def assign(self, job, **extra):
+        return self.client.put(
+            f'/api/assign-job/{job.id}/',
+            {'team_member_id': self.member.id, **extra},
+            content_type='application/json',
+        )
+
+
+class ConflictTests(BookingTestCase):
+    def test_assign_job_rejects_double_booking(self):
+        response = self.assign(self.overlapping)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['conflicts'], [self.booked.id])
+        self.assertEqual(self.assign(self.adjacent).status_code, 200)
+        self.assertEqual(self.assign(self.overlapping, force=True).status_code, 200)
+
+    def test_back_to_back_assignments_skip_the_history_scan(self):
+        jobs = [
+            Job.objects.create(
+                index=self.index, title=f'Open {day}',
+                start_time=utc(2025, 3, day, 9), end_time=utc(2025, 3, day, 10),
+            )
+            for day in (25, 26, 27)
+        ]
+        counts = []
+        for job in jobs:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.assign(job).status_code, 200)
+            # The overlap probe's lower bound is read by key, not by a MAX over every job
+            self.assertFalse([
+                query['sql'] for query in queries
+                if 'MAX(' in query['sql'] and 'FROM "scheduler_job"' in query['sql']
+            ])
+            counts.append(len(queries))
+        self.assertEqual(len(set(counts)), 1)
+
+        # Saving a longer job raises the bound, so the probe still reaches back to it
+        fortnight = Job.objects.create(
+            index=self.index, title='Fortnight', assigned_to=self.member,
+            start_time=utc(2025, 3, 10, 9), end_time=utc(2025, 3, 28, 9),
+        )
+        response = self.assign(self.overlapping)
+        self.assertEqual(response.json()['conflicts'], [fortnight.id, self.booked.id])
+
+    def test_serializer_rejects_double_booking(self):
+        response = self.client.patch(
+            f'/api/jobs/{self.overlapping.id}/',
+            {'assigned_to': self.member.id},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('assigned_to', response.json())
+
+    def test_conflict_report(self):
+        Job.objects.filter(pk=self.overlapping.pk).update(assigned_to=self.member)
+        report = self.client.get('/api/jobs/conflicts/', {'start': '2025-03-24'}).json()
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['job'], self.overlapping.id)
+        self.assertEqual(report[0]['conflicts_with'], self.booked.id)
+
+    def test_series_occurrences_count_as_bookings(self):
+        series = JobSeries.objects.create(
+            index=self.index, title='Daily check', assigned_to=self.member,
+            start_time=utc(2025, 3, 20, 12), duration=timedelta(hours=1),
+            recurrence='FREQ=DAILY',
+        )
+        Job.objects.filter(pk=self.booked.pk).update(assigned_to=None)
+        lunch = Job.objects.create(
+            index=self.index, title='Lunch cover',
+            start_time=utc(2025, 3, 24, 12, 30), end_time=utc(2025, 3, 24, 14),
+        )
+        occurrence_id = f'{series.id}:{utc(2025, 3, 24, 12).isoformat()}'
+        response = self.assign(lunch)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['conflicts'], [occurrence_id])
+
+        Job.objects.filter(pk=lunch.pk).update(assigned_to=self.member)
+        report = self.client.get(
+            '/api/jobs/conflicts/', {'start': '2025-03-24', 'end': '2025-03-25'}
+        ).json()
+        self.assertEqual(
+            [(conflict['job'], conflict['conflicts_with']) for conflict in report],
+            [(lunch.id, occurrence_id)],
+        )
+
+        # Moving another day's occurrence onto the job clashes too
+        response = self.client.put(
+            f'/api/job-series/{series.id}/occurrences/',
+            {'original_start': '2025-03-25T12:00:00Z', 'start_time': '2025-03-24T12:45:00Z',
+             'end_time': '2025-03-24T13:15:00Z'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['conflicts'], [occurrence_id, lunch.id])
+
+    def test_series_rejects_double_booking(self):
+        later = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=2)
+        Job.objects.filter(pk=self.booked.pk).update(
+            start_time=later, end_time=later + timedelta(hours=2)
+        )
+        series = {
+            'index': self.index.id, 'title': 'Daily check', 'assigned_to': self.member.id,
+            'start_time': (later - timedelta(days=1, minutes=30)).isoformat(),
+            'duration': '01:00:00', 'recurrence': 'FREQ=DAILY',
+        }
+        response = self.client.post('/api/job-series/', series, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(self.booked.id), response.json()['assigned_to'][0])
+
+        series['assigned_to'] = None
+        created = self.client.post('/api/job-series/', series, content_type='application/json').json()
+        response = self.client.patch(
+            f"/api/job-series/{created['id']}/", {'assigned_to': self.member.id},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(
+            f"/api/job-series/{created['id']}/",
+            {'assigned_to': self.member.id, 'recurrence': 'FREQ=DAILY;COUNT=1'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class BulkJobTests(BookingTestCase):
+    def bulk(self, **data):
+        return self.client.post('/api/jobs/bulk/', data, content_type='application/json')
+
+    def test_bulk_is_all_or_nothing(self):
+        new_job = {
+            'index': self.index.id, 'title': 'New', 'assigned_to': self.member.id,
+            'start_time': '2025-03-25T09:00:00Z', 'end_time': '2025-03-25T10:00:00Z',
+        }
+        response = self.bulk(create=[new_job, {**new_job, 'index': 999}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('index', response.json()['errors']['create']['1'])
+
+        # Clashes within the batch and with stored jobs are both reported
+        response = self.bulk(
+            create=[new_job, {**new_job, 'title': 'Clash'}],
+            assign=[{'id': self.overlapping.id, 'team_member_id': self.member.id}],
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['conflicts'], {
+            'create[0]': ['create[1]'], 'create[1]': ['create[0]'], 'assign[0]': [self.booked.id],
+        })
+        self.assertEqual(Job.objects.count(), 3)
+
+        # Besides the writes and lookups: the series occurrences in the window, the longest job
+        # bound the overlap probe reads and the raise that keeps it covering the new jobs
+        with self.assertNumQueries(12):
+            response = self.bulk(
+                create=[new_job],
+                update=[{'id': self.adjacent.id, 'title': 'Moved', 'assigned_to': self.member.id}],
+                assign=[{'id': self.overlapping.id, 'team_member_id': None}],
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['created']), 1)
+        self.adjacent.refresh_from_db()
+        self.assertEqual((self.adjacent.title, self.adjacent.assigned_to), ('Moved', self.member))
+
+
+class AutoAssignTests(BookingTestCase):
+    def test_auto_assign_balances_without_double_booking(self):
+        other = TeamMember.objects.create(name='John Doe', email='john@example.com')
+        for hour in (9, 10, 14):
+            Job.objects.create(
+                index=self.index, title=f'Open {hour}',
+                start_time=utc(2025, 3, 25, hour), end_time=utc(2025, 3, 25, hour + 2),
+            )
+        response = self.client.post(
+            '/api/jobs/auto_assign/', {'start': '2025-03-24', 'end': '2025-03-26'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['unassigned'], [])
+        self.assertEqual(Job.objects.filter(assigned_to__isnull=True).count(), 0)
+        self.assertEqual(self.client.get('/api/jobs/conflicts/').json(), [])
+        # Jane already carries the 2 h booked job, so John takes two of the three
+        self.assertEqual(
+            Job.objects.filter(assigned_to=other, start_time__date=date(2025, 3, 25)).count(), 2
+        )
+
+    def test_refine_moves_between_any_pair(self):
+        jobs = [(1, 0, 3), (2, 3, 6), (3, 6, 9)]
+        # The lightest member is booked all along, so only the middle one can take a job
+        schedules = {'heavy': Schedule(), 'booked': Schedule([(0, 100)]), 'light': Schedule([(20, 21)])}
+        for _, start, end in jobs:
+            schedules['heavy'].add(start, end)
+        assignment = {job_id: 'heavy' for job_id, _, _ in jobs}
+        loads = {'heavy': 9, 'booked': 0, 'light': 1}
+
+        self.assertEqual(refine(jobs, assignment, schedules, loads), 1)
+        self.assertEqual(loads, {'heavy': 6, 'booked': 0, 'light': 4})
+        self.assertEqual(list(assignment.values()).count('light'), 1)
+
+
+class SeriesTestCase(TestCase):
+    """An unassigned series of weekday morning jobs on one index, and a member."""
+
+    def setUp(self):
+        self.index = Index.objects.create(name='Market Index')
+        self.member = TeamMember.objects.create(name='Jane Smith', email='jane@example.com')
+        # Business days at 09:00, starting Monday 2025-03-03
+        self.series = JobSeries.objects.create(
+            index=self.index, title='Morning Update', start_time=utc(2025, 3, 3, 9),
+            duration=timedelta(hours=2), recurrence='FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR',
+        )
+
+
+class JobSeriesTests(SeriesTestCase):
+    def week(self, **params):
+        return self.client.get(
+            '/api/jobs/', {'start': '2025-03-10', 'end': '2025-03-17', 'overlap': 'true', **params}
+        ).json()
+
+    def test_occurrences_are_expanded_for_the_window_only(self):
+        jobs = self.week()
+        self.assertEqual(len(jobs), 5)
+        self.assertEqual(jobs[0]['start_time'], '2025-03-10T09:00:00Z')
+        self.assertEqual(jobs[0]['series'], self.series.id)
+        self.assertEqual(len(self.client.get('/api/jobs/').json()), 0)
+
+    def test_quarterly_nth_weekday(self):
+        series = JobSeries.objects.create(
+            index=self.index, title='Quarterly Rebalance', start_time=utc(2025, 3, 21, 14),
+            duration=timedelta(hours=3), recurrence='RRULE:FREQ=MONTHLY;INTERVAL=3;BYDAY=3FR',
+        )
+        jobs = self.client.get(
+            '/api/jobs/', {'start': '2025-01-01', 'end': '2026-01-01', 'overlap': 'true'}
+        ).json()
+        starts = [job['start_time'] for job in jobs if job['series'] == series.id]
+        self.assertEqual(starts, [
+            '2025-03-21T14:00:00Z', '2025-06-20T14:00:00Z',
+            '2025-09-19T14:00:00Z', '2025-12-19T14:00:00Z',
+        ])
+
+    def test_override_reassigns_and_cancels_single_occurrences(self):
+        url = f'/api/job-series/{self.series.id}/occurrences/'
+        response = self.client.put(url, {
+            'original_start': '2025-03-11T09:00:00Z', 'assigned_to': self.member.id,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.client.put(url, {
+            'original_start': '2025-03-12T09:00:00Z', 'cancelled': True,
+        }, content_type='application/json')
+
+        jobs = self.week()
+        self.assertEqual(len(jobs), 4)
+        self.assertEqual(jobs[1]['assigned_to_name'], 'Jane Smith')
+        self.assertIsNone(jobs[0]['assigned_to'])
+
+        response = self.client.put(url, {
+            'original_start': '2025-03-11T10:00:00Z',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+class WorkloadTests(SeriesTestCase):
+    def test_workload_sums_jobs_and_occurrences_per_week(self):
+        Job.objects.create(
+            index=self.index, title='One-off', assigned_to=self.member,
+            start_time=utc(2025, 3, 11, 13), end_time=utc(2025, 3, 11, 16, 30),
+        )
+        params = {'start': '2025-03-10', 'end': '2025-03-17', 'bucket': 'week'}
+        rows = self.client.get('/api/workload/', params).json()
+        self.assertEqual(rows, [
+            {'bucket': '2025-03-10', 'member': self.member.id, 'member_name': 'Jane Smith',
+             'hours': 3.5, 'jobs': 1},
+            {'bucket': '2025-03-10', 'member': None, 'member_name': 'Unassigned',
+             'hours': 10.0, 'jobs': 5},
+        ])
+
+        response = self.client.get('/api/workload/', {**params, 'group': 'index', 'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response.content.decode().splitlines(), [
+            'bucket,index,index_name,hours,jobs',
+            f'2025-03-10,{self.index.id},Market Index,13.5,6',
+        ])
+
+
+class CalendarFeedTests(SeriesTestCase):
+    def test_member_calendar_feed(self):
+        self.series.assigned_to = self.member
+        self.series.save()
+        JobOccurrence.objects.create(
+            series=self.series, original_start=utc(2025, 3, 12, 9),
+            start_time=utc(2025, 3, 12, 9), end_time=utc(2025, 3, 12, 11), cancelled=True,
+        )
+        Job.objects.create(
+            index=self.index, title='Rebalance; review', assigned_to=self.member,
+            start_time=utc(2025, 3, 11, 13), end_time=utc(2025, 3, 11, 15),
+        )
+        url = f'/api/calendars/team-members/{self.member.id}.ics'
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().split('\r\n')
+        self.assertIn(r'SUMMARY:Rebalance\; review', lines)
+        self.assertIn('RRULE:FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR', lines)
+        self.assertIn('EXDATE:20250312T090000Z', lines)
+        self.assertEqual(lines.count('BEGIN:VEVENT'), 2)
+
+        # Unchanged jobs are answered from the cache, or with 304 when the client has the tag
+        with self.assertNumQueries(3):
+            cached = self.client.get(url)
+            self.assertEqual(b''.join(cached.streaming_content).decode().split('\r\n'), lines)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+
+    @override_settings(TIME_ZONE='America/Chicago')
+    def test_calendar_feed_defines_its_time_zone(self):
+        caches['feeds'].clear()
+        response = self.client.get(f'/api/calendars/indexes/{self.index.id}.ics')
+        lines = b''.join(response.streaming_content).decode().split('\r\n')
+        # Series dates name the zone, so the feed carries its definition
+        self.assertIn('DTSTART;TZID=America/Chicago:20250303T030000', lines)
+        start = lines.index('BEGIN:VTIMEZONE')
+        self.assertEqual(lines[start + 1:start + 9], [
+            'TZID:America/Chicago', 'BEGIN:DAYLIGHT', 'DTSTART:19700308T020000',
+            'RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU', 'TZOFFSETFROM:-0600', 'TZOFFSETTO:-0500',
+            'TZNAME:CDT', 'END:DAYLIGHT',
+        ])
+        self.assertIn('RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU', lines)
+
+    def test_feeds_are_cached_apart(self):
+        caches['feeds'].clear()
+        cache.clear()
+        url = f'/api/calendars/indexes/{self.index.id}.ics'
+        body = b''.join(self.client.get(url).streaming_content)
+        versions = ','.join(map(str, current_versions(['jobs', 'indexes', 'team'])))
+        key = f'scheduler:feed:index:{self.index.id}:{versions}'
+        self.assertEqual(caches['feeds'].get(key), body)
+        self.assertIsNone(cache.get(key))
+
+
+class GenerateLoadDataTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def generate(self, seed=7):
+        call_command(
+            'generate_load_data', seed=seed, companies=2, groups_per_slot=2, tasks_per_group=3,
+            members=3, indexes=2, years=0.2, jobs_per_day=5, signoff_density=0.5,
+            end='2025-03-28', batch_size=7, stdout=io.StringIO(),
+        )
+        return list(TaskSignOff.objects.order_by('id').values_list(
+            'task_group__name', 'task_group__company__name', 'team_member__email',
+            'completed_date', 'sign_off_date',
+        ))
+
+    def test_generates_reproducible_history(self):
+        signoffs = self.generate()
+        self.assertEqual(TaskGroup.objects.count(), 16)
+        self.assertEqual(Task.objects.count(), 48)
+        self.assertEqual(Job.objects.count(), 5 * 74)
+        self.assertTrue(signoffs)
+        # Sign-offs keep their generated times, near the day they complete
+        self.assertTrue(all(
+            signed.date() - timedelta(days=1) <= day <= signed.date() for *_, day, signed in signoffs
+        ))
+        self.assertEqual(CompletionRollup.objects.aggregate(total=Sum('signoffs'))['total'], len(signoffs))
+
+        with self.assertRaises(CommandError):
+            self.generate()
+        for model in (CompletionRollup, MemberRollup, TaskSignOff, Job, Task, TaskGroup, Company,
+                      TeamMember, Index):
+            raw_delete(model.objects.all())
+        self.assertEqual(self.generate(), signoffs)
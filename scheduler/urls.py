@@ -7,6 +7,7 @@ router = DefaultRouter()
 router.register(r'indexes', views.IndexViewSet)
 router.register(r'team-members', views.TeamMemberViewSet)
 router.register(r'jobs', views.JobViewSet)
+router.register(r'job-series', views.JobSeriesViewSet)
 router.register(r'companies', views.CompanyViewSet)
 router.register(r'time-slots', views.TimeSlotViewSet)
 router.register(r'task-groups', views.TaskGroupViewSet)
@@ -14,7 +15,13 @@ router.register(r'tasks', views.TaskViewSet)
 router.register(r'task-signoffs', views.TaskSignOffViewSet)
 
 urlpatterns = [
+    # Before the router, which would treat 'stream' as a sign-off id
+    path('task-signoffs/stream/', views.signoff_stream, name='task-signoff-stream'),
     path('', include(router.urls)),
     path('assign-job/<int:job_id>/', views.assign_job, name='assign-job'),
     path('task-history/', views.get_task_history, name='task-history'),
+    path('workload/', views.get_workload, name='workload'),
+    path('analytics/completion/', views.get_completion_analytics, name='completion-analytics'),
+    path('calendars/team-members/<int:member_id>.ics', views.team_member_calendar, name='team-member-calendar'),
+    path('calendars/indexes/<int:index_id>.ics', views.index_job_calendar, name='index-calendar'),
 ]
\ No newline at end of file
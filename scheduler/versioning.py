@@ -0,0 +1,75 @@
+# scheduler/versioning.py
+import hashlib
+from datetime import date
+from functools import wraps
+
+from django.db.models import F
+from django.views.decorators.http import condition
+
+from .models import (
+    Index, TeamMember, Job, JobSeries, JobOccurrence,
+    Company, TimeSlot, TaskGroup, Task, TaskSignOff, DataVersion
+)
+
+# Each model bumps the counter of the family it belongs to
+MODEL_FAMILIES = {
+    Index: 'indexes',
+    TeamMember: 'team',
+    Job: 'jobs',
+    JobSeries: 'jobs',
+    JobOccurrence: 'jobs',
+    Company: 'runbook',
+    TimeSlot: 'time_slots',
+    TaskGroup: 'runbook',
+    Task: 'runbook',
+    TaskSignOff: 'signoffs',
+}
+
+
+def bump(family):
+    """Increment the change counter of a model family."""
+    updated = DataVersion.objects.filter(family=family).update(version=F('version') + 1)
+    if not updated:
+        DataVersion.objects.get_or_create(family=family, defaults={'version': 1})
+
+
+def current_versions(families):
+    """Return the current counter for each family, in a single query."""
+    versions = dict(
+        DataVersion.objects.filter(family__in=families).values_list('family', 'version')
+    )
+    return [versions.get(family, 0) for family in families]
+
+
+def versioned(*families):
+    """Decorate a read view with an ETag derived from the given family counters.
+
+    A request whose If-None-Match matches is answered with 304 before the view
+    (and its serializers) run. The tag also covers the URL, the Accept header
+    and today's date, since views default their date filters to today.
+    """
+    families = sorted(families)
+
+    def etag_func(request, *args, **kwargs):
+        key = '|'.join([
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+            date.today().isoformat(),
+            ','.join(map(str, current_versions(families))),
+        ])
+        return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+    def decorator(view):
+        conditional = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            # Make browsers revalidate with If-None-Match instead of guessing freshness
+            if not response.has_header('Cache-Control'):
+                response['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,43 +1,90 @@
 # scheduler/views.py
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, action
+from rest_framework.decorators import api_view, action, renderer_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+import asyncio
 from datetime import datetime, date
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
 from .models import (
-    Index, TeamMember, Job, 
-    Company, TimeSlot, TaskGroup, Task, TaskSignOff
+    Index, TeamMember, Job, JobSeries, JobOccurrence,
+    Company, TimeSlot, TaskGroup, Task, TaskSignOff, ArchivedSignOff
 )
 from .serializers import (
     IndexSerializer, TeamMemberSerializer, JobSerializer,
+    JobSeriesSerializer, JobOccurrenceSerializer, OccurrenceSerializer,
     CompanySerializer, TimeSlotSerializer, TaskGroupSerializer, 
-    TaskSerializer, TaskSignOffSerializer, CompanyTasksSerializer
+    TaskSerializer, TaskSignOffSerializer
 )
+from .bulk import BulkJobError, apply_bulk_jobs
+from .dashboard import get_dashboard, signoff_matrix
+from .events import broker, signoff_event
+from .exports import JOB_HEADER, SIGNOFF_HEADER, export_response, job_rows, signoff_rows
+from .feeds import cached_feed, index_calendar, member_calendar
+from .history import HISTORY_ROWS_PER_DAY, MAX_HISTORY_PAGE_SIZE, history_page
+from .conflicts import find_conflicts, member_conflicts
+from .jobs import WORKLOAD_GROUPS, bucket_by_day, overlapping, parse_bound, workload
+from .recurrence import Occurrence, expand_series, is_occurrence
+from .renderers import CSVRenderer, XLSXRenderer
+from .rollups import completion_analytics
+from .signoffs import SignOffError, upsert_signoffs
+from .solver import balance_unassigned
+from .sync import CURSOR_HEADER, CursorExpired, current_cursor, dashboard_delta, history_delta
+from .versioning import versioned
+from .writes import perform_write
+
+# Longest range the sign-off matrix endpoint will compute in one request
+MAX_MATRIX_DAYS = 366
+
+# Longest range of the completion analytics, which only read daily rollups
+MAX_ANALYTICS_DAYS = 3 * 366
+
+# Sign-off stream timings, in seconds unless noted
+STREAM_HEARTBEAT = 15
+STREAM_LIFETIME = 300
+STREAM_RETRY_MS = 3000
 
 class IndexViewSet(viewsets.ModelViewSet):
     queryset = Index.objects.all()
     serializer_class = IndexSerializer
 
+@method_decorator(versioned('team'), name='list')
 class TeamMemberViewSet(viewsets.ModelViewSet):
     queryset = TeamMember.objects.all()
     serializer_class = TeamMemberSerializer
 
+@method_decorator(versioned('jobs', 'indexes', 'team'), name='list')
 class JobViewSet(viewsets.ModelViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerializer
     
     def get_queryset(self):
         """Allow filtering by date range and index"""
-        queryset = Job.objects.all()
+        queryset = Job.objects.select_related('index', 'assigned_to').order_by('start_time', 'id')
         
         # Filter by date range if provided
-        start = self.request.query_params.get('start')
-        end = self.request.query_params.get('end')
+        try:
+            start = parse_bound(self.request.query_params.get('start'))
+            end = parse_bound(self.request.query_params.get('end'))
+        except ValueError as e:
+            raise ValidationError({"error": str(e)})
         
-        if start:
-            queryset = queryset.filter(start_time__gte=start)
-        if end:
-            queryset = queryset.filter(end_time__lte=end)
+        if self.overlap_mode():
+            # Jobs overlapping [start, end), including those crossing either bound
+            queryset = overlapping(queryset, start, end)
+        else:
+            # Jobs fully contained in the range
+            if start:
+                queryset = queryset.filter(start_time__gte=start)
+            if end:
+                queryset = queryset.filter(end_time__lte=end)
             
         # Filter by index if provided
         index_id = self.request.query_params.get('index_id')
@@ -45,16 +92,169 @@ class JobViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(index_id=index_id)
             
         return queryset
+    
+    def overlap_mode(self):
+        """Whether start/end select overlapping jobs rather than contained ones."""
+        return (self.request.query_params.get('overlap') in ('1', 'true')
+                or self.request.query_params.get('bucket') == 'day')
+    
+    def list(self, request, *args, **kwargs):
+        """List jobs and series occurrences, optionally grouped by the days they overlap."""
+        try:
+            start = parse_bound(request.query_params.get('start'))
+            end = parse_bound(request.query_params.get('end'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        bucket = request.query_params.get('bucket') == 'day'
+        if bucket and (start is None or end is None):
+            return Response({"error": "Day buckets need both start and end."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        jobs = self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data
+        
+        # Recurring jobs are only expanded for a bounded window
+        if start is not None and end is not None:
+            occurrences = expand_series(
+                start, end,
+                index_id=request.query_params.get('index_id'),
+                contained=not self.overlap_mode()
+            )
+            jobs = sorted(
+                [*jobs, *OccurrenceSerializer(occurrences, many=True).data],
+                key=lambda job: parse_datetime(job['start_time'])
+            )
+        
+        if bucket:
+            return Response(bucket_by_day(jobs, start, end))
+        return Response(jobs)
+    
+    @action(detail=False, methods=['get'])
+    def conflicts(self, request):
+        """Report double-booked team members among jobs overlapping start/end."""
+        try:
+            start = parse_bound(request.query_params.get('start'))
+            end = parse_bound(request.query_params.get('end'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(find_conflicts(start, end))
+    
+    @action(detail=False, methods=['post'])
+    def auto_assign(self, request):
+        """Assign the unassigned jobs between start and end, balancing members' hours."""
+        try:
+            start = parse_bound(request.data.get('start'))
+            end = parse_bound(request.data.get('end'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if start is None or end is None:
+            return Response({"error": "Both start and end are required."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        return Response(balance_unassigned(
+            start, end,
+            refine_loads=request.data.get('refine', True) is not False,
+            dry_run=bool(request.data.get('dry_run'))
+        ))
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Create, update and assign many jobs in one all-or-nothing request."""
+        try:
+            created, updated = apply_bulk_jobs(request.data)
+        except BulkJobError as e:
+            return Response({"error": e.message, **e.details}, status=e.status)
+        return Response({
+            "created": JobSerializer(created, many=True).data,
+            "updated": JobSerializer(updated, many=True).data
+        })
+    
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, XLSXRenderer])
+    def export(self, request):
+        """Download the filtered jobs, plus occurrences for a bounded window, as CSV or XLSX."""
+        queryset = self.filter_queryset(self.get_queryset())
+        start = parse_bound(request.query_params.get('start'))
+        end = parse_bound(request.query_params.get('end'))
+        occurrences = ()
+        if start is not None and end is not None:
+            occurrences = expand_series(
+                start, end,
+                index_id=request.query_params.get('index_id'),
+                contained=not self.overlap_mode()
+            )
+        return export_response(
+            'jobs', JOB_HEADER, job_rows(queryset, occurrences), request.accepted_renderer.format
+        )
+
+@method_decorator(versioned('jobs', 'indexes', 'team'), name='list')
+class JobSeriesViewSet(viewsets.ModelViewSet):
+    queryset = JobSeries.objects.select_related('index', 'assigned_to')
+    serializer_class = JobSeriesSerializer
+    
+    @action(detail=True, methods=['put'])
+    def occurrences(self, request, pk=None):
+        """Store an exception (reassignment, move, note or cancellation) for one occurrence."""
+        series = self.get_object()
+        serializer = JobOccurrenceSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        
+        original_start = serializer.validated_data.get('original_start')
+        if original_start is None or not is_occurrence(series, original_start):
+            return Response({"error": "original_start is not an occurrence of this series."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        override = JobOccurrence.objects.filter(series=series, original_start=original_start).first()
+        if override is None:
+            # Start from the generated occurrence so unspecified fields are unchanged
+            generated = Occurrence.generated(series, original_start)
+            override = JobOccurrence(
+                series=series,
+                original_start=original_start,
+                start_time=generated.start_time,
+                end_time=generated.end_time,
+                assigned_to=generated.assigned_to,
+                notes=generated.notes
+            )
+        for field, value in serializer.validated_data.items():
+            setattr(override, field, value)
+        
+        member = override.assigned_to
+        if member and not override.cancelled and not request.data.get('force'):
+            conflict_ids = member_conflicts(
+                member.id, override.start_time, override.end_time,
+                exclude_occurrence=(series.id, original_start)
+            )[:10]
+            if conflict_ids:
+                return Response({
+                    "error": f"{member.name} is already booked for an overlapping job.",
+                    "conflicts": conflict_ids
+                }, status=status.HTTP_409_CONFLICT)
+        
+        override.save()
+        return Response(OccurrenceSerializer(Occurrence.overridden(series, override)).data)
 
 @api_view(['PUT'])
 def assign_job(request, job_id):
     """API endpoint to assign a job to a team member"""
+    return perform_write(_assign_job, job_id, request.data)
+
+def _assign_job(job_id, data):
     try:
         job = Job.objects.get(pk=job_id)
-        member_id = request.data.get('team_member_id')
+        member_id = data.get('team_member_id')
         
         if member_id:
             team_member = TeamMember.objects.get(pk=member_id)
+            
+            # Refuse double-bookings unless the caller explicitly overrides
+            conflict_ids = member_conflicts(
+                team_member.id, job.start_time, job.end_time, exclude_job_id=job.id
+            )[:10]
+            if conflict_ids and not data.get('force'):
+                return Response({
+                    "error": f"{team_member.name} is already booked for an overlapping job.",
+                    "conflicts": conflict_ids
+                }, status=status.HTTP_409_CONFLICT)
+            
             job.assigned_to = team_member
         else:
             # If no member_id is provided, unassign the job
@@ -68,11 +268,17 @@ def assign_job(request, job_id):
 
 # New ViewSets for task models
 
+def _expired_cursor(error):
+    """410 telling a delta sync client to reload in full from the current cursor."""
+    return Response({"error": "Cursor expired; reload in full.", "cursor": error.args[0], "reset": True},
+                    status=status.HTTP_410_GONE)
+
 class CompanyViewSet(viewsets.ModelViewSet):
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
     
     @action(detail=False, methods=['get'])
+    @method_decorator(versioned('runbook', 'time_slots', 'signoffs', 'team', 'dashboard'))
     def with_tasks(self, request):
         """Return companies with their task groups and tasks."""
         # Get time slot filter if provided
@@ -87,59 +293,59 @@ class CompanyViewSet(viewsets.ModelViewSet):
         else:
             today = date.today()
         
-        # Get all companies
-        companies = Company.objects.all().order_by('name')
-        
-        # Create context for the serializer
-        context = {
-            'time_slot_id': time_slot_id,
-            'today': today
-        }
-        
-        # Serialize the companies with their tasks
-        serializer = CompanyTasksSerializer(
-            companies, 
-            many=True, 
-            context=context
-        )
+        if time_slot_id:
+            try:
+                time_slot_id = int(time_slot_id)
+            except ValueError:
+                return Response({"error": "Invalid time slot."},
+                               status=status.HTTP_400_BAD_REQUEST)
+        else:
+            time_slot_id = None
         
-        # Filter out companies with no task groups
-        result_data = []
-        for company_data in serializer.data:
-            # Only include companies that have task groups
-            if company_data['task_groups'] and len(company_data['task_groups']) > 0:
-                result_data.append(company_data)
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return Response({"error": "Invalid cursor."},
+                               status=status.HTTP_400_BAD_REQUEST)
+            try:
+                return Response(dashboard_delta(since, time_slot_id, today))
+            except CursorExpired as e:
+                return _expired_cursor(e)
         
-        return Response(result_data)
-    queryset = Company.objects.all()
-    serializer_class = CompanySerializer
+        # Read the cursor first so changes made while building are resent
+        cursor = current_cursor()
+        # Served from the stored snapshot, which sign-offs and edits keep current
+        response = Response(get_dashboard(time_slot_id, today))
+        response[CURSOR_HEADER] = cursor
+        return response
     
     @action(detail=False, methods=['get'])
-    def with_tasks(self, request):
-        """Return companies with their task groups and tasks."""
-        # Get time slot filter if provided
-        time_slot_id = request.query_params.get('time_slot')
-        # Get today's date for checking sign-offs
-        today_str = request.query_params.get('date')
-        if today_str:
-            try:
-                today = datetime.strptime(today_str, '%Y-%m-%d').date()
-            except ValueError:
-                today = date.today()
-        else:
-            today = date.today()
-            
-        companies = Company.objects.all()
-        serializer = CompanyTasksSerializer(
-            companies, 
-            many=True, 
-            context={
-                'time_slot_id': time_slot_id,
-                'today': today
-            }
-        )
-        return Response(serializer.data)
+    @method_decorator(versioned('runbook', 'time_slots', 'signoffs'))
+    def signoff_matrix(self, request):
+        """Return the runbook once plus a task group x date sign-off matrix."""
+        try:
+            start = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+            end = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response({"error": "start and end are required. Use YYYY-MM-DD."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        if end < start or (end - start).days >= MAX_MATRIX_DAYS:
+            return Response({"error": f"The range must cover 1 to {MAX_MATRIX_DAYS} days."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            time_slot_id = int(request.query_params.get('time_slot') or 0) or None
+            company_id = int(request.query_params.get('company') or 0) or None
+        except ValueError:
+            return Response({"error": "Invalid time slot or company."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(signoff_matrix(start, end, time_slot_id, company_id))
 
+@method_decorator(versioned('time_slots'), name='list')
 class TimeSlotViewSet(viewsets.ModelViewSet):
     queryset = TimeSlot.objects.all()
     serializer_class = TimeSlotSerializer
@@ -172,87 +378,252 @@ class TaskSignOffViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Allow filtering by task group, team member, and date"""
-        queryset = TaskSignOff.objects.all()
-        
+        return TaskSignOff.objects.filter(**self.signoff_filters())
+    
+    def signoff_filters(self):
+        """Field lookups for the task group, team member and date query parameters."""
+        filters = {}
         task_group_id = self.request.query_params.get('task_group')
         team_member_id = self.request.query_params.get('team_member')
         date_str = self.request.query_params.get('date')
         
         if task_group_id:
-            queryset = queryset.filter(task_group_id=task_group_id)
+            filters['task_group_id'] = task_group_id
         if team_member_id:
-            queryset = queryset.filter(team_member_id=team_member_id)
+            filters['team_member_id'] = team_member_id
         if date_str:
             try:
-                completed_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-                queryset = queryset.filter(completed_date=completed_date)
+                filters['completed_date'] = datetime.strptime(date_str, '%Y-%m-%d').date()
             except ValueError:
                 pass
             
-        return queryset
+        return filters
+    
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, XLSXRenderer])
+    def export(self, request):
+        """Download the filtered sign-off history, archived sign-offs included, as CSV or XLSX."""
+        archived = ArchivedSignOff.objects.filter(**self.signoff_filters())
+        return export_response(
+            'signoffs', SIGNOFF_HEADER, signoff_rows(self.get_queryset(), archived),
+            request.accepted_renderer.format
+        )
     
     @action(detail=False, methods=['post'])
     def sign_off(self, request):
         """Sign off on a task group for today's date."""
-        task_group_id = request.data.get('task_group_id')
-        team_member_id = request.data.get('team_member_id')
-        notes = request.data.get('notes', '')
-        completed_date_str = request.data.get('completed_date')
-        
-        # Default to today if no date provided
-        if completed_date_str:
-            try:
-                completed_date = datetime.strptime(completed_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return Response({"error": "Invalid date format. Use YYYY-MM-DD."},
+        return perform_write(self._sign_off, {
+            field: request.data.get(field)
+            for field in ('task_group_id', 'team_member_id', 'completed_date', 'notes')
+        })
+    
+    def _sign_off(self, entry):
+        try:
+            [(sign_off, created)] = upsert_signoffs([entry])
+        except SignOffError as e:
+            errors = e.details['errors'][0]
+            if 'completed_date' in errors or 'notes' in errors:
+                return Response({"error": errors.get('completed_date') or errors['notes']},
                                status=status.HTTP_400_BAD_REQUEST)
-        else:
-            completed_date = date.today()
-            
+            return Response({"error": next(iter(errors.values()))}, status=status.HTTP_404_NOT_FOUND)
+        
+        publish_signoff(sign_off, created)
+        serializer = TaskSignOffSerializer(sign_off)
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_sign_off(self, request):
+        """Sign off on many task groups at once; team_member_id and completed_date may be shared."""
+        if not isinstance(request.data, dict):
+            return Response({"error": "Expected an object with a signoffs list."},
+                           status=status.HTTP_400_BAD_REQUEST)
+        defaults = {
+            field: request.data[field]
+            for field in ('team_member_id', 'completed_date', 'notes') if field in request.data
+        }
+        return perform_write(self._bulk_sign_off, request.data.get('signoffs'), defaults)
+
+    def _bulk_sign_off(self, entries, defaults):
         try:
-            task_group = TaskGroup.objects.get(pk=task_group_id)
-            team_member = TeamMember.objects.get(pk=team_member_id)
-            
-            # Check if already signed off for this date
-            existing = TaskSignOff.objects.filter(
-                task_group=task_group,
-                team_member=team_member,
-                completed_date=completed_date
-            ).first()
-            
-            if existing:
-                # Update existing sign-off
-                existing.notes = notes
-                existing.save()
-                serializer = TaskSignOffSerializer(existing)
-                return Response(serializer.data)
-            else:
-                # Create new sign-off
-                sign_off = TaskSignOff.objects.create(
-                    task_group=task_group,
-                    team_member=team_member,
-                    completed_date=completed_date,
-                    notes=notes
-                )
-                serializer = TaskSignOffSerializer(sign_off)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
-            
-        except TaskGroup.DoesNotExist:
-            return Response({"error": "Task group not found"}, status=status.HTTP_404_NOT_FOUND)
-        except TeamMember.DoesNotExist:
-            return Response({"error": "Team member not found"}, status=status.HTTP_404_NOT_FOUND)
+            saved = upsert_signoffs(entries, defaults)
+        except SignOffError as e:
+            return Response({"error": e.message, **e.details}, status=e.status)
+        
+        for sign_off, created in saved:
+            publish_signoff(sign_off, created)
+        return Response({
+            "created": TaskSignOffSerializer([s for s, created in saved if created], many=True).data,
+            "updated": TaskSignOffSerializer([s for s, created in saved if not created], many=True).data
+        })
+
+def publish_signoff(signoff, created):
+    """Push a sign-off event to stream subscribers once it is committed."""
+    event = signoff_event(signoff, created)
+    transaction.on_commit(lambda: broker.publish(event))
+
+async def signoff_stream(request):
+    """Stream sign-off events as server-sent events, filtered by date and time slot."""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Streaming requires the ASGI server (backend.asgi)."},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+    
+    completed_date = request.GET.get('date')
+    if completed_date:
+        try:
+            completed_date = datetime.strptime(completed_date, '%Y-%m-%d').date().isoformat()
+        except ValueError:
+            return JsonResponse({"error": "Invalid date format. Use YYYY-MM-DD."},
+                                status=status.HTTP_400_BAD_REQUEST)
+    try:
+        time_slot_id = int(request.GET.get('time_slot') or 0) or None
+    except ValueError:
+        return JsonResponse({"error": "Invalid time slot."}, status=status.HTTP_400_BAD_REQUEST)
+    
+    subscription = broker.subscribe(completed_date, time_slot_id)
+    
+    async def events():
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            loop = asyncio.get_running_loop()
+            # Django cannot see disconnects mid-stream, so streams are closed
+            # periodically and EventSource reconnects on its own
+            deadline = loop.time() + STREAM_LIFETIME
+            while loop.time() < deadline:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    yield "event: resync\ndata: {}\n\n"
+                    break
+                yield f"event: signoff\ndata: {message}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _calendar_response(key, lines, filename):
+    response = StreamingHttpResponse(
+        cached_feed(key, lines), content_type='text/calendar; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'inline; filename="{filename}.ics"'
+    return response
+
+@versioned('jobs', 'indexes', 'team')
+def team_member_calendar(request, member_id):
+    """iCalendar feed of a team member's jobs and recurring jobs."""
+    member = get_object_or_404(TeamMember, pk=member_id)
+    return _calendar_response(f'member:{member.id}', member_calendar(member), f'member-{member.id}')
+
+@versioned('jobs', 'indexes', 'team')
+def index_job_calendar(request, index_id):
+    """iCalendar feed of an index's jobs and recurring jobs."""
+    index = get_object_or_404(Index, pk=index_id)
+    return _calendar_response(f'index:{index.id}', index_calendar(index), f'index-{index.id}')
+
+@versioned('analytics', 'runbook', 'time_slots', 'team')
+@api_view(['GET'])
+def get_completion_analytics(request):
+    """Completion rates and late sign-off trends per day, company, time slot and member."""
+    try:
+        start = datetime.strptime(request.query_params.get('start', ''), '%Y-%m-%d').date()
+        end = datetime.strptime(request.query_params.get('end', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return Response({"error": "start and end are required. Use YYYY-MM-DD."},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    if end < start or (end - start).days >= MAX_ANALYTICS_DAYS:
+        return Response({"error": f"The range must cover 1 to {MAX_ANALYTICS_DAYS} days."},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        time_slot_id = int(request.query_params.get('time_slot') or 0) or None
+        company_id = int(request.query_params.get('company') or 0) or None
+    except ValueError:
+        return Response({"error": "Invalid time slot or company."},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response(completion_analytics(start, end, company_id, time_slot_id))
+
+@versioned('jobs', 'indexes', 'team')
+@api_view(['GET'])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, CSVRenderer])
+def get_workload(request):
+    """Booked hours and job counts per team member or index, by day or week."""
+    try:
+        start = parse_bound(request.query_params.get('start'))
+        end = parse_bound(request.query_params.get('end'))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if start is None or end is None:
+        return Response({"error": "Both start and end are required."},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    bucket = request.query_params.get('bucket', 'day')
+    group = request.query_params.get('group', 'member')
+    if bucket not in ('day', 'week') or group not in WORKLOAD_GROUPS:
+        return Response({"error": "bucket must be day or week and group member or index."},
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    response = Response(workload(start, end, bucket, group))
+    if request.accepted_renderer.format == 'csv':
+        response['Content-Disposition'] = f'attachment; filename="workload-{group}-{bucket}.csv"'
+    return response
 
 @api_view(['GET'])
 def get_task_history(request):
-    """Get recent task sign-off history."""
+    """Get task sign-off history for the last `days` days, newest first, in keyset pages."""
+    since = request.query_params.get('since')
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return Response({"error": "Invalid cursor."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(history_delta(since))
+        except CursorExpired as e:
+            return _expired_cursor(e)
+    
     days = request.query_params.get('days', 7)
     try:
-        days = int(days)
+        days = max(1, int(days))
     except ValueError:
         days = 7
-        
-    # Get recent sign-offs
-    recent_signoffs = TaskSignOff.objects.all().order_by('-sign_off_date')[:days * 10]  # Fetch more than needed for filtering
     
-    serializer = TaskSignOffSerializer(recent_signoffs, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    # Without a limit, a page holds as many rows as the unpaginated history did
+    limit = request.query_params.get('limit', days * HISTORY_ROWS_PER_DAY)
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = days * HISTORY_ROWS_PER_DAY
+    limit = min(max(1, limit), MAX_HISTORY_PAGE_SIZE)
+    
+    end = request.query_params.get('end')
+    if end:
+        try:
+            end = datetime.strptime(end, '%Y-%m-%d').date()
+        except ValueError:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."},
+                           status=status.HTTP_400_BAD_REQUEST)
+    else:
+        end = date.today()
+    
+    cursor = current_cursor()
+    try:
+        signoffs, next_position = history_page(
+            end, days, before=request.query_params.get('before'), limit=limit
+        )
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    response = Response(signoffs)
+    response[CURSOR_HEADER] = cursor
+    if next_position:
+        params = request.query_params.copy()
+        params['before'] = next_position
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+        response['Link'] = f'<{next_url}>; rel="next"'
+    return response
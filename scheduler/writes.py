@@ -0,0 +1,159 @@
+# scheduler/writes.py
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import ChangeLog, DataVersion, Task, TaskSignOff
+from .versioning import bump
+from . import rollups, signals
+
+# Most queued writes committed together in one transaction
+WRITE_BATCH_SIZE = 100
+
+
+class WriteQueue:
+    """Single writer thread that commits queued writes in shared transactions.
+
+    SQLite allows one writer at a time, so concurrent request transactions
+    queue on its file lock and give up with "database is locked" when the
+    wait runs out. Handing the writes to one thread removes that contention:
+    whatever arrives while a batch commits forms the next batch, so a burst
+    costs a few commits rather than one per request.
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, operation, *args, **kwargs):
+        """Queue a write and wait until the batch holding it has committed.
+
+        Returns the operation's result or raises its exception.
+        """
+        future = Future()
+        self._queue.put((future, operation, args, kwargs))
+        self._start()
+        return future.result()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='scheduler-writer', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch):
+        outcomes = []
+        try:
+            with transaction.atomic():
+                lock_for_writing()
+                for future, operation, args, kwargs in batch:
+                    # A savepoint per write, so one failure doesn't undo the rest
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, operation(*args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+                # The batch's dashboard and rollup refreshes commit with it
+                signals.flush_pending()
+        except Exception as e:
+            for future, *_ in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+writer = WriteQueue()
+
+
+def lock_for_writing():
+    """Take SQLite's write lock at the start of the current transaction.
+
+    SQLite transactions start deferred. One that reads before it writes
+    cannot wait for the lock: if another connection began writing in the
+    meantime, its first write fails at once with "database is locked".
+    A write that changes nothing takes the lock up front, so the
+    transaction waits its turn like any other writer.
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'UPDATE {DataVersion._meta.db_table} SET version = version WHERE 0')
+
+
+def perform_write(operation, *args, **kwargs):
+    """Run a write now, or through the shared writer when SCHEDULER_WRITE_BEHIND is on.
+
+    Either way the write, and the dashboard and rollup refreshes it causes,
+    commit in one transaction, and the caller gets the result once it has.
+    """
+    if settings.SCHEDULER_WRITE_BEHIND:
+        return writer.submit(operation, *args, **kwargs)
+    with transaction.atomic():
+        lock_for_writing()
+        result = operation(*args, **kwargs)
+        signals.flush_pending()
+    return result
+
+
+def raw_delete(queryset):
+    """Delete a queryset's rows with one DELETE statement, returning how many went.
+
+    This is the one caller of Django's private QuerySet._raw_delete. Unlike
+    delete() it loads no rows, sends no signals and follows no cascades,
+    so the caller deletes dependent rows first and does whatever the
+    signals would have done, as delete_task_groups does.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_task_groups(task_groups):
+    """Delete task groups with their tasks and sign-offs, returning how many of each went.
+
+    A bulk delete skips the per-object signals, so the tombstones and
+    rollup refreshes they would have made are written here in bulk: one
+    tombstone per sign-off and per task group (a group's covers its tasks)
+    and one rollup refresh per affected day, company and time slot.
+    """
+    signoffs = TaskSignOff.objects.filter(task_group__in=task_groups)
+    deleted = list(signoffs.values_list(
+        'id', 'task_group_id', 'completed_date', 'task_group__company_id', 'task_group__time_slot_id'
+    ))
+    task_group_ids = list(task_groups.values_list('id', flat=True))
+    raw_delete(signoffs)
+    tasks = raw_delete(Task.objects.filter(task_group__in=task_groups))
+    raw_delete(task_groups)
+
+    ChangeLog.objects.bulk_create([
+        *(ChangeLog(kind=ChangeLog.SIGNOFF, object_id=signoff_id, task_group_id=task_group_id,
+                    completed_date=day, deleted=True)
+          for signoff_id, task_group_id, day, _, _ in deleted),
+        *(ChangeLog(kind=ChangeLog.TASK_GROUP, object_id=task_group_id,
+                    task_group_id=task_group_id, deleted=True)
+          for task_group_id in task_group_ids),
+    ])
+    rollups.refresh_rollups({
+        (day, company_id, time_slot_id) for _, _, day, company_id, time_slot_id in deleted
+    })
+    if deleted:
+        bump('signoffs')
+    return len(task_group_ids), tasks, len(deleted)